@@ -8,11 +8,17 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import json
+import os
+import shutil
+import tempfile
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from io import BytesIO, StringIO
 import base64
+from concurrent.futures import ProcessPoolExecutor
 
 # Constants
 DEFAULT_PENSION_DATA = {
@@ -102,9 +108,151 @@ DEFAULT_PENSION_DATA = {
     ],
     "occupation_levels": [
         {"from_year": 2000, "percentage": 100.0}
-    ]
+    ],
+    "yield_schedule": [],
+    "conversion_rate": 5.5,
+    "two_accounts": False,
+    "current_mandatory_value": 0,
+    "bvg_upper_limit": 88200,
+    "mandatory_yield": 1.25,
+    "mandatory_conversion_rate": 6.8,
+    "historical_yields": [],
+    "buy_ins": [],
+    "tax_brackets": [
+        {"income_from": 0, "rate": 0.0},
+        {"income_from": 15000, "rate": 5.0},
+        {"income_from": 30000, "rate": 10.0},
+        {"income_from": 50000, "rate": 15.0},
+        {"income_from": 75000, "rate": 20.0},
+        {"income_from": 100000, "rate": 25.0},
+        {"income_from": 150000, "rate": 30.0},
+        {"income_from": 250000, "rate": 35.0}
+    ],
+    "sex": "male",
+    "technical_interest_rate": 1.5,
+    "mortality_table": [],
+    "stochastic_settings": {
+        "paths": 5000,
+        "seed": 20240101,
+        "salary_volatility": 2.0,
+        "yield_volatility": 4.0,
+        "correlation": 0.3,
+        "workers": 1,
+        "sketch_size": 200
+    },
+    "payout_settings": {
+        "annuity_share": 100.0,
+        "drawdown_yield": 2.0,
+        "drawdown_end_age": 90,
+        "monte_carlo": False,
+        "return_volatility": 5.0,
+        "scenarios": 2000
+    }
+}
+
+# Charts: maximum points drawn per line (about what the chart width can show)
+# and total number of points above which lines are drawn with WebGL
+CHART_MAX_POINTS_PER_LINE = 400
+CHART_WEBGL_THRESHOLD = 2000
+
+# Number of compiled plans kept in the session to restart from their checkpoints
+CHECKPOINT_STORE_SIZE = 200
+
+# Yield calibration: grid of yields (%) evaluated at once, then refined around the best one;
+# its bounds are also the bounds of the yield inputs, so a fitted yield can always be applied
+YIELD_CALIBRATION_GRID = np.arange(-10.0, 20.0 + 1e-9, 0.05)
+YIELD_CALIBRATION_REFINEMENT = np.arange(-0.05, 0.05 + 1e-9, 0.001)
+
+# Payout phase: last age projected, annuity shares compared and Monte Carlo seed
+PAYOUT_MAX_AGE = 110
+PAYOUT_ANNUITY_SHARES = np.linspace(0.0, 1.0, 11)
+PAYOUT_RANDOM_SEED = 42
+
+# Buy-in optimizer: maximum number of budget steps and years without buy-ins before retirement
+BUY_IN_MAX_STEPS = 1000
+BUY_IN_LOCK_YEARS = 3
+
+# Stochastic simulation: paths per chunk (each chunk has its own random stream)
+STOCHASTIC_CHUNK_SIZE = 1000
+
+# Streaming quantiles of the stochastic simulation: quantiles shown (fan chart band and
+# median) and default number of centroids kept per option and period
+STOCHASTIC_QUANTILES = (0.1, 0.5, 0.9)
+STOCHASTIC_SKETCH_SIZE = 200
+
+# Streaming simulation: periods per chunk (10 years of monthly periods)
+SIMULATION_CHUNK_SIZE = 120
+
+# On-disk result stores: paths shown per page of the path browser
+PATH_BROWSER_PAGE_SIZE = 50
+
+# Sensitivity analysis: inputs varied up and down (see perturb_plan_settings)
+SENSITIVITY_INPUTS = (
+    "expected_yield",
+    "current_salary",
+    "maximum_salary",
+    "years_to_max_salary",
+    "contribution_rates",
+    "coordination_fees",
+    "occupation_levels",
+    "retirement_age"
+)
+
+# Result export formats: file extension and MIME type, and rows per Parquet row group
+# or Arrow record batch of the streamed projection export
+EXPORT_FORMATS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file")
+}
+EXPORT_BATCH_ROWS = 65536
+
+# Employer view: members simulated at once, width of the age bands, aggregated totals and known member columns
+MEMBER_CHUNK_SIZE = 2000
+AGE_BAND_WIDTH = 10
+MEMBER_TOTALS = ("employer_contributions", "personal_contributions", "fund_values", "active_members")
+MEMBER_COLUMNS = (
+    "birth_date",
+    "current_salary",
+    "maximum_salary",
+    "years_to_max_salary",
+    "retirement_age",
+    "current_pension_value",
+    "current_value_date",
+    "occupation_level",
+    "sex",
+    "department"
+)
+
+# Life table: last age, sexes and bundled Gompertz-Makeham approximation of the
+# Swiss mortality (makeham, gompertz, growth), life expectancy at 65 of about 20 / 22.6 years
+MORTALITY_MAX_AGE = 120
+SEXES = ("male", "female")
+GOMPERTZ_MAKEHAM_PARAMETERS = {
+    "male": (0.0002, 1.0e-5, 0.105),
+    "female": (0.0002, 1.1e-5, 0.1)
 }
 
+# Historical backtest: bundled series of the BVG minimum interest rate (%) set by the
+# Federal Council, as (first year, last year, rate)
+BVG_MINIMUM_RATE_HISTORY = [
+    (1985, 2002, 4.0),
+    (2003, 2003, 3.25),
+    (2004, 2004, 2.25),
+    (2005, 2007, 2.5),
+    (2008, 2008, 2.75),
+    (2009, 2011, 2.0),
+    (2012, 2013, 1.5),
+    (2014, 2015, 1.75),
+    (2016, 2016, 1.25),
+    (2017, 2023, 1.0),
+    (2024, 2025, 1.25)
+]
+HISTORICAL_YIELDS = [
+    {"year": year, "yield": rate}
+    for first_year, last_year, rate in BVG_MINIMUM_RATE_HISTORY
+    for year in range(first_year, last_year + 1)
+]
+
 # Translations
 TRANSLATIONS = {
     "en": {
@@ -265,7 +413,167 @@ TRANSLATIONS = {
         "reference_points": "Reference Points",
         "is": "is",
         "of": "of",
-        "exceeds": "exceeds"
+        "exceeds": "exceeds",
+        "import_income_history": "Import income history",
+        "import_income_history_info": "Upload a CSV file with one year and income per row (e.g. an individual account (IK) extract). Existing income ranges are replaced.",
+        "income_history_imported": "{0} years of income history imported.",
+        "invalid_income_history": "The uploaded file could not be read. Please provide a CSV file with a year and an income column.",
+        "live_update": "Live update",
+        "live_update_info": "Recalculate automatically after every change. When off, changes are applied with the \"Recalculate\" button.",
+        "recalculate": "Recalculate",
+        "full_resolution": "Full resolution",
+        "full_resolution_info": "Long series are reduced to the points the chart can show. Enable to draw every period, e.g. to zoom into details.",
+        "calibrate_yield": "Calibrate yield from statements",
+        "calibrate_yield_info": "Upload a CSV file with one pension fund statement per row (date and fund value). The realized yield is fitted to the statements, starting from the earliest one.",
+        "fit_contribution_correction": "Fit a contribution correction",
+        "fit_contribution_correction_info": "Also scales the simulated contributions, e.g. when past salaries differ from the current one.",
+        "fitted_yield": "Fitted yield",
+        "contribution_correction": "Contribution correction",
+        "fit_error": "Fit error (RMSE)",
+        "statement_value": "Statement value",
+        "fitted_value": "Fitted value",
+        "apply_fitted_yield": "Apply fitted yield",
+        "invalid_statements": "The uploaded file could not be read. Please provide a CSV file with a date and a fund value column and at least two statements within the projection.",
+        "yield_schedule": "Yield Schedule",
+        "yield_schedule_info": "Change the expected yield from a given year, e.g. low rates now and higher rates later. Before the first entry, the expected yield applies.",
+        "invalid_schedule_ranges": "Ignored rows whose range ends before it starts: {rows}",
+        "yield_percentage": "Yield (%)",
+        "conversion_rate": "Conversion rate (%)",
+        "conversion_rate_info": "Share of the fund paid each year as a pension at retirement (of the extra-mandatory account in two-account mode).",
+        "bvg_accounts": "BVG mandatory and extra-mandatory accounts",
+        "two_accounts": "Separate mandatory and extra-mandatory accounts",
+        "two_accounts_info": "Splits the contributions by the BVG salary band: the part of the insurable salary up to the BVG upper limit is credited to the mandatory account at its own interest rate, the rest at the expected yield.",
+        "current_mandatory_value": "Current mandatory (BVG) value",
+        "mandatory_yield": "Mandatory interest rate (%)",
+        "bvg_upper_limit": "BVG upper salary limit",
+        "mandatory_conversion_rate": "Mandatory conversion rate (%)",
+        "payout_phase": "Payout Phase",
+        "payout_phase_info": "Compare taking the 2nd pillar capital as a lifelong annuity or as a lump sum that is invested and drawn down, together with your 1st pillar pension.",
+        "annuity_share": "Share taken as annuity (%)",
+        "annuity_share_info": "The rest of the capital is withdrawn as a lump sum, invested and drawn down in equal yearly amounts.",
+        "drawdown_yield": "Expected yield of the lump sum (%)",
+        "drawdown_end_age": "Lump sum used up by age",
+        "payout_mortality_table": "The ages at death follow the imported life table (see the pension calculator).",
+        "monte_carlo": "Simulate random returns and longevity",
+        "monte_carlo_info": "Draws random yearly returns of the lump sum and random ages at death (Monte Carlo).",
+        "return_volatility": "Return volatility (%)",
+        "scenarios": "Number of scenarios",
+        "capital_at_retirement": "Capital at retirement",
+        "first_year_income": "Income in the first year",
+        "income_after_drawdown": "Income after the drawdown",
+        "lump_sum": "Lump sum",
+        "yearly_withdrawal": "Yearly withdrawal",
+        "expected_lifetime_income": "Expected lifetime income",
+        "payout_income_by_age": "Yearly Income by Age",
+        "annuity": "Annuity",
+        "drawdown": "Lump sum withdrawal",
+        "source": "Source",
+        "payout_split_comparison": "Annuity / Lump Sum Comparison",
+        "lifetime_income_p10": "Lifetime income (10% worst case)",
+        "median_left_at_death": "Median lump sum left at death",
+        "annual_pension": "Annual Pension",
+        "epv_annuity": "Expected value of the annuity",
+        "epv_ahv": "Expected value of the 1st pillar pension",
+        "epv_info": "Expected present values at retirement: the pensions paid while alive according to the life table, discounted at the technical interest rate.",
+        "life_expectancy": "Life Expectancy",
+        "sex": "Sex",
+        "male": "Male",
+        "female": "Female",
+        "technical_interest_rate": "Technical interest rate (%)",
+        "technical_interest_rate_info": "Rate used to discount the future pension payments to the retirement date.",
+        "mortality_table": "Life Table",
+        "mortality_table_info": "Upload a CSV life table with an age column and the yearly mortality rates q(x) of men and women (as probabilities or per mille).",
+        "import_mortality_table": "Import Life Table",
+        "invalid_mortality_table": "Invalid life table. Please upload a CSV file with age, male and female columns.",
+        "imported_mortality_table": "Imported life table",
+        "ages": "ages",
+        "use_bundled_mortality_table": "Use Bundled Life Table",
+        "bundled_mortality_table": "Using the bundled life table (Gompertz-Makeham approximation of the Swiss mortality).",
+        "buy_ins": "Buy-ins",
+        "buy_ins_info": "Voluntary buy-ins (purchases) into the pension fund, paid at the start of the year into the main (extra-mandatory) account.",
+        "buy_in": "Buy-in",
+        "optimize_buy_ins": "Optimize Buy-ins",
+        "optimize_buy_ins_info": "Split a buy-in budget across the years to retirement to get the highest value at retirement, optionally including the income tax saved by deducting the buy-ins.",
+        "buy_in_budget": "Total buy-in budget (CHF)",
+        "buy_in_step": "Buy-in step (CHF)",
+        "yearly_buy_in_limit": "Maximum buy-in per year (CHF, 0 = no limit)",
+        "lock_years": "Years without buy-ins before retirement",
+        "optimize_after_tax": "Include tax savings",
+        "tax_table_info": "Progressive tax table: marginal tax rate applying from each taxable income on.",
+        "tax_rate": "Marginal tax rate (%)",
+        "fund_gain": "Fund value gained at retirement",
+        "tax_savings": "Tax savings",
+        "tax_saving": "Tax saving",
+        "value_at_retirement": "Value at retirement",
+        "apply_buy_in_schedule": "Apply Buy-in Schedule",
+        "no_buy_in_years": "No year allows a buy-in with the current settings.",
+        "historical_backtest": "Historical Backtest",
+        "historical_backtest_info": "Replay the contributions of each option against every rolling window of a historical annual return series instead of the expected yield.",
+        "import_return_series": "Import Return Series",
+        "invalid_return_series": "Invalid return series. Please upload a CSV file with year and return (%) columns.",
+        "imported_return_series": "Imported return series",
+        "use_bundled_return_series": "Use Bundled Return Series",
+        "bundled_return_series": "Using the bundled series of the BVG minimum interest rate (1985-2025).",
+        "wrap_windows": "Wrap windows around the series",
+        "wrap_windows_info": "Windows running past the last year of the series continue from its first year, so that every year is a start year.",
+        "no_backtest_windows": "The return series is shorter than the projection. Enable wrapping or import a longer series.",
+        "minimum": "Minimum",
+        "median": "Median",
+        "maximum": "Maximum",
+        "worst_start_year": "Worst start year",
+        "best_start_year": "Best start year",
+        "stochastic_simulation": "Stochastic Simulation",
+        "stochastic_simulation_info": "Simulate many paths with random salary growth and random yields, with correlated yearly shocks.",
+        "salary_volatility": "Salary growth volatility (%)",
+        "yield_volatility": "Yield volatility (%)",
+        "correlation": "Correlation salary / yield",
+        "paths": "Number of paths",
+        "seed": "Random seed",
+        "seed_info": "The same seed always gives the same results, whatever the number of workers.",
+        "workers": "Parallel workers",
+        "workers_info": "Number of processes used for large simulations (1 runs in the app process).",
+        "percentile_10": "10th percentile",
+        "percentile_90": "90th percentile",
+        "mean": "Mean",
+        "quantile_accuracy": "Quantile accuracy",
+        "quantile_accuracy_info": "Number of points kept per option and year to estimate the percentiles: more is more accurate and uses more memory, whatever the number of paths.",
+        "show_stochastic_bands": "Show stochastic bands",
+        "show_stochastic_bands_info": "Fan chart of the 10th to 90th percentiles of each plan, with the stochastic simulation settings of the pension calculator.",
+        "sensitivity_analysis": "Sensitivity Analysis",
+        "sensitivity_analysis_info": "How the final fund value changes when each input is lowered or raised by the chosen percentage (year counts move by at least one year).",
+        "sensitivity_change": "Change of each input (%)",
+        "contribution_rates": "Contribution rates",
+        "employer_view": "Employer View",
+        "employer_view_info": "Upload a CSV file of members (columns birth_date and current_salary, optionally maximum_salary, years_to_max_salary, retirement_age, current_pension_value, current_value_date, occupation_level, sex and department). The other settings are taken from the pension calculator, except its statement and buy-ins.",
+        "upload_members": "Upload members (CSV)",
+        "invalid_members": "Invalid members file. Please upload a CSV file with at least birth_date and current_salary columns.",
+        "total": "Total",
+        "department": "Department",
+        "age_band": "Age band",
+        "group_by": "Group by",
+        "group": "Group",
+        "members": "Members",
+        "active_members": "Active members",
+        "employer_contributions_by_year": "Employer Contributions by Year",
+        "aggregate_fund_value": "Aggregate Fund Value",
+        "what_if_shared_parameters": "What-if: shared plan parameters",
+        "what_if_shared_parameters_info": "Change the employer contribution rates or the coordination fees of all members. Only the members whose contributions change are re-evaluated, from the first affected year.",
+        "reset_to_plan": "Reset to the current settings",
+        "simulating_members": "Simulating the members...",
+        "members_reevaluated": "{count:,} of {total:,} members re-evaluated from {year}",
+        "export_projections": "Export Projections",
+        "file_format": "File format",
+        "frequency": "Frequency",
+        "download_projections": "Download projections",
+        "export_member_results": "Export Member Results",
+        "prepare_export": "Prepare export",
+        "download_member_results": "Download member results",
+        "keep_paths": "Keep every path on disk",
+        "keep_paths_info": "Writes the fund values of every path to a memory-mapped file, so that the paths can be browsed without holding them in memory.",
+        "first_path": "First path",
+        "path": "Path",
+        "paths_shown": "Paths {first:,} to {last:,} of {total:,}",
+        "statements_dropped": "{count} statement(s) after the retirement date were ignored."
     },
     "de": {
         "app_title": "4Sorge - Pensionskassen-Simulator",
@@ -425,7 +733,167 @@ TRANSLATIONS = {
         "reference_points": "Referenzpunkte",
         "is": "ist",
         "of": "von",
-        "exceeds": "überschreitet"
+        "exceeds": "überschreitet",
+        "import_income_history": "Einkommensverlauf importieren",
+        "import_income_history_info": "Laden Sie eine CSV-Datei mit einem Jahr und einem Einkommen pro Zeile hoch (z. B. einen Auszug aus dem individuellen Konto (IK)). Bestehende Einkommensbereiche werden ersetzt.",
+        "income_history_imported": "{0} Jahre Einkommensverlauf importiert.",
+        "invalid_income_history": "Die hochgeladene Datei konnte nicht gelesen werden. Bitte stellen Sie eine CSV-Datei mit einer Jahres- und einer Einkommensspalte bereit.",
+        "live_update": "Live-Aktualisierung",
+        "live_update_info": "Nach jeder Änderung automatisch neu berechnen. Wenn deaktiviert, werden Änderungen mit der Schaltfläche \"Neu berechnen\" übernommen.",
+        "recalculate": "Neu berechnen",
+        "full_resolution": "Volle Auflösung",
+        "full_resolution_info": "Lange Reihen werden auf die Punkte reduziert, die das Diagramm darstellen kann. Aktivieren Sie diese Option, um jede Periode zu zeichnen, z. B. um in Details zu zoomen.",
+        "calibrate_yield": "Rendite aus Ausweisen kalibrieren",
+        "calibrate_yield_info": "Laden Sie eine CSV-Datei mit einem Pensionskassenausweis pro Zeile hoch (Datum und Kassenwert). Die erzielte Rendite wird ab dem frühesten Ausweis an die Ausweise angepasst.",
+        "fit_contribution_correction": "Beitragskorrektur anpassen",
+        "fit_contribution_correction_info": "Skaliert zusätzlich die simulierten Beiträge, z. B. wenn frühere Gehälter vom aktuellen abweichen.",
+        "fitted_yield": "Angepasste Rendite",
+        "contribution_correction": "Beitragskorrektur",
+        "fit_error": "Anpassungsfehler (RMSE)",
+        "statement_value": "Ausweiswert",
+        "fitted_value": "Angepasster Wert",
+        "apply_fitted_yield": "Angepasste Rendite übernehmen",
+        "invalid_statements": "Die hochgeladene Datei konnte nicht gelesen werden. Bitte stellen Sie eine CSV-Datei mit einer Datums- und einer Kassenwertspalte und mindestens zwei Ausweisen innerhalb der Projektion bereit.",
+        "yield_schedule": "Renditeplan",
+        "yield_schedule_info": "Ändern Sie die erwartete Rendite ab einem bestimmten Jahr, z. B. jetzt tiefe und später höhere Zinsen. Vor dem ersten Eintrag gilt die erwartete Rendite.",
+        "invalid_schedule_ranges": "Ignorierte Zeilen, deren Bereich vor seinem Beginn endet: {rows}",
+        "yield_percentage": "Rendite (%)",
+        "conversion_rate": "Umwandlungssatz (%)",
+        "conversion_rate_info": "Anteil des Kapitals, der bei der Pensionierung jährlich als Rente ausbezahlt wird (im Zwei-Konten-Modus des überobligatorischen Kontos).",
+        "bvg_accounts": "BVG-obligatorisches und überobligatorisches Konto",
+        "two_accounts": "Obligatorisches und überobligatorisches Konto trennen",
+        "two_accounts_info": "Teilt die Beiträge nach dem BVG-Lohnband auf: Der Teil des versicherbaren Lohns bis zur oberen BVG-Grenze wird dem obligatorischen Konto zu dessen eigenem Zinssatz gutgeschrieben, der Rest zur erwarteten Rendite.",
+        "current_mandatory_value": "Aktuelles BVG-Altersguthaben",
+        "mandatory_yield": "Zinssatz obligatorisch (%)",
+        "bvg_upper_limit": "Oberer BVG-Grenzbetrag",
+        "mandatory_conversion_rate": "Umwandlungssatz obligatorisch (%)",
+        "payout_phase": "Bezugsphase",
+        "payout_phase_info": "Vergleichen Sie den Bezug des Kapitals der 2. Säule als lebenslange Rente oder als Kapital, das angelegt und schrittweise verbraucht wird, zusammen mit Ihrer Rente der 1. Säule.",
+        "annuity_share": "Rentenanteil (%)",
+        "annuity_share_info": "Der Rest des Kapitals wird als Kapital bezogen, angelegt und in gleichen jährlichen Beträgen verbraucht.",
+        "drawdown_yield": "Erwartete Rendite des Kapitals (%)",
+        "drawdown_end_age": "Kapital verbraucht bis Alter",
+        "payout_mortality_table": "Die Sterbealter folgen der importierten Sterbetafel (siehe Pensionsrechner).",
+        "monte_carlo": "Zufällige Renditen und Lebensdauer simulieren",
+        "monte_carlo_info": "Zieht zufällige jährliche Renditen des Kapitals und zufällige Sterbealter (Monte Carlo).",
+        "return_volatility": "Volatilität der Rendite (%)",
+        "scenarios": "Anzahl Szenarien",
+        "capital_at_retirement": "Kapital bei Pensionierung",
+        "first_year_income": "Einkommen im ersten Jahr",
+        "income_after_drawdown": "Einkommen nach dem Kapitalverzehr",
+        "lump_sum": "Kapitalbezug",
+        "yearly_withdrawal": "Jährlicher Bezug",
+        "expected_lifetime_income": "Erwartetes Lebenseinkommen",
+        "payout_income_by_age": "Jährliches Einkommen nach Alter",
+        "annuity": "Rente",
+        "drawdown": "Kapitalverzehr",
+        "source": "Quelle",
+        "payout_split_comparison": "Vergleich Rente / Kapital",
+        "lifetime_income_p10": "Lebenseinkommen (10% schlechtester Fall)",
+        "median_left_at_death": "Median des Restkapitals beim Tod",
+        "annual_pension": "Jährliche Rente",
+        "epv_annuity": "Erwartungswert der Rente",
+        "epv_ahv": "Erwartungswert der Rente der 1. Säule",
+        "epv_info": "Erwartete Barwerte bei Pensionierung: die gemäss Sterbetafel zu Lebzeiten bezahlten Renten, abgezinst mit dem technischen Zinssatz.",
+        "life_expectancy": "Lebenserwartung",
+        "sex": "Geschlecht",
+        "male": "Mann",
+        "female": "Frau",
+        "technical_interest_rate": "Technischer Zinssatz (%)",
+        "technical_interest_rate_info": "Zinssatz, mit dem die zukünftigen Rentenzahlungen auf das Pensionierungsdatum abgezinst werden.",
+        "mortality_table": "Sterbetafel",
+        "mortality_table_info": "Laden Sie eine CSV-Sterbetafel mit einer Altersspalte und den jährlichen Sterbewahrscheinlichkeiten q(x) von Männern und Frauen hoch (als Wahrscheinlichkeiten oder in Promille).",
+        "import_mortality_table": "Sterbetafel importieren",
+        "invalid_mortality_table": "Ungültige Sterbetafel. Bitte laden Sie eine CSV-Datei mit Spalten für Alter, Männer und Frauen hoch.",
+        "imported_mortality_table": "Importierte Sterbetafel",
+        "ages": "Altersjahre",
+        "use_bundled_mortality_table": "Mitgelieferte Sterbetafel verwenden",
+        "bundled_mortality_table": "Die mitgelieferte Sterbetafel wird verwendet (Gompertz-Makeham-Näherung der Schweizer Sterblichkeit).",
+        "buy_ins": "Einkäufe",
+        "buy_ins_info": "Freiwillige Einkäufe in die Pensionskasse, zu Beginn des Jahres auf das Haupt- (überobligatorische) Konto einbezahlt.",
+        "buy_in": "Einkauf",
+        "optimize_buy_ins": "Einkäufe optimieren",
+        "optimize_buy_ins_info": "Verteilen Sie ein Einkaufsbudget auf die Jahre bis zur Pensionierung, um den höchsten Wert bei Pensionierung zu erzielen, optional inklusive der durch den Abzug der Einkäufe gesparten Einkommenssteuer.",
+        "buy_in_budget": "Gesamtes Einkaufsbudget (CHF)",
+        "buy_in_step": "Einkaufsschritt (CHF)",
+        "yearly_buy_in_limit": "Maximaler Einkauf pro Jahr (CHF, 0 = keine Grenze)",
+        "lock_years": "Jahre ohne Einkäufe vor der Pensionierung",
+        "optimize_after_tax": "Steuerersparnis berücksichtigen",
+        "tax_table_info": "Progressiver Steuertarif: Grenzsteuersatz ab dem jeweiligen steuerbaren Einkommen.",
+        "tax_rate": "Grenzsteuersatz (%)",
+        "fund_gain": "Zusätzlicher Wert bei Pensionierung",
+        "tax_savings": "Steuerersparnis",
+        "tax_saving": "Steuerersparnis",
+        "value_at_retirement": "Wert bei Pensionierung",
+        "apply_buy_in_schedule": "Einkaufsplan übernehmen",
+        "no_buy_in_years": "Mit den aktuellen Einstellungen ist in keinem Jahr ein Einkauf möglich.",
+        "historical_backtest": "Historischer Backtest",
+        "historical_backtest_info": "Spielen Sie die Beiträge jeder Option anstelle der erwarteten Rendite mit jedem rollenden Zeitfenster einer historischen Jahresrenditereihe durch.",
+        "import_return_series": "Renditereihe importieren",
+        "invalid_return_series": "Ungültige Renditereihe. Bitte laden Sie eine CSV-Datei mit Spalten für Jahr und Rendite (%) hoch.",
+        "imported_return_series": "Importierte Renditereihe",
+        "use_bundled_return_series": "Mitgelieferte Renditereihe verwenden",
+        "bundled_return_series": "Die mitgelieferte Reihe des BVG-Mindestzinssatzes (1985-2025) wird verwendet.",
+        "wrap_windows": "Zeitfenster am Ende der Reihe fortsetzen",
+        "wrap_windows_info": "Zeitfenster, die über das letzte Jahr der Reihe hinausgehen, werden mit deren erstem Jahr fortgesetzt, sodass jedes Jahr ein Startjahr ist.",
+        "no_backtest_windows": "Die Renditereihe ist kürzer als die Projektion. Aktivieren Sie das Fortsetzen oder importieren Sie eine längere Reihe.",
+        "minimum": "Minimum",
+        "median": "Median",
+        "maximum": "Maximum",
+        "worst_start_year": "Schlechtestes Startjahr",
+        "best_start_year": "Bestes Startjahr",
+        "stochastic_simulation": "Stochastische Simulation",
+        "stochastic_simulation_info": "Simulieren Sie viele Pfade mit zufälligem Lohnwachstum und zufälligen Renditen, mit korrelierten jährlichen Schocks.",
+        "salary_volatility": "Volatilität des Lohnwachstums (%)",
+        "yield_volatility": "Volatilität der Rendite (%)",
+        "correlation": "Korrelation Lohn / Rendite",
+        "paths": "Anzahl Pfade",
+        "seed": "Zufallsstartwert",
+        "seed_info": "Derselbe Startwert ergibt immer dieselben Ergebnisse, unabhängig von der Anzahl Prozesse.",
+        "workers": "Parallele Prozesse",
+        "workers_info": "Anzahl Prozesse für grosse Simulationen (1 rechnet im App-Prozess).",
+        "percentile_10": "10. Perzentil",
+        "percentile_90": "90. Perzentil",
+        "mean": "Mittelwert",
+        "quantile_accuracy": "Genauigkeit der Perzentile",
+        "quantile_accuracy_info": "Anzahl der pro Option und Jahr gespeicherten Punkte zur Schätzung der Perzentile: mehr ist genauer und braucht mehr Speicher, unabhängig von der Anzahl Pfade.",
+        "show_stochastic_bands": "Stochastische Bänder anzeigen",
+        "show_stochastic_bands_info": "Fächerdiagramm vom 10. bis 90. Perzentil jedes Plans, mit den Einstellungen der stochastischen Simulation des Pensionsrechners.",
+        "sensitivity_analysis": "Sensitivitätsanalyse",
+        "sensitivity_analysis_info": "Wie sich der Endwert ändert, wenn jede Eingabe um den gewählten Prozentsatz gesenkt oder erhöht wird (Jahresangaben ändern sich um mindestens ein Jahr).",
+        "sensitivity_change": "Änderung jeder Eingabe (%)",
+        "contribution_rates": "Beitragssätze",
+        "employer_view": "Arbeitgebersicht",
+        "employer_view_info": "Laden Sie eine CSV-Datei der Versicherten hoch (Spalten birth_date und current_salary, optional maximum_salary, years_to_max_salary, retirement_age, current_pension_value, current_value_date, occupation_level, sex und department). Die übrigen Einstellungen stammen aus dem Pensionsrechner, ausser dessen Kontoauszug und Einkäufen.",
+        "upload_members": "Versicherte hochladen (CSV)",
+        "invalid_members": "Ungültige Versichertendatei. Bitte laden Sie eine CSV-Datei mit mindestens den Spalten birth_date und current_salary hoch.",
+        "total": "Total",
+        "department": "Abteilung",
+        "age_band": "Altersgruppe",
+        "group_by": "Gruppieren nach",
+        "group": "Gruppe",
+        "members": "Versicherte",
+        "active_members": "Aktive Versicherte",
+        "employer_contributions_by_year": "Arbeitgeberbeiträge pro Jahr",
+        "aggregate_fund_value": "Gesamtes Guthaben",
+        "what_if_shared_parameters": "Was-wäre-wenn: gemeinsame Planparameter",
+        "what_if_shared_parameters_info": "Ändern Sie die Arbeitgeberbeiträge oder die Koordinationsbeträge aller Versicherten. Nur die Versicherten, deren Beiträge sich ändern, werden ab dem ersten betroffenen Jahr neu berechnet.",
+        "reset_to_plan": "Auf die aktuellen Einstellungen zurücksetzen",
+        "simulating_members": "Versicherte werden simuliert...",
+        "members_reevaluated": "{count:,} von {total:,} Versicherten ab {year} neu berechnet",
+        "export_projections": "Projektionen exportieren",
+        "file_format": "Dateiformat",
+        "frequency": "Häufigkeit",
+        "download_projections": "Projektionen herunterladen",
+        "export_member_results": "Ergebnisse der Versicherten exportieren",
+        "prepare_export": "Export vorbereiten",
+        "download_member_results": "Ergebnisse der Versicherten herunterladen",
+        "keep_paths": "Alle Pfade auf der Festplatte behalten",
+        "keep_paths_info": "Schreibt die Kassenwerte aller Pfade in eine speicherabgebildete Datei, damit die Pfade durchsucht werden können, ohne sie im Speicher zu halten.",
+        "first_path": "Erster Pfad",
+        "path": "Pfad",
+        "paths_shown": "Pfade {first:,} bis {last:,} von {total:,}",
+        "statements_dropped": "{count} Auszug/Auszüge nach dem Pensionierungsdatum wurden ignoriert."
     },
     "fr": {
         "app_title": "4Sorge - Simulateur de caisse de pension",
@@ -585,7 +1053,167 @@ TRANSLATIONS = {
         "reference_points": "Points de référence",
         "is": "est",
         "of": "de",
-        "exceeds": "dépasse"
+        "exceeds": "dépasse",
+        "import_income_history": "Importer l'historique des revenus",
+        "import_income_history_info": "Chargez un fichier CSV avec une année et un revenu par ligne (p. ex. un extrait du compte individuel (CI)). Les plages de revenus existantes sont remplacées.",
+        "income_history_imported": "{0} années d'historique des revenus importées.",
+        "invalid_income_history": "Le fichier chargé n'a pas pu être lu. Veuillez fournir un fichier CSV avec une colonne année et une colonne revenu.",
+        "live_update": "Mise à jour en direct",
+        "live_update_info": "Recalculer automatiquement après chaque modification. Si désactivé, les modifications sont appliquées avec le bouton \"Recalculer\".",
+        "recalculate": "Recalculer",
+        "full_resolution": "Pleine résolution",
+        "full_resolution_info": "Les longues séries sont réduites aux points que le graphique peut afficher. Activez cette option pour dessiner chaque période, p. ex. pour zoomer sur les détails.",
+        "calibrate_yield": "Calibrer le rendement à partir des certificats",
+        "calibrate_yield_info": "Chargez un fichier CSV avec un certificat de caisse de pension par ligne (date et valeur du fonds). Le rendement réalisé est ajusté aux certificats, à partir du plus ancien.",
+        "fit_contribution_correction": "Ajuster une correction des cotisations",
+        "fit_contribution_correction_info": "Met aussi à l'échelle les cotisations simulées, p. ex. lorsque les salaires passés diffèrent du salaire actuel.",
+        "fitted_yield": "Rendement ajusté",
+        "contribution_correction": "Correction des cotisations",
+        "fit_error": "Erreur d'ajustement (RMSE)",
+        "statement_value": "Valeur du certificat",
+        "fitted_value": "Valeur ajustée",
+        "apply_fitted_yield": "Appliquer le rendement ajusté",
+        "invalid_statements": "Le fichier chargé n'a pas pu être lu. Veuillez fournir un fichier CSV avec une colonne date et une colonne valeur du fonds et au moins deux certificats dans la projection.",
+        "yield_schedule": "Calendrier de rendement",
+        "yield_schedule_info": "Modifiez le rendement attendu à partir d'une année donnée, p. ex. des taux bas maintenant et plus élevés plus tard. Avant la première entrée, le rendement attendu s'applique.",
+        "invalid_schedule_ranges": "Lignes ignorées dont la plage se termine avant son début : {rows}",
+        "yield_percentage": "Rendement (%)",
+        "conversion_rate": "Taux de conversion (%)",
+        "conversion_rate_info": "Part du capital versée chaque année sous forme de rente à la retraite (du compte surobligatoire en mode deux comptes).",
+        "bvg_accounts": "Comptes LPP obligatoire et surobligatoire",
+        "two_accounts": "Séparer les comptes obligatoire et surobligatoire",
+        "two_accounts_info": "Répartit les cotisations selon la tranche de salaire LPP : la part du salaire assurable jusqu'à la limite supérieure LPP est créditée au compte obligatoire à son propre taux d'intérêt, le reste au rendement attendu.",
+        "current_mandatory_value": "Avoir de vieillesse LPP actuel",
+        "mandatory_yield": "Taux d'intérêt obligatoire (%)",
+        "bvg_upper_limit": "Limite supérieure du salaire LPP",
+        "mandatory_conversion_rate": "Taux de conversion obligatoire (%)",
+        "payout_phase": "Phase de versement",
+        "payout_phase_info": "Comparez le retrait du capital du 2e pilier sous forme de rente viagère ou de capital placé et consommé progressivement, avec votre rente du 1er pilier.",
+        "annuity_share": "Part en rente (%)",
+        "annuity_share_info": "Le reste du capital est retiré sous forme de capital, placé et consommé par montants annuels égaux.",
+        "drawdown_yield": "Rendement attendu du capital (%)",
+        "drawdown_end_age": "Capital consommé à l'âge de",
+        "payout_mortality_table": "Les âges de décès suivent la table de mortalité importée (voir le calculateur de pension).",
+        "monte_carlo": "Simuler des rendements et une longévité aléatoires",
+        "monte_carlo_info": "Tire des rendements annuels aléatoires du capital et des âges de décès aléatoires (Monte Carlo).",
+        "return_volatility": "Volatilité du rendement (%)",
+        "scenarios": "Nombre de scénarios",
+        "capital_at_retirement": "Capital à la retraite",
+        "first_year_income": "Revenu la première année",
+        "income_after_drawdown": "Revenu après la consommation du capital",
+        "lump_sum": "Retrait en capital",
+        "yearly_withdrawal": "Retrait annuel",
+        "expected_lifetime_income": "Revenu attendu sur la vie",
+        "payout_income_by_age": "Revenu annuel par âge",
+        "annuity": "Rente",
+        "drawdown": "Retrait du capital",
+        "source": "Source",
+        "payout_split_comparison": "Comparaison rente / capital",
+        "lifetime_income_p10": "Revenu sur la vie (10% pire cas)",
+        "median_left_at_death": "Capital restant médian au décès",
+        "annual_pension": "Rente annuelle",
+        "epv_annuity": "Valeur attendue de la rente",
+        "epv_ahv": "Valeur attendue de la rente du 1er pilier",
+        "epv_info": "Valeurs actuelles attendues à la retraite : les rentes versées de son vivant selon la table de mortalité, actualisées au taux d'intérêt technique.",
+        "life_expectancy": "Espérance de vie",
+        "sex": "Sexe",
+        "male": "Homme",
+        "female": "Femme",
+        "technical_interest_rate": "Taux d'intérêt technique (%)",
+        "technical_interest_rate_info": "Taux utilisé pour actualiser les rentes futures à la date de la retraite.",
+        "mortality_table": "Table de mortalité",
+        "mortality_table_info": "Téléchargez une table de mortalité CSV avec une colonne d'âge et les taux de mortalité annuels q(x) des hommes et des femmes (en probabilités ou pour mille).",
+        "import_mortality_table": "Importer la table de mortalité",
+        "invalid_mortality_table": "Table de mortalité invalide. Veuillez télécharger un fichier CSV avec des colonnes âge, hommes et femmes.",
+        "imported_mortality_table": "Table de mortalité importée",
+        "ages": "âges",
+        "use_bundled_mortality_table": "Utiliser la table de mortalité intégrée",
+        "bundled_mortality_table": "La table de mortalité intégrée est utilisée (approximation de Gompertz-Makeham de la mortalité suisse).",
+        "buy_ins": "Rachats",
+        "buy_ins_info": "Rachats volontaires dans la caisse de pension, versés au début de l'année sur le compte principal (surobligatoire).",
+        "buy_in": "Rachat",
+        "optimize_buy_ins": "Optimiser les rachats",
+        "optimize_buy_ins_info": "Répartissez un budget de rachat sur les années jusqu'à la retraite pour obtenir la valeur la plus élevée à la retraite, en incluant optionnellement l'impôt sur le revenu économisé par la déduction des rachats.",
+        "buy_in_budget": "Budget total de rachat (CHF)",
+        "buy_in_step": "Pas de rachat (CHF)",
+        "yearly_buy_in_limit": "Rachat maximal par année (CHF, 0 = pas de limite)",
+        "lock_years": "Années sans rachat avant la retraite",
+        "optimize_after_tax": "Inclure les économies d'impôt",
+        "tax_table_info": "Barème d'impôt progressif : taux marginal applicable à partir de chaque revenu imposable.",
+        "tax_rate": "Taux marginal (%)",
+        "fund_gain": "Valeur gagnée à la retraite",
+        "tax_savings": "Économies d'impôt",
+        "tax_saving": "Économie d'impôt",
+        "value_at_retirement": "Valeur à la retraite",
+        "apply_buy_in_schedule": "Appliquer le plan de rachat",
+        "no_buy_in_years": "Aucune année ne permet un rachat avec les paramètres actuels.",
+        "historical_backtest": "Backtest historique",
+        "historical_backtest_info": "Rejouez les cotisations de chaque option avec chaque fenêtre glissante d'une série historique de rendements annuels au lieu du rendement attendu.",
+        "import_return_series": "Importer la série de rendements",
+        "invalid_return_series": "Série de rendements invalide. Veuillez télécharger un fichier CSV avec des colonnes année et rendement (%).",
+        "imported_return_series": "Série de rendements importée",
+        "use_bundled_return_series": "Utiliser la série de rendements intégrée",
+        "bundled_return_series": "La série intégrée du taux d'intérêt minimal LPP (1985-2025) est utilisée.",
+        "wrap_windows": "Continuer les fenêtres au début de la série",
+        "wrap_windows_info": "Les fenêtres dépassant la dernière année de la série continuent avec sa première année, de sorte que chaque année est une année de départ.",
+        "no_backtest_windows": "La série de rendements est plus courte que la projection. Activez la continuation ou importez une série plus longue.",
+        "minimum": "Minimum",
+        "median": "Médiane",
+        "maximum": "Maximum",
+        "worst_start_year": "Pire année de départ",
+        "best_start_year": "Meilleure année de départ",
+        "stochastic_simulation": "Simulation stochastique",
+        "stochastic_simulation_info": "Simulez de nombreux parcours avec une croissance salariale et des rendements aléatoires, avec des chocs annuels corrélés.",
+        "salary_volatility": "Volatilité de la croissance salariale (%)",
+        "yield_volatility": "Volatilité du rendement (%)",
+        "correlation": "Corrélation salaire / rendement",
+        "paths": "Nombre de parcours",
+        "seed": "Graine aléatoire",
+        "seed_info": "La même graine donne toujours les mêmes résultats, quel que soit le nombre de processus.",
+        "workers": "Processus parallèles",
+        "workers_info": "Nombre de processus utilisés pour les grandes simulations (1 calcule dans le processus de l'application).",
+        "percentile_10": "10e centile",
+        "percentile_90": "90e centile",
+        "mean": "Moyenne",
+        "quantile_accuracy": "Précision des centiles",
+        "quantile_accuracy_info": "Nombre de points conservés par option et par année pour estimer les centiles : plus est plus précis et utilise plus de mémoire, quel que soit le nombre de parcours.",
+        "show_stochastic_bands": "Afficher les bandes stochastiques",
+        "show_stochastic_bands_info": "Graphique en éventail du 10e au 90e centile de chaque plan, avec les paramètres de simulation stochastique du calculateur de pension.",
+        "sensitivity_analysis": "Analyse de sensibilité",
+        "sensitivity_analysis_info": "Comment la valeur finale change lorsque chaque paramètre est diminué ou augmenté du pourcentage choisi (les nombres d'années changent d'au moins une année).",
+        "sensitivity_change": "Variation de chaque paramètre (%)",
+        "contribution_rates": "Taux de cotisation",
+        "employer_view": "Vue employeur",
+        "employer_view_info": "Téléchargez un fichier CSV des assurés (colonnes birth_date et current_salary, optionnellement maximum_salary, years_to_max_salary, retirement_age, current_pension_value, current_value_date, occupation_level, sex et department). Les autres paramètres proviennent du calculateur de pension, sauf son relevé et ses rachats.",
+        "upload_members": "Télécharger les assurés (CSV)",
+        "invalid_members": "Fichier d'assurés invalide. Veuillez télécharger un fichier CSV avec au moins les colonnes birth_date et current_salary.",
+        "total": "Total",
+        "department": "Département",
+        "age_band": "Tranche d'âge",
+        "group_by": "Grouper par",
+        "group": "Groupe",
+        "members": "Assurés",
+        "active_members": "Assurés actifs",
+        "employer_contributions_by_year": "Cotisations de l'employeur par année",
+        "aggregate_fund_value": "Avoir total",
+        "what_if_shared_parameters": "Scénario : paramètres communs du plan",
+        "what_if_shared_parameters_info": "Modifiez les taux de cotisation de l'employeur ou les montants de coordination de tous les assurés. Seuls les assurés dont les cotisations changent sont recalculés, à partir de la première année concernée.",
+        "reset_to_plan": "Rétablir les paramètres actuels",
+        "simulating_members": "Simulation des assurés...",
+        "members_reevaluated": "{count:,} assurés sur {total:,} recalculés à partir de {year}",
+        "export_projections": "Exporter les projections",
+        "file_format": "Format de fichier",
+        "frequency": "Fréquence",
+        "download_projections": "Télécharger les projections",
+        "export_member_results": "Exporter les résultats des assurés",
+        "prepare_export": "Préparer l'export",
+        "download_member_results": "Télécharger les résultats des assurés",
+        "keep_paths": "Conserver tous les chemins sur le disque",
+        "keep_paths_info": "Écrit les valeurs du fonds de chaque chemin dans un fichier mappé en mémoire, afin de parcourir les chemins sans les garder en mémoire.",
+        "first_path": "Premier chemin",
+        "path": "Chemin",
+        "paths_shown": "Chemins {first:,} à {last:,} sur {total:,}",
+        "statements_dropped": "{count} relevé(s) après la date de retraite ont été ignorés."
     },
     "it": {
         "app_title": "4Sorge - Simulatore di fondi pensione",
@@ -745,7 +1373,167 @@ TRANSLATIONS = {
         "reference_points": "Punti di riferimento",
         "is": "è",
         "of": "del",
-        "exceeds": "supera"
+        "exceeds": "supera",
+        "import_income_history": "Importa lo storico dei redditi",
+        "import_income_history_info": "Carica un file CSV con un anno e un reddito per riga (ad es. un estratto del conto individuale (CI)). Le fasce di reddito esistenti vengono sostituite.",
+        "income_history_imported": "{0} anni di storico dei redditi importati.",
+        "invalid_income_history": "Impossibile leggere il file caricato. Fornisci un file CSV con una colonna anno e una colonna reddito.",
+        "live_update": "Aggiornamento in tempo reale",
+        "live_update_info": "Ricalcola automaticamente dopo ogni modifica. Se disattivato, le modifiche vengono applicate con il pulsante \"Ricalcola\".",
+        "recalculate": "Ricalcola",
+        "full_resolution": "Risoluzione completa",
+        "full_resolution_info": "Le serie lunghe vengono ridotte ai punti che il grafico può mostrare. Attiva questa opzione per disegnare ogni periodo, ad es. per ingrandire i dettagli.",
+        "calibrate_yield": "Calibra il rendimento dai certificati",
+        "calibrate_yield_info": "Carica un file CSV con un certificato della cassa pensioni per riga (data e valore del fondo). Il rendimento realizzato viene adattato ai certificati, a partire dal più vecchio.",
+        "fit_contribution_correction": "Adatta una correzione dei contributi",
+        "fit_contribution_correction_info": "Scala anche i contributi simulati, ad es. quando gli stipendi passati differiscono da quello attuale.",
+        "fitted_yield": "Rendimento adattato",
+        "contribution_correction": "Correzione dei contributi",
+        "fit_error": "Errore di adattamento (RMSE)",
+        "statement_value": "Valore del certificato",
+        "fitted_value": "Valore adattato",
+        "apply_fitted_yield": "Applica il rendimento adattato",
+        "invalid_statements": "Impossibile leggere il file caricato. Fornisci un file CSV con una colonna data e una colonna valore del fondo e almeno due certificati all'interno della proiezione.",
+        "yield_schedule": "Piano dei rendimenti",
+        "yield_schedule_info": "Modifica il rendimento previsto a partire da un determinato anno, ad es. tassi bassi ora e più alti in seguito. Prima della prima voce si applica il rendimento previsto.",
+        "invalid_schedule_ranges": "Righe ignorate il cui intervallo termina prima del suo inizio: {rows}",
+        "yield_percentage": "Rendimento (%)",
+        "conversion_rate": "Aliquota di conversione (%)",
+        "conversion_rate_info": "Quota del capitale versata ogni anno come rendita al pensionamento (del conto sovraobbligatorio in modalità a due conti).",
+        "bvg_accounts": "Conti LPP obbligatorio e sovraobbligatorio",
+        "two_accounts": "Separa i conti obbligatorio e sovraobbligatorio",
+        "two_accounts_info": "Suddivide i contributi secondo la fascia salariale LPP: la parte del salario assicurabile fino al limite superiore LPP è accreditata al conto obbligatorio al proprio tasso d'interesse, il resto al rendimento previsto.",
+        "current_mandatory_value": "Avere di vecchiaia LPP attuale",
+        "mandatory_yield": "Tasso d'interesse obbligatorio (%)",
+        "bvg_upper_limit": "Limite superiore del salario LPP",
+        "mandatory_conversion_rate": "Aliquota di conversione obbligatoria (%)",
+        "payout_phase": "Fase di erogazione",
+        "payout_phase_info": "Confronta il prelievo del capitale del 2° pilastro come rendita vitalizia o come capitale investito e consumato progressivamente, insieme alla rendita del 1° pilastro.",
+        "annuity_share": "Quota in rendita (%)",
+        "annuity_share_info": "Il resto del capitale viene prelevato come capitale, investito e consumato in importi annui uguali.",
+        "drawdown_yield": "Rendimento previsto del capitale (%)",
+        "drawdown_end_age": "Capitale consumato entro l'età",
+        "payout_mortality_table": "Le età di decesso seguono la tavola di mortalità importata (vedi il calcolatore pensionistico).",
+        "monte_carlo": "Simula rendimenti e longevità casuali",
+        "monte_carlo_info": "Estrae rendimenti annui casuali del capitale ed età di decesso casuali (Monte Carlo).",
+        "return_volatility": "Volatilità del rendimento (%)",
+        "scenarios": "Numero di scenari",
+        "capital_at_retirement": "Capitale al pensionamento",
+        "first_year_income": "Reddito nel primo anno",
+        "income_after_drawdown": "Reddito dopo il consumo del capitale",
+        "lump_sum": "Prelievo del capitale",
+        "yearly_withdrawal": "Prelievo annuo",
+        "expected_lifetime_income": "Reddito atteso sulla vita",
+        "payout_income_by_age": "Reddito annuo per età",
+        "annuity": "Rendita",
+        "drawdown": "Prelievo dal capitale",
+        "source": "Fonte",
+        "payout_split_comparison": "Confronto rendita / capitale",
+        "lifetime_income_p10": "Reddito sulla vita (10% caso peggiore)",
+        "median_left_at_death": "Capitale residuo mediano al decesso",
+        "annual_pension": "Rendita annua",
+        "epv_annuity": "Valore atteso della rendita",
+        "epv_ahv": "Valore atteso della rendita del 1° pilastro",
+        "epv_info": "Valori attuali attesi al pensionamento: le rendite versate in vita secondo la tavola di mortalità, scontate al tasso d'interesse tecnico.",
+        "life_expectancy": "Speranza di vita",
+        "sex": "Sesso",
+        "male": "Uomo",
+        "female": "Donna",
+        "technical_interest_rate": "Tasso d'interesse tecnico (%)",
+        "technical_interest_rate_info": "Tasso usato per scontare le rendite future alla data del pensionamento.",
+        "mortality_table": "Tavola di mortalità",
+        "mortality_table_info": "Carica una tavola di mortalità CSV con una colonna dell'età e i tassi di mortalità annui q(x) di uomini e donne (come probabilità o per mille).",
+        "import_mortality_table": "Importa tavola di mortalità",
+        "invalid_mortality_table": "Tavola di mortalità non valida. Carica un file CSV con colonne età, uomini e donne.",
+        "imported_mortality_table": "Tavola di mortalità importata",
+        "ages": "età",
+        "use_bundled_mortality_table": "Usa la tavola di mortalità integrata",
+        "bundled_mortality_table": "Viene usata la tavola di mortalità integrata (approssimazione di Gompertz-Makeham della mortalità svizzera).",
+        "buy_ins": "Riscatti",
+        "buy_ins_info": "Riscatti volontari nella cassa pensione, versati all'inizio dell'anno sul conto principale (sovraobbligatorio).",
+        "buy_in": "Riscatto",
+        "optimize_buy_ins": "Ottimizza i riscatti",
+        "optimize_buy_ins_info": "Ripartisci un budget di riscatto sugli anni fino al pensionamento per ottenere il valore più alto al pensionamento, includendo opzionalmente l'imposta sul reddito risparmiata deducendo i riscatti.",
+        "buy_in_budget": "Budget totale di riscatto (CHF)",
+        "buy_in_step": "Passo di riscatto (CHF)",
+        "yearly_buy_in_limit": "Riscatto massimo per anno (CHF, 0 = nessun limite)",
+        "lock_years": "Anni senza riscatti prima del pensionamento",
+        "optimize_after_tax": "Includi i risparmi fiscali",
+        "tax_table_info": "Tariffa fiscale progressiva: aliquota marginale applicata a partire da ogni reddito imponibile.",
+        "tax_rate": "Aliquota marginale (%)",
+        "fund_gain": "Valore guadagnato al pensionamento",
+        "tax_savings": "Risparmi fiscali",
+        "tax_saving": "Risparmio fiscale",
+        "value_at_retirement": "Valore al pensionamento",
+        "apply_buy_in_schedule": "Applica il piano di riscatto",
+        "no_buy_in_years": "Nessun anno consente un riscatto con le impostazioni attuali.",
+        "historical_backtest": "Backtest storico",
+        "historical_backtest_info": "Riproduci i contributi di ogni opzione con ogni finestra mobile di una serie storica di rendimenti annui invece del rendimento previsto.",
+        "import_return_series": "Importa serie di rendimenti",
+        "invalid_return_series": "Serie di rendimenti non valida. Carica un file CSV con colonne anno e rendimento (%).",
+        "imported_return_series": "Serie di rendimenti importata",
+        "use_bundled_return_series": "Usa la serie di rendimenti integrata",
+        "bundled_return_series": "Viene usata la serie integrata del tasso d'interesse minimo LPP (1985-2025).",
+        "wrap_windows": "Continua le finestre all'inizio della serie",
+        "wrap_windows_info": "Le finestre che superano l'ultimo anno della serie continuano con il suo primo anno, così ogni anno è un anno di partenza.",
+        "no_backtest_windows": "La serie di rendimenti è più corta della proiezione. Attiva la continuazione o importa una serie più lunga.",
+        "minimum": "Minimo",
+        "median": "Mediana",
+        "maximum": "Massimo",
+        "worst_start_year": "Peggior anno di partenza",
+        "best_start_year": "Miglior anno di partenza",
+        "stochastic_simulation": "Simulazione stocastica",
+        "stochastic_simulation_info": "Simula molti percorsi con crescita salariale e rendimenti casuali, con shock annuali correlati.",
+        "salary_volatility": "Volatilità della crescita salariale (%)",
+        "yield_volatility": "Volatilità del rendimento (%)",
+        "correlation": "Correlazione salario / rendimento",
+        "paths": "Numero di percorsi",
+        "seed": "Seme casuale",
+        "seed_info": "Lo stesso seme dà sempre gli stessi risultati, indipendentemente dal numero di processi.",
+        "workers": "Processi paralleli",
+        "workers_info": "Numero di processi usati per le grandi simulazioni (1 calcola nel processo dell'app).",
+        "percentile_10": "10° percentile",
+        "percentile_90": "90° percentile",
+        "mean": "Media",
+        "quantile_accuracy": "Precisione dei percentili",
+        "quantile_accuracy_info": "Numero di punti conservati per opzione e anno per stimare i percentili: di più è più preciso e usa più memoria, indipendentemente dal numero di percorsi.",
+        "show_stochastic_bands": "Mostra le bande stocastiche",
+        "show_stochastic_bands_info": "Grafico a ventaglio dal 10° al 90° percentile di ogni piano, con le impostazioni della simulazione stocastica del calcolatore pensionistico.",
+        "sensitivity_analysis": "Analisi di sensibilità",
+        "sensitivity_analysis_info": "Come cambia il valore finale quando ogni parametro viene ridotto o aumentato della percentuale scelta (i numeri di anni cambiano di almeno un anno).",
+        "sensitivity_change": "Variazione di ogni parametro (%)",
+        "contribution_rates": "Aliquote di contribuzione",
+        "employer_view": "Vista datore di lavoro",
+        "employer_view_info": "Carica un file CSV degli assicurati (colonne birth_date e current_salary, opzionalmente maximum_salary, years_to_max_salary, retirement_age, current_pension_value, current_value_date, occupation_level, sex e department). Le altre impostazioni provengono dal calcolatore pensionistico, tranne il suo estratto conto e i riscatti.",
+        "upload_members": "Carica gli assicurati (CSV)",
+        "invalid_members": "File degli assicurati non valido. Carica un file CSV con almeno le colonne birth_date e current_salary.",
+        "total": "Totale",
+        "department": "Reparto",
+        "age_band": "Fascia d'età",
+        "group_by": "Raggruppa per",
+        "group": "Gruppo",
+        "members": "Assicurati",
+        "active_members": "Assicurati attivi",
+        "employer_contributions_by_year": "Contributi del datore di lavoro per anno",
+        "aggregate_fund_value": "Avere totale",
+        "what_if_shared_parameters": "Scenario: parametri comuni del piano",
+        "what_if_shared_parameters_info": "Modifica i tassi di contribuzione del datore di lavoro o le trattenute di coordinamento di tutti gli assicurati. Solo gli assicurati i cui contributi cambiano vengono ricalcolati, a partire dal primo anno interessato.",
+        "reset_to_plan": "Ripristina le impostazioni attuali",
+        "simulating_members": "Simulazione degli assicurati...",
+        "members_reevaluated": "{count:,} assicurati su {total:,} ricalcolati dal {year}",
+        "export_projections": "Esporta le proiezioni",
+        "file_format": "Formato del file",
+        "frequency": "Frequenza",
+        "download_projections": "Scarica le proiezioni",
+        "export_member_results": "Esporta i risultati degli assicurati",
+        "prepare_export": "Prepara l'esportazione",
+        "download_member_results": "Scarica i risultati degli assicurati",
+        "keep_paths": "Conserva tutti i percorsi su disco",
+        "keep_paths_info": "Scrive i valori del fondo di ogni percorso in un file mappato in memoria, così i percorsi possono essere sfogliati senza tenerli in memoria.",
+        "first_path": "Primo percorso",
+        "path": "Percorso",
+        "paths_shown": "Percorsi da {first:,} a {last:,} di {total:,}",
+        "statements_dropped": "{count} estratto/i dopo la data di pensionamento sono stati ignorati."
     }
 }
 
@@ -812,53 +1600,57 @@ def import_data(uploaded_file):
         #st.sidebar.write(f"Debug: Unexpected error: {str(e)}")
         return False
 
-# Pension calculation functions remain the same
-def get_personal_contribution(age, personal_contribution_ranges, option_index):
-    """Get personal contribution percentage for a specific age and option."""
-    for range_data in personal_contribution_ranges:
-        if range_data["age_from"] <= age <= range_data["age_to"]:
-            if option_index < len(range_data["options"]):
-                return range_data["options"][option_index]
-    return 0.0
-
-def get_employer_contribution(age, employer_contributions):
-    """Get employer contribution percentage for a specific age."""
-    for contrib in employer_contributions:
-        if contrib["age_from"] <= age <= contrib["age_to"]:
-            return contrib["percentage"]
-    return 0.0
-
-
-def get_coordination_fee(year, coordination_fees):
-    """Get coordination fee for a specific year."""
-    applicable_fee = 0
-    for fee_entry in sorted(coordination_fees, key=lambda x: x["from_year"]):
-        if year >= fee_entry["from_year"]:
-            applicable_fee = fee_entry["amount"]
-    return applicable_fee
-
-
-def get_occupation_level(year, occupation_levels):
-    """Get occupation level for a specific year."""
-    applicable_level = 100.0
-    for level_entry in sorted(occupation_levels, key=lambda x: x["from_year"]):
-        if year >= level_entry["from_year"]:
-            applicable_level = level_entry["percentage"]
-    return applicable_level / 100.0  # Return as decimal (e.g., 0.8 for 80%)
+# Pension calculation functions
+def get_age_range_values(ranges, ages, get_value):
+    """
+    Look up an age range schedule for an array of ages.
+    
+    Parameters:
+    - ranges: List of ranges with "age_from" and "age_to"
+    - ages: Array of ages
+    - get_value: Function returning the value of a range, or None to skip the range
+    
+    Returns:
+    - Numpy array with the value of the first matching range (0.0 when no range matches)
+    """
+    ages = np.asarray(ages)
+    values = np.zeros(ages.shape)
+    matched = np.zeros(ages.shape, dtype=bool)
+    for range_data in ranges:
+        value = get_value(range_data)
+        if value is None:
+            continue
+        in_range = (range_data["age_from"] <= ages) & (ages <= range_data["age_to"]) & ~matched
+        values[in_range] = value
+        matched |= in_range
+    return values
+
+def get_personal_contributions(ages, personal_contribution_ranges, option_index):
+    """Get personal contribution percentages for an array of ages and one option."""
+    return get_age_range_values(
+        personal_contribution_ranges,
+        ages,
+        lambda range_data: range_data["options"][option_index] if option_index < len(range_data["options"]) else None
+    )
+
+def get_employer_contributions(ages, employer_contributions):
+    """Get employer contribution percentages for an array of ages."""
+    return get_age_range_values(employer_contributions, ages, lambda contrib: contrib["percentage"])
 
 
 def calculate_salary(current_salary, max_salary, years_to_max, years_from_now):
-    """Calculate salary at a specific future year based on growth projection."""
-    if years_from_now >= years_to_max:
-        return max_salary
-    if years_to_max == 0:
-        return current_salary
-    growth_rate = (max_salary / current_salary) ** (1 / years_to_max) - 1
-    return current_salary * (1 + growth_rate) ** years_from_now
+    """Calculate salary at a specific future year (or an array of years) based on growth projection."""
+    years_from_now = np.asarray(years_from_now, dtype=float)
+    if years_to_max == 0 or current_salary == 0:
+        growth_rate = 0.0
+    else:
+        growth_rate = (max_salary / current_salary) ** (1 / years_to_max) - 1
+    salary = np.where(years_from_now >= years_to_max, max_salary, current_salary * (1 + growth_rate) ** years_from_now)
+    return salary if salary.ndim else float(salary)
 
 
 def calculate_yearly_salary_with_bonus(base_salary, has_13th_salary, bonus_type, bonus_percentage, bonus_fixed):
-    """Calculate total yearly salary including 13th salary and bonus."""
+    """Calculate total yearly salary (or an array of yearly salaries) including 13th salary and bonus."""
     yearly_salary = base_salary
     
     if has_13th_salary:
@@ -874,16 +1666,57 @@ def calculate_yearly_salary_with_bonus(base_salary, has_13th_salary, bonus_type,
     return yearly_salary
 
 
-def simulate_pension(birth_date, retirement_age, current_salary, max_salary, years_to_max,
-                    yield_rate, personal_contribution_option_index, 
-                    personal_contribution_ranges, employer_contributions,
-                    current_pension_value=0, current_value_date=None,
-                    has_13th_salary=False, bonus_type="percentage", 
-                    bonus_percentage=0.0, bonus_fixed=0.0, monthly=False,
-                    coordination_fees=None, occupation_levels=None):
-    """Simulate pension fund growth over time."""
-    birth_date = datetime.strptime(birth_date, "%Y-%m-%d").date()
+# Vectorized simulation engine
+def build_period_dates(start_date, end_date, monthly=False):
+    """
+    Build the dates of the projection periods from start_date up to end_date.
+    
+    Matches repeatedly adding relativedelta(months=1) (or years=1) to start_date:
+    the day is clipped to the length of the month and, once clipped, stays clipped.
+    
+    Returns:
+    - Numpy datetime64[D] array
+    """
+    step = 1 if monthly else 12
+    first_month = (start_date.year - 1970) * 12 + start_date.month - 1
+    last_month = (end_date.year - 1970) * 12 + end_date.month - 1
+    months = (first_month + step * np.arange((last_month - first_month) // step + 1)).astype("datetime64[M]")
+    days_in_month = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(int)
+    days = np.minimum.accumulate(np.minimum(start_date.day, days_in_month))
+    dates = months.astype("datetime64[D]") + (days - 1)
+    return dates[dates <= np.datetime64(end_date)]
+
+def completed_years(dates, reference_date):
+    """
+    Count the completed years between reference_date and each date.
+    
+    Vectorized equivalent of relativedelta(date, reference_date).years for dates
+    on or after reference_date (earlier dates give a negative count).
+    """
+    months = dates.astype("datetime64[M]")
+    days = (dates - months.astype("datetime64[D]")).astype(int) + 1
+    days_in_month = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(int)
+    reference_month = (reference_date.year - 1970) * 12 + reference_date.month - 1
+    # The month is not complete before the (clipped) day of the reference date
+    total_months = months.astype(int) - reference_month - (days < np.minimum(reference_date.day, days_in_month))
+    return total_months // 12
+
+def compile_plan(plan_settings, monthly=False, option_indices=(0, 1, 2)):
+    """
+    Compile the settings of a plan into per-period arrays.
+    
+    Parameters:
+    - plan_settings: Settings of the plan (see get_plan_settings)
+    - monthly: Whether to compile monthly periods (with 13th month periods) instead of yearly ones
+    - option_indices: Personal contribution options to compile
+    
+    Returns:
+    - Dictionary of numpy arrays with the periods on the last axis, or None when
+      the projection starts on or after the retirement date
+    """
+    birth_date = datetime.strptime(plan_settings["birth_date"], "%Y-%m-%d").date()
     
+    current_value_date = plan_settings["current_value_date"]
     if current_value_date:
         if isinstance(current_value_date, str):
             current_value_date = datetime.strptime(current_value_date, "%Y-%m-%d").date()
@@ -891,355 +1724,1860 @@ def simulate_pension(birth_date, retirement_age, current_salary, max_salary, yea
     else:
         start_date = birth_date + relativedelta(years=18)
     
-    retirement_date = birth_date + relativedelta(years=retirement_age)
+    retirement_date = birth_date + relativedelta(years=plan_settings["retirement_age"])
     
     if start_date >= retirement_date:
-        return pd.DataFrame()
+        return None
+    
+    dates = build_period_dates(start_date, retirement_date, monthly)
+    years = dates.astype("datetime64[Y]").astype(int) + 1970
+    ages = completed_years(dates, birth_date)
+    
+    # Calculate the base salary, adjusted by the occupation level of each year
+    years_elapsed = np.maximum(0, completed_years(dates, date.today()))
+    base_salary = calculate_salary(
+        plan_settings["current_salary"],
+        plan_settings["maximum_salary"],
+        plan_settings["years_to_max_salary"],
+        years_elapsed
+    )
+    occupation_levels = compile_from_year_values(plan_settings["occupation_levels"], years, "percentage", 100.0) / 100.0
+    adjusted_base_salary = base_salary * occupation_levels
+    coordination_fees = compile_from_year_values(plan_settings["coordination_fees"], years, "amount", 0)
+    
+    bonus_type = plan_settings["bonus_type"]
+    bonus_percentage = plan_settings["bonus_percentage"]
+    bonus_fixed = plan_settings["bonus_fixed"]
+    is_13th_month = np.zeros(len(dates), dtype=bool)
     
-    # Create monthly projection if requested
     if monthly:
-        dates = []
-        ages = []
-        years = []
-        salaries = []
-        insurable_salaries = []
-        personal_contribs = []
-        employer_contribs = []
-        monthly_contributions = []
-        fund_values = []
-        # Add a flag to identify 13th month
-        is_13th_month = []
-        
-        current_fund_value = current_pension_value
-        current_date = start_date
-        
-        while current_date <= retirement_date:
-            # Regular month processing
-            dates.append(pd.Timestamp(current_date))
-            year = current_date.year
-            years.append(year)
-            age = relativedelta(current_date, birth_date).years
-            ages.append(age)
-            is_13th_month.append(False)  # Regular month
-            
-            # Calculate base salary for this month
-            years_elapsed = relativedelta(current_date, date.today()).years
-            base_salary = calculate_salary(current_salary, max_salary, years_to_max, max(0, years_elapsed))
-            
-            # Get occupation level for this year
-            occupation_level = get_occupation_level(year, occupation_levels)
-            adjusted_base_salary = base_salary * occupation_level
-            
-            # Monthly salary (1/12 of annual)
-            monthly_base = adjusted_base_salary / 12
-            monthly_salary = monthly_base
-            
-            # Add any bonus amount to the monthly salary
-            if bonus_type == "percentage" and bonus_percentage > 0:
-                monthly_salary += (adjusted_base_salary * bonus_percentage / 100) / 12
-            elif bonus_type == "fixed" and bonus_fixed > 0:
-                monthly_salary += bonus_fixed / 12
-            
-            salaries.append(monthly_salary)
-            
-            # Get coordination fee for this year
-            coordination_fee = get_coordination_fee(year, coordination_fees)
-            monthly_coord_fee = coordination_fee / 12
-            
-            # Calculate insurable salary
-            monthly_insurable_salary = max(0, monthly_salary - monthly_coord_fee)
-            insurable_salaries.append(monthly_insurable_salary)
-            
-            # Calculate contributions
-            personal_contribution_rate = get_personal_contribution(age, personal_contribution_ranges, personal_contribution_option_index)
-            personal_contrib = monthly_insurable_salary * (personal_contribution_rate / 100)
-            employer_contrib = monthly_insurable_salary * (get_employer_contribution(age, employer_contributions) / 100)
-            
-            personal_contribs.append(personal_contrib)
-            employer_contribs.append(employer_contrib)
-            
-            monthly_contribution = personal_contrib + employer_contrib
-            monthly_contributions.append(monthly_contribution)
-            
-            # Calculate fund value including yield (monthly compounding)
-            monthly_yield = (1 + yield_rate / 100) ** (1/12) - 1
-            current_fund_value = current_fund_value * (1 + monthly_yield) + monthly_contribution
-            fund_values.append(current_fund_value)
-            
-            # Add 13th month if December and has_13th_salary
-            if has_13th_salary and current_date.month == 12:
-                # Add 13th month right after December
-                # Use same date as December but mark it as 13th month
-                dates.append(pd.Timestamp(current_date))
-                years.append(year)
-                ages.append(age)
-                is_13th_month.append(True)  # Mark as 13th month
-                
-                # 13th month has the base monthly salary
-                salaries.append(monthly_base)
-                
-                # Calculate insurable salary for 13th month
-                thirteenth_insurable = max(0, monthly_base - monthly_coord_fee)
-                insurable_salaries.append(thirteenth_insurable)
-                
-                # Calculate contributions for 13th month
-                thirteenth_personal = thirteenth_insurable * (personal_contribution_rate / 100)
-                thirteenth_employer = thirteenth_insurable * (get_employer_contribution(age, employer_contributions) / 100)
-                
-                personal_contribs.append(thirteenth_personal)
-                employer_contribs.append(thirteenth_employer)
-                
-                thirteenth_contribution = thirteenth_personal + thirteenth_employer
-                monthly_contributions.append(thirteenth_contribution)
-                
-                # Calculate fund value after 13th month
-                current_fund_value = current_fund_value * (1 + monthly_yield) + thirteenth_contribution
-                fund_values.append(current_fund_value)
-            
-            # Move to next month
-            current_date += relativedelta(months=1)
-        
-        # Create DataFrame with all the columns including the 13th month flag
-        df = pd.DataFrame({
-            "Date": dates,
-            "Year": years,
-            "Age": ages,
-            "Salary": salaries,
-            "Insurable Salary": insurable_salaries,
-            "Personal Contribution": personal_contribs,
-            "Employer Contribution": employer_contribs,
-            "Total Contribution": monthly_contributions,
-            "Fund Value": fund_values,
-            "Is13thMonth": is_13th_month
-        })
+        monthly_base = adjusted_base_salary / 12
+        salaries = monthly_base.copy()
+        if bonus_type == "percentage" and bonus_percentage > 0:
+            salaries += (adjusted_base_salary * bonus_percentage / 100) / 12
+        elif bonus_type == "fixed" and bonus_fixed > 0:
+            salaries += bonus_fixed / 12
+        coordination_fees = coordination_fees / 12
         
-        return df
-    else:
-        # Original yearly projection code remains unchanged
-        dates = []
-        ages = []
-        years = []
-        salaries = []
-        insurable_salaries = []
-        personal_contribs = []
-        employer_contribs = []
-        yearly_contributions = []
-        fund_values = []
-        
-        current_fund_value = current_pension_value
-        current_date = start_date
-        
-        while current_date <= retirement_date:
-            dates.append(pd.Timestamp(current_date))
-            year = current_date.year
-            years.append(year)
-            age = relativedelta(current_date, birth_date).years
-            ages.append(age)
+        if plan_settings["has_13th_salary"]:
+            # Repeat each December as a 13th month period with the base monthly salary
+            is_december = dates.astype("datetime64[M]").astype(int) % 12 == 11
+            counts = 1 + is_december
+            period_index = np.repeat(np.arange(len(dates)), counts)
+            is_13th_month = np.zeros(len(period_index), dtype=bool)
+            is_13th_month[(np.cumsum(counts) - 1)[is_december]] = True
             
-            # Calculate base salary for this year
-            years_elapsed = relativedelta(current_date, date.today()).years
-            base_salary = calculate_salary(current_salary, max_salary, years_to_max, max(0, years_elapsed))
-            
-            # Get occupation level for this year
-            occupation_level = get_occupation_level(year, occupation_levels)
-            adjusted_base_salary = base_salary * occupation_level
-            
-            # Calculate total yearly salary including 13th and bonus
-            yearly_salary = calculate_yearly_salary_with_bonus(
-                adjusted_base_salary, has_13th_salary, bonus_type, bonus_percentage, bonus_fixed
-            )
-            
-            # Get coordination fee for this year
-            coordination_fee = get_coordination_fee(year, coordination_fees)
-            
-            # Calculate insurable salary (yearly salary - coordination fee)
-            insurable_salary = max(0, yearly_salary - coordination_fee)
-            
-            salaries.append(yearly_salary)
-            insurable_salaries.append(insurable_salary)
-            
-            # Calculate contributions based on insurable salary
-            personal_contribution_rate = get_personal_contribution(age, personal_contribution_ranges, personal_contribution_option_index)
-            personal_contrib = insurable_salary * (personal_contribution_rate / 100)
-            employer_contrib = insurable_salary * (get_employer_contribution(age, employer_contributions) / 100)
-            
-            personal_contribs.append(personal_contrib)
-            employer_contribs.append(employer_contrib)
-            
-            yearly_contribution = personal_contrib + employer_contrib
-            yearly_contributions.append(yearly_contribution)
-            
-            # Calculate fund value including yield
-            current_fund_value = current_fund_value * (1 + yield_rate / 100) + yearly_contribution
-            fund_values.append(current_fund_value)
-            
-            current_date += relativedelta(years=1)
-        
-        df = pd.DataFrame({
-            "Date": dates,
-            "Year": years,
-            "Age": ages,
-            "Salary": salaries,
-            "Insurable Salary": insurable_salaries,
-            "Personal Contribution": personal_contribs,
-            "Employer Contribution": employer_contribs,
-            "Total Contribution": yearly_contributions,
-            "Fund Value": fund_values
-        })
-        df["Date"] = pd.to_datetime(df["Date"])  # Ensure datetime type
-        return df
+            dates, years, ages = dates[period_index], years[period_index], ages[period_index]
+            salaries = np.where(is_13th_month, monthly_base[period_index], salaries[period_index])
+            coordination_fees = coordination_fees[period_index]
+    else:
+        salaries = calculate_yearly_salary_with_bonus(
+            adjusted_base_salary, plan_settings["has_13th_salary"], bonus_type, bonus_percentage, bonus_fixed
+        )
+    
+    # Compile the growth factor of each period once (the expected yield applies
+    # until the first entry of the yield schedule)
+    yields = compile_from_year_values(plan_settings["yield_schedule"], years, "yield", plan_settings["expected_yield"])
+    growth = (1 + yields / 100) ** (1/12) if monthly else 1 + yields / 100
+    
+    # Calculate contributions based on the insurable salary
+    upper_limit = plan_settings["bvg_upper_limit"] / 12 if monthly else plan_settings["bvg_upper_limit"]
+    insurable_salaries, account_shares = split_insurable_salaries(
+        salaries, coordination_fees, plan_settings["two_accounts"], upper_limit
+    )
+    personal_rates = np.array([
+        get_personal_contributions(ages, plan_settings["personal_contribution_ranges"], option_index)
+        for option_index in option_indices
+    ]).reshape(len(option_indices), len(dates))
+    employer_rates = get_employer_contributions(ages, plan_settings["employer_contributions"])
+    
+    # The mandatory account is credited at its own rate
+    if plan_settings["two_accounts"]:
+        mandatory_growth = np.full(len(dates), 1 + plan_settings["mandatory_yield"] / 100)
+        if monthly:
+            mandatory_growth = mandatory_growth ** (1/12)
+        growth = np.stack([growth, mandatory_growth])
+    else:
+        growth = growth[None, :]
+    
+    # Voluntary buy-ins are paid in the first period of their year, into the main account
+    is_first_of_year = np.concatenate([[True], years[1:] != years[:-1]])
+    buy_ins = np.where(is_first_of_year, compile_year_amounts(plan_settings["buy_ins"], years), 0.0)
+    
+    return {
+        "dates": dates,
+        "years": years,
+        "ages": ages,
+        "is_13th_month": is_13th_month,
+        "salaries": salaries,
+        "insurable_salaries": insurable_salaries,
+        "coordination_fees": coordination_fees,
+        "personal_rates": personal_rates,
+        "employer_rates": employer_rates,
+        "personal_contributions": insurable_salaries * (personal_rates / 100),
+        "employer_contributions": insurable_salaries * (employer_rates / 100),
+        "buy_ins": buy_ins,
+        "account_shares": account_shares,
+        "growth": growth,
+        "start_values": get_account_start_values(
+            plan_settings["current_pension_value"], plan_settings["current_mandatory_value"], len(account_shares)
+        ),
+        "monthly": monthly
+    }
 
-def get_print_css():
-    """Return minimal CSS styling for the app"""
-    return """
-        <style>
-        /* Basic styling for the app */
-        .dataframe {
-            width: 100%;
-            max-width: 100%;
-        }
-        </style>
+def split_insurable_salaries(salaries, coordination_fees, two_accounts, upper_limit):
+    """
+    Get the insurable salaries and the share of each account (main account first).
+    
+    In two-account mode, the part of the insurable salary within the BVG salary band
+    goes to the mandatory account. Periods are on the last axis and the leading axes
+    (e.g. members) broadcast.
+    
+    Parameters:
+    - salaries: Salary of each period
+    - coordination_fees: Coordination fee of each period
+    - two_accounts: Whether to split between the main and the mandatory account
+    - upper_limit: BVG upper salary limit of a period
+    
+    Returns:
+    - Tuple of the insurable salaries and the (..., accounts, periods) account shares
     """
+    insurable_salaries = np.maximum(0, salaries - coordination_fees)
+    if not two_accounts:
+        return insurable_salaries, np.ones(insurable_salaries.shape[:-1] + (1, insurable_salaries.shape[-1]))
+    mandatory_salaries = np.maximum(0, np.minimum(salaries, upper_limit) - coordination_fees)
+    mandatory_shares = np.divide(
+        mandatory_salaries, insurable_salaries, out=np.zeros(insurable_salaries.shape), where=insurable_salaries > 0
+    )
+    return insurable_salaries, np.stack([1 - mandatory_shares, mandatory_shares], axis=-2)
 
-def generate_printable_html(simulations, is_monthly=False):
+def get_account_start_values(current_pension_value, current_mandatory_value, n_accounts):
+    """Split the current pension value between the accounts (main account first)."""
+    if n_accounts == 1:
+        return np.array([float(current_pension_value)])
+    mandatory_value = min(float(current_mandatory_value), float(current_pension_value))
+    return np.array([float(current_pension_value) - mandatory_value, mandatory_value])
+
+def accumulate_fund(start_value, growth, contributions):
     """
-    Generate a standalone HTML document for printing
+    Accumulate fund values F[t] = F[t-1] * growth[t] + contributions[t] without a Python loop.
+    
+    Uses the closed form F[t] = G[t] * (F[-1] + sum(contributions[k] / G[k] for k <= t)),
+    with G the cumulative growth. Periods are on the last axis and the leading axes
+    (e.g. plans and options) broadcast.
     
     Parameters:
-    - simulations: List of DataFrames with simulation results
-    - is_monthly: Whether the view is monthly or yearly
+    - start_value: Fund value before the first period (scalar or array of the leading axes)
+    - growth: Growth factor of each period (e.g. 1.02 for a 2% yield)
+    - contributions: Contributions of each period
     
     Returns:
-    - HTML string of the printable document
+    - Numpy array with the fund value at the end of each period
     """
-    if not simulations:
-        return None
+    cumulative_growth = np.cumprod(growth, axis=-1)
+    start_value = np.expand_dims(np.asarray(start_value, dtype=float), -1)
+    return cumulative_growth * (start_value + np.cumsum(contributions / cumulative_growth, axis=-1))
+
+def plan_contributions(compiled):
+    """Get the contributions of a compiled plan, buy-ins included, as an (options, accounts, periods) array."""
+    contributions = (compiled["personal_contributions"] + compiled["employer_contributions"])[:, None, :] * compiled["account_shares"]
+    contributions[:, 0] += compiled["buy_ins"]
+    return contributions
+
+def plan_period_columns(compiled, account_values, option_position):
+    """
+    Get the projection columns of one contribution option of a compiled plan.
     
-    # Prepare data for each section
-    final_values_data = []
-    for sim in simulations:
-        final_value = sim["Fund Value"].iloc[-1]
-        option_name = sim["Option"].iloc[0]
-        final_values_data.append({"Option": option_name, "Final Value": final_value})
+    Parameters:
+    - compiled: Compiled plan, or a range of its periods
+    - account_values: (options, accounts, periods) fund values of the same periods
+    - option_position: Position of the option in the compiled plan
     
-    # Convert to HTML tables
-    final_values_df = pd.DataFrame(final_values_data)
-    final_values_html = final_values_df.style.format({"Final Value": "CHF {:,.0f}"}).to_html()
+    Returns:
+    - Dictionary of column name: numpy array, the two account columns only for
+      two-account plans and "Is13thMonth" only for monthly plans
+    """
+    personal_contributions = compiled["personal_contributions"][option_position]
+    columns = {
+        "Date": compiled["dates"],
+        "Year": compiled["years"].astype(np.int16),
+        "Age": compiled["ages"].astype(np.int16),
+        "Salary": compiled["salaries"],
+        "Insurable Salary": compiled["insurable_salaries"],
+        "Personal Contribution": personal_contributions,
+        "Employer Contribution": compiled["employer_contributions"],
+        "Buy-in": compiled["buy_ins"],
+        "Total Contribution": personal_contributions + compiled["employer_contributions"] + compiled["buy_ins"],
+        "Fund Value": account_values[option_position].sum(axis=0)
+    }
+    if account_values.shape[1] == 2:
+        columns["Extra-mandatory Fund Value"] = account_values[option_position, 0]
+        columns["Mandatory Fund Value"] = account_values[option_position, 1]
+    if compiled["monthly"]:
+        columns["Is13thMonth"] = compiled["is_13th_month"]
+    return columns
+
+def iter_compiled_chunks(compiled, chunk_size=SIMULATION_CHUNK_SIZE):
+    """
+    Simulate a compiled plan lazily, one fixed-size chunk of periods at a time.
     
-    # Create detailed tables for each option
-    detailed_tables = []
-    for sim in simulations:
-        option_name = sim["Option"].iloc[0]
-        
-        # Format the table
-        if is_monthly:
-            detailed_df = sim.copy()
-            
-            # Format month display with special handling for 13th month
-            def format_month(row):
-                if row.get("Is13thMonth", False):
-                    # Format based on language
-                    year = row["Year"]
-                    if st.session_state.language == "de":
-                        return f"13er {year}"
-                    elif st.session_state.language == "fr":
-                        return f"13e {year}"
-                    elif st.session_state.language == "it":
-                        return f"13a {year}"
-                    else:  # default/english
-                        return f"13th {year}"
-                else:
-                    return row["Date"].strftime("%b %Y")
-            
-            detailed_df["Month"] = detailed_df.apply(format_month, axis=1)
-            columns_to_show = ["Month", "Age", "Salary", "Insurable Salary", "Personal Contribution", "Employer Contribution", "Total Contribution", "Fund Value"]
-        else:
-            detailed_df = sim.copy()
-            detailed_df["Year"] = detailed_df["Date"].dt.year
-            columns_to_show = ["Year", "Age", "Salary", "Insurable Salary", "Personal Contribution", "Employer Contribution", "Total Contribution", "Fund Value"]
-        
-        formatted_df = detailed_df[columns_to_show].style.format({
-            "Salary": "CHF {:,.0f}",
-            "Insurable Salary": "CHF {:,.0f}",
-            "Personal Contribution": "CHF {:,.0f}",
-            "Employer Contribution": "CHF {:,.0f}",
-            "Total Contribution": "CHF {:,.0f}",
-            "Fund Value": "CHF {:,.0f}"
-        })
+    The fund value of each option and account is carried from one chunk to the
+    next, so only the columns of one chunk exist at once.
+    
+    Parameters:
+    - compiled: Compiled plan (see compile_plan)
+    - chunk_size: Number of periods per chunk
+    
+    Yields:
+    - Dictionary of "Option" (position of the option in the compiled plan) and the
+      projection columns (see plan_period_columns), with the rows of each option in turn
+    """
+    n_options = len(compiled["personal_contributions"])
+    entering_values = np.broadcast_to(compiled["start_values"], (n_options, len(compiled["start_values"])))
+    
+    for start in range(0, len(compiled["dates"]), chunk_size):
+        chunk = {
+            key: value[..., start:start + chunk_size] if isinstance(value, np.ndarray) and key != "start_values" else value
+            for key, value in compiled.items()
+        }
+        account_values = accumulate_fund(entering_values, chunk["growth"], plan_contributions(chunk))
+        entering_values = account_values[..., -1]
         
-        table_html = formatted_df.to_html()
-        detailed_tables.append((option_name, table_html))
+        option_columns = [plan_period_columns(chunk, account_values, i) for i in range(n_options)]
+        yield {
+            "Option": np.repeat(np.arange(n_options, dtype=np.int8), len(chunk["dates"])),
+            **{name: np.concatenate([columns[name] for columns in option_columns]) for name in option_columns[0]}
+        }
+
+def iter_plan_chunks(plan_settings, monthly=False, chunk_size=SIMULATION_CHUNK_SIZE):
+    """Simulate the 3 personal contribution options of a plan lazily (see iter_compiled_chunks)."""
+    compiled = compile_plan(plan_settings, monthly)
+    if compiled is not None:
+        yield from iter_compiled_chunks(compiled, chunk_size)
+
+def iter_plans_chunks(plan_settings_list, monthly=False, chunk_size=SIMULATION_CHUNK_SIZE):
+    """
+    Simulate many plans lazily, one plan and one chunk of periods at a time.
     
-    # Generate charts for comparison and each option
-    import io
-    import base64
-    import plotly.io as pio
+    Yields:
+    - The chunks of each plan in turn (see iter_compiled_chunks), with the position
+      of the plan in a "Plan" column
+    """
+    for plan_position, plan_settings in enumerate(plan_settings_list):
+        for chunk in iter_plan_chunks(plan_settings, monthly, chunk_size):
+            yield {"Plan": np.full(len(chunk["Option"]), plan_position, dtype=np.int32), **chunk}
+
+def collect_plan_chunks(chunks):
+    """
+    Collect the chunks of one plan into one projection DataFrame per option.
     
-    # Comparison chart
-    combined_df = pd.concat(simulations)
-    fig_comparison = px.line(combined_df, x="Age", y="Fund Value", color="Option",
-                title=t("fund_growth_comparison"),
-                labels={"Fund Value": t("total_fund_value"), "Age": t("age")})
+    This is the DataFrame adapter of the streaming simulation used by the app; the
+    "Buy-in" column is only kept when the plan has buy-ins.
     
-    fig_comparison.update_layout(
-        height=500,
-        margin=dict(l=50, r=50, t=80, b=50),
-        paper_bgcolor='white',
-        plot_bgcolor='white'
-    )
+    Returns:
+    - List of DataFrames in option order (empty when there are no chunks)
+    """
+    chunks = list(chunks)
+    if not chunks:
+        return []
+    
+    columns = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+    options = columns.pop("Option")
+    columns["Date"] = columns["Date"].astype("datetime64[ns]")
+    df = pd.DataFrame(columns)
+    if not columns["Buy-in"].any():
+        df = df.drop(columns="Buy-in")
+    return [df[options == i].reset_index(drop=True) for i in np.unique(options)]
+
+def build_checkpoints(compiled):
+    """
+    Build compact yearly checkpoints of a compiled plan.
     
-    comparison_chart_img = pio.to_image(fig_comparison, format="png", width=800, height=400)
-    comparison_chart_base64 = base64.b64encode(comparison_chart_img).decode('utf-8')
+    Each checkpoint holds the schedule cursor (period index) of the first period of a
+    calendar year and the buy-in of that year, which a compile starting later in the
+    year pays in its first period. The salaries, rates and growth of every later
+    period are in the compiled arrays, and a statement replaces the fund value, so
+    this is all the state a restart within the year needs.
     
-    # Contribution charts
-    contribution_charts = []
-    for sim in simulations:
-        option_name = sim["Option"].iloc[0]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=sim["Age"],
-            y=sim["Personal Contribution"],
-            name=t("personal_contribution"),
-            marker_color='#1f77b4'
-        ))
-        fig.add_trace(go.Bar(
-            x=sim["Age"],
-            y=sim["Employer Contribution"],
-            name=t("employer_contribution"),
-            marker_color='#72b7ec'
-        ))
-        fig.update_layout(
-            barmode="stack",
-            title=f"{t('annual_contributions')} - {option_name}",
-            xaxis_title=t("age"),
-            yaxis_title=t("total_contribution"),
-            height=400,
-            margin=dict(l=50, r=50, t=80, b=50),
-            paper_bgcolor='white',
-            plot_bgcolor='white'
-        )
-        
-        chart_img = pio.to_image(fig, format="png", width=800, height=400)
-        chart_base64 = base64.b64encode(chart_img).decode('utf-8')
-        contribution_charts.append((option_name, chart_base64))
+    Returns:
+    - Dictionary with the "years", "periods" and "buy_ins" of the checkpoints
+    """
+    years = compiled["years"]
+    periods = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+    return {"years": years[periods], "periods": periods, "buy_ins": compiled["buy_ins"][periods]}
+
+def find_statement_period(compiled, checkpoints, statement_date):
+    """
+    Find the period of a compiled plan starting on a statement date.
     
-    # Build the complete HTML document with proper page breaks
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Pension Fund Report</title>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                margin: 0;
-                padding: 0;
-            }}
-            .page {{
-                page-break-after: always;
-                padding: 20px 30px;
-            }}
+    The yearly checkpoint of the statement year gives the schedule cursor, so only
+    the periods of that year are searched.
+    
+    Returns:
+    - Tuple of the index of the checkpoint and of the period, or None when the
+      statement date is not a period date of the plan
+    """
+    year_index = np.searchsorted(checkpoints["years"], statement_date.year)
+    if year_index == len(checkpoints["years"]) or checkpoints["years"][year_index] != statement_date.year:
+        return None
+    
+    first = checkpoints["periods"][year_index]
+    last = checkpoints["periods"][year_index + 1] if year_index + 1 < len(checkpoints["periods"]) else len(compiled["dates"])
+    period = first + np.searchsorted(compiled["dates"][first:last], np.datetime64(statement_date))
+    if period == last or compiled["dates"][period] != np.datetime64(statement_date):
+        return None
+    return int(year_index), int(period)
+
+def reanchor_plan(compiled, checkpoints, statement_date, statement_value, mandatory_value=0):
+    """
+    Re-anchor a compiled plan on a new statement without compiling it again.
+    
+    When the statement date is a period date of the plan, the periods from the
+    statement on are those a compile from that date gives, except for the buy-in of
+    the statement year: a compile from the statement pays it in its first period,
+    so it is restored there from the checkpoint of the year.
+    
+    Returns:
+    - The compiled plan starting at the statement, or None when it needs a full compile
+    """
+    found = find_statement_period(compiled, checkpoints, statement_date)
+    if found is None:
+        return None
+    year_index, period = found
+    
+    reanchored = {key: value[..., period:] if isinstance(value, np.ndarray) else value for key, value in compiled.items()}
+    reanchored["buy_ins"] = reanchored["buy_ins"].copy()
+    reanchored["buy_ins"][0] = checkpoints["buy_ins"][year_index]
+    reanchored["start_values"] = get_account_start_values(statement_value, mandatory_value, len(compiled["start_values"]))
+    return reanchored
+
+def simulate_pension(birth_date, retirement_age, current_salary, max_salary, years_to_max,
+                    yield_rate, personal_contribution_option_index, 
+                    personal_contribution_ranges, employer_contributions,
+                    current_pension_value=0, current_value_date=None,
+                    has_13th_salary=False, bonus_type="percentage", 
+                    bonus_percentage=0.0, bonus_fixed=0.0, monthly=False,
+                    coordination_fees=None, occupation_levels=None, yield_schedule=None,
+                    two_accounts=False, current_mandatory_value=0, bvg_upper_limit=88200, mandatory_yield=1.25):
+    """Simulate pension fund growth over time."""
+    compiled = compile_plan({
+        "birth_date": birth_date,
+        "retirement_age": retirement_age,
+        "current_salary": current_salary,
+        "maximum_salary": max_salary,
+        "years_to_max_salary": years_to_max,
+        "expected_yield": yield_rate,
+        "personal_contribution_ranges": personal_contribution_ranges,
+        "employer_contributions": employer_contributions,
+        "current_pension_value": current_pension_value,
+        "current_value_date": current_value_date,
+        "has_13th_salary": has_13th_salary,
+        "bonus_type": bonus_type,
+        "bonus_percentage": bonus_percentage,
+        "bonus_fixed": bonus_fixed,
+        "coordination_fees": coordination_fees,
+        "occupation_levels": occupation_levels,
+        "yield_schedule": yield_schedule,
+        "two_accounts": two_accounts,
+        "current_mandatory_value": current_mandatory_value,
+        "bvg_upper_limit": bvg_upper_limit,
+        "mandatory_yield": mandatory_yield,
+        "buy_ins": []
+    }, monthly, (personal_contribution_option_index,))
+    
+    if compiled is None:
+        return pd.DataFrame()
+    
+    return collect_plan_chunks(iter_compiled_chunks(compiled))[0]
+
+def get_plan_settings(plan_data):
+    """Extract the settings of a pension plan (or of the current settings) used for the simulation."""
+    return {
+        "birth_date": plan_data["birth_date"],
+        "retirement_age": plan_data["retirement_age"],
+        "current_salary": plan_data["current_salary"],
+        "maximum_salary": plan_data["maximum_salary"],
+        "years_to_max_salary": plan_data["years_to_max_salary"],
+        "expected_yield": plan_data["expected_yield"],
+        "personal_contribution_ranges": plan_data.get("personal_contribution_ranges", DEFAULT_PENSION_DATA["personal_contribution_ranges"]),
+        "employer_contributions": plan_data["employer_contributions"],
+        "current_pension_value": plan_data["current_pension_value"],
+        "current_value_date": plan_data["current_value_date"],
+        "has_13th_salary": plan_data.get("has_13th_salary", False),
+        "bonus_type": plan_data.get("bonus_type", "percentage"),
+        "bonus_percentage": plan_data.get("bonus_percentage", 0.0),
+        "bonus_fixed": plan_data.get("bonus_fixed", 0.0),
+        "coordination_fees": plan_data.get("coordination_fees", DEFAULT_PENSION_DATA["coordination_fees"]),
+        "occupation_levels": plan_data.get("occupation_levels", DEFAULT_PENSION_DATA["occupation_levels"]),
+        "yield_schedule": plan_data.get("yield_schedule", DEFAULT_PENSION_DATA["yield_schedule"]),
+        "conversion_rate": plan_data.get("conversion_rate", DEFAULT_PENSION_DATA["conversion_rate"]),
+        "two_accounts": plan_data.get("two_accounts", DEFAULT_PENSION_DATA["two_accounts"]),
+        "current_mandatory_value": plan_data.get("current_mandatory_value", DEFAULT_PENSION_DATA["current_mandatory_value"]),
+        "bvg_upper_limit": plan_data.get("bvg_upper_limit", DEFAULT_PENSION_DATA["bvg_upper_limit"]),
+        "mandatory_yield": plan_data.get("mandatory_yield", DEFAULT_PENSION_DATA["mandatory_yield"]),
+        "mandatory_conversion_rate": plan_data.get("mandatory_conversion_rate", DEFAULT_PENSION_DATA["mandatory_conversion_rate"]),
+        "buy_ins": plan_data.get("buy_ins", DEFAULT_PENSION_DATA["buy_ins"]),
+        "sex": plan_data.get("sex", DEFAULT_PENSION_DATA["sex"]),
+        "technical_interest_rate": plan_data.get("technical_interest_rate", DEFAULT_PENSION_DATA["technical_interest_rate"])
+    }
+
+def simulate_plan(plan_settings, monthly=False):
+    """Simulate the 3 personal contribution options of a plan (empty list when it starts after retirement)."""
+    return collect_plan_chunks(iter_plan_chunks(plan_settings, monthly))
+
+@st.cache_data(show_spinner=False, max_entries=500)
+def cached_simulate_plan(plan_settings, monthly=False):
+    """
+    Cached version of simulate_plan.
+    
+    Keyed on the plan settings only, so reruns that do not change any input
+    (e.g. toggling a view or checking a date) do not re-simulate.
+    """
+    return simulate_plan(plan_settings, monthly)
+
+@st.cache_data(show_spinner=False, max_entries=500)
+def cached_compile_plan(plan_settings, monthly=False):
+    """Cached version of compile_plan, so only plans whose settings changed are compiled again."""
+    return compile_plan(plan_settings, monthly)
+
+def get_compiled_plan(plan_settings, monthly=False):
+    """
+    Get the compiled plan, restarting from the stored checkpoints when only the
+    statement (current pension value and its date) changed since the plan was compiled.
+    """
+    store = st.session_state.setdefault("plan_checkpoints", {})
+    statement_keys = ("current_pension_value", "current_value_date", "current_mandatory_value")
+    schedule_settings = {key: value for key, value in plan_settings.items() if key not in statement_keys}
+    store_key = json.dumps([schedule_settings, monthly], sort_keys=True, default=str)
+    
+    statement_date = plan_settings["current_value_date"]
+    if isinstance(statement_date, str):
+        statement_date = datetime.strptime(statement_date, "%Y-%m-%d").date()
+    
+    stored = store.get(store_key)
+    if stored is not None and statement_date:
+        compiled = reanchor_plan(
+            stored["compiled"],
+            stored["checkpoints"],
+            statement_date,
+            plan_settings["current_pension_value"],
+            plan_settings["current_mandatory_value"]
+        )
+        if compiled is not None:
+            return compiled
+    
+    compiled = cached_compile_plan(plan_settings, monthly)
+    if compiled is not None:
+        # Keep the plan compiled from the earliest date, later statements restart from it
+        if stored is None or compiled["dates"][0] < stored["compiled"]["dates"][0]:
+            store.pop(store_key, None)
+            store[store_key] = {"compiled": compiled, "checkpoints": build_checkpoints(compiled)}
+            if len(store) > CHECKPOINT_STORE_SIZE:
+                store.pop(next(iter(store)))
+    return compiled
+
+def stack_compiled_plans(compiled_plans):
+    """
+    Stack compiled plans into (plans, ..., periods) arrays padded to the longest plan.
+    
+    Single-account plans leave the second account empty, and the padding periods
+    have no contribution and no growth (None plans are all padding).
+    
+    Returns:
+    - Dictionary with the "start_values" (plans, accounts), "growth" (plans, accounts, periods),
+      "contributions" (plans, options, accounts, periods), "personal_contributions"
+      (plans, options, periods), "personal_rates" (plans, options, periods), "employer_contributions",
+      "employer_rates", "salaries", "coordination_fees", "buy_ins", "dates", "ages" and "years"
+      (plans, periods) and the number of periods of each plan in "lengths"
+    """
+    lengths = np.array([0 if compiled is None else len(compiled["dates"]) for compiled in compiled_plans], dtype=int)
+    n_plans, n_periods = len(compiled_plans), max(int(lengths.max(initial=0)), 1)
+    
+    stacked = {
+        "start_values": np.zeros((n_plans, 2)),
+        "growth": np.ones((n_plans, 2, n_periods)),
+        "contributions": np.zeros((n_plans, 3, 2, n_periods)),
+        "personal_contributions": np.zeros((n_plans, 3, n_periods)),
+        "personal_rates": np.zeros((n_plans, 3, n_periods)),
+        "employer_contributions": np.zeros((n_plans, n_periods)),
+        "employer_rates": np.zeros((n_plans, n_periods)),
+        "salaries": np.zeros((n_plans, n_periods)),
+        "coordination_fees": np.zeros((n_plans, n_periods)),
+        "buy_ins": np.zeros((n_plans, n_periods)),
+        "dates": np.full((n_plans, n_periods), np.datetime64("NaT"), dtype="datetime64[D]"),
+        "ages": np.zeros((n_plans, n_periods), dtype=int),
+        "years": np.zeros((n_plans, n_periods), dtype=int),
+        "lengths": lengths
+    }
+    
+    for p, compiled in enumerate(compiled_plans):
+        if compiled is None:
+            continue
+        n, n_accounts = lengths[p], len(compiled["start_values"])
+        stacked["start_values"][p, :n_accounts] = compiled["start_values"]
+        stacked["growth"][p, :n_accounts, :n] = compiled["growth"]
+        stacked["contributions"][p, :, :n_accounts, :n] = plan_contributions(compiled)
+        stacked["personal_contributions"][p, :, :n] = compiled["personal_contributions"]
+        for name in ("personal_rates", "employer_contributions", "employer_rates", "salaries", "coordination_fees", "buy_ins"):
+            stacked[name][p, ..., :n] = compiled[name]
+        stacked["dates"][p, :n] = compiled["dates"]
+        stacked["ages"][p, :n] = compiled["ages"]
+        stacked["years"][p, :n] = compiled["years"]
+    return stacked
+
+def simulate_plans_batch(plan_settings_list, monthly=False):
+    """
+    Simulate the 3 contribution options of many plans in one vectorized pass.
+    
+    The compiled plans are stacked into (plans, options, accounts, periods) arrays
+    (single-account plans leave the second account empty), padded to the longest
+    plan with no contribution and no growth, so the fund value of a plan stays
+    constant after its retirement.
+    
+    Returns:
+    - Dictionary with the stacked "fund_values" and "contributions" of each plan and
+      option, "account_values", "ages" and "years", and the number of periods of
+      each plan in "lengths" (0 when it starts after retirement)
+    """
+    compiled_plans = [get_compiled_plan(plan_settings, monthly) for plan_settings in plan_settings_list]
+    stacked = stack_compiled_plans(compiled_plans)
+    start_values, growth, contributions = stacked["start_values"], stacked["growth"], stacked["contributions"]
+    account_values = accumulate_fund(start_values[:, None], growth[:, None], contributions)
+    
+    return {
+        "fund_values": account_values.sum(axis=2),
+        "account_values": account_values,
+        "start_values": start_values,
+        "growth": growth,
+        "contributions": contributions.sum(axis=2),
+        "dates": stacked["dates"],
+        "ages": stacked["ages"],
+        "years": stacked["years"],
+        "lengths": stacked["lengths"]
+    }
+
+def compare_plans(plan_settings_list, plan_names, option_labels, monthly=False,
+                  mortality_rates=None, ahv_annual=0.0, ahv_age_offset=0, display_dtype=np.float64):
+    """
+    Compare the contribution options of many plans with grouped vectorized reductions.
+    
+    Parameters:
+    - plan_settings_list: Settings of each plan (see get_plan_settings)
+    - plan_names: Name of each plan
+    - option_labels: Label of each of the 3 contribution options
+    - monthly: Whether to compare monthly instead of yearly projections
+    - mortality_rates: Life table used for the expected present values (default: bundled table)
+    - ahv_annual: Annual 1st pillar pension (one value or one per plan)
+    - ahv_age_offset: Years between the retirement and the start of the 1st pillar pension
+      (one value or one per plan)
+    - display_dtype: Type of the fund values of the long-format frame, which is only
+      charted (e.g. np.float32 to halve them)
+    
+    Returns:
+    - Tuple of the long-format fund growth frame ("Age" and "Year" as int16, "Fund Value",
+      categorical "Plan" and "Contribution Option") and the summary frame with one row
+      per plan and option
+    """
+    batch = simulate_plans_batch(plan_settings_list, monthly)
+    fund_values = batch["fund_values"]
+    lengths = batch["lengths"]
+    n_plans, n_options, n_periods = fund_values.shape
+    
+    # Plans starting after retirement have no projection
+    valid = np.repeat(lengths > 0, n_options)
+    last_period = np.maximum(lengths - 1, 0)
+    final_values = np.take_along_axis(fund_values, last_period[:, None, None], axis=-1)[..., 0]
+    starting_values = fund_values[..., 0]
+    # Calendar years between the first and the last period, the same in yearly and monthly mode
+    years_to_retirement = np.take_along_axis(batch["years"], last_period[:, None], axis=-1)[:, 0] - batch["years"][:, 0]
+    average_contributions = batch["contributions"].sum(axis=-1) / np.maximum(lengths, 1)[:, None]
+    
+    # Annual pension of both accounts (the second one is empty for single-account plans)
+    final_accounts = np.take_along_axis(batch["account_values"], last_period[:, None, None, None], axis=-1)[..., 0]
+    conversion_rates = np.array([
+        [plan_settings["conversion_rate"], plan_settings["mandatory_conversion_rate"]]
+        for plan_settings in plan_settings_list
+    ]) / 100
+    annual_pensions = (final_accounts * conversion_rates[:, None, :]).sum(axis=-1)
+    
+    # Expected present values at retirement of every plan and option at once
+    retirement_ages = np.repeat([plan_settings["retirement_age"] for plan_settings in plan_settings_list], n_options)
+    annuity_values, ahv_values = expected_present_values(
+        get_mortality_rates() if mortality_rates is None else mortality_rates,
+        np.repeat([plan_settings["sex"] for plan_settings in plan_settings_list], n_options),
+        retirement_ages,
+        annual_pensions.ravel(),
+        np.repeat(np.broadcast_to(ahv_annual, n_plans), n_options),
+        retirement_ages + np.repeat(np.maximum(np.broadcast_to(ahv_age_offset, n_plans), 0), n_options),
+        np.repeat([plan_settings["technical_interest_rate"] for plan_settings in plan_settings_list], n_options)
+    )
+    
+    summary_df = pd.DataFrame({
+        "Plan": np.repeat(plan_names, n_options),
+        "Option": np.tile(option_labels, n_plans),
+        "Starting Value": starting_values.ravel(),
+        "Final Value": final_values.ravel(),
+        "Total Growth": (final_values - starting_values).ravel(),
+        "Average Contribution": average_contributions.ravel(),
+        "Years to Retirement": np.repeat(years_to_retirement, n_options),
+        "Annual Pension": annual_pensions.ravel(),
+        "EPV Annuity": annuity_values,
+        "EPV AHV": ahv_values
+    })[valid].reset_index(drop=True)
+    
+    # Keep only the periods of each plan, in plan, option, period order, with the
+    # labels as categorical codes (plans with the same name share a category)
+    in_projection = np.broadcast_to((np.arange(n_periods) < lengths[:, None])[:, None, :], fund_values.shape)
+    plan_codes, plan_categories = pd.factorize(pd.Series(plan_names))
+    comparison_df = pd.DataFrame({
+        "Age": np.broadcast_to(batch["ages"][:, None, :], fund_values.shape)[in_projection].astype(np.int16),
+        "Year": np.broadcast_to(batch["years"][:, None, :], fund_values.shape)[in_projection].astype(np.int16),
+        "Fund Value": fund_values[in_projection].astype(display_dtype),
+        "Plan": pd.Categorical.from_codes(
+            np.broadcast_to(plan_codes[:, None, None], fund_values.shape)[in_projection], plan_categories
+        ),
+        "Contribution Option": pd.Categorical.from_codes(
+            np.broadcast_to(np.arange(n_options)[None, :, None], fund_values.shape)[in_projection], option_labels
+        )
+    })
+    
+    return comparison_df, summary_df
+
+def parse_members(uploaded_file):
+    """
+    Parse a CSV file of pension fund members.
+    
+    Required columns are birth_date and current_salary; optional columns override the
+    current settings per member: maximum_salary (default: no salary growth),
+    years_to_max_salary, retirement_age, current_pension_value, current_value_date,
+    occupation_level (%), sex and department.
+    
+    Returns:
+    - DataFrame with one row per member and the known columns, or None if the file is invalid
+    """
+    try:
+        raw = pd.read_csv(uploaded_file, sep=None, engine="python")
+    except Exception:
+        return None
+    
+    raw.columns = [str(column).strip().lower() for column in raw.columns]
+    if not {"birth_date", "current_salary"} <= set(raw.columns):
+        return None
+    
+    members = raw[[column for column in MEMBER_COLUMNS if column in raw.columns]].copy()
+    for column in ("birth_date", "current_value_date"):
+        if column in members:
+            members[column] = pd.to_datetime(members[column], dayfirst=True, errors="coerce").dt.strftime("%Y-%m-%d")
+    for column in ("current_salary", "maximum_salary", "years_to_max_salary", "retirement_age",
+                   "current_pension_value", "occupation_level"):
+        if column in members:
+            members[column] = pd.to_numeric(members[column], errors="coerce")
+    if "department" in members:
+        members["department"] = members["department"].fillna("").astype(str)
+    
+    members = members.dropna(subset=["birth_date", "current_salary"]).reset_index(drop=True)
+    return members if len(members) else None
+
+def member_plan_settings(base_settings, member):
+    """
+    Get the plan settings of a member: the current settings overridden by the member's columns.
+    
+    The statement and buy-ins of the calculator belong to the user, so a member's
+    account starts at 0 without buy-ins unless the member's columns provide a statement.
+    """
+    settings = dict(base_settings)
+    settings.update(current_pension_value=0, current_mandatory_value=0, current_value_date=None, buy_ins=[])
+    settings["maximum_salary"] = member["current_salary"]
+    for column, value in member.items():
+        if column == "department" or pd.isna(value):
+            continue
+        if column == "occupation_level":
+            settings["occupation_levels"] = [{"from_year": 1900, "percentage": float(value)}]
+        elif column in ("years_to_max_salary", "retirement_age"):
+            settings[column] = int(value)
+        else:
+            settings[column] = value
+    return settings
+
+def get_member_groups(members, group_by):
+    """
+    Get the group of each member and the group labels.
+    
+    Returns:
+    - Tuple of the group code of each member (None for age bands, which change during
+      the projection) and the group labels ("Total" without grouping)
+    """
+    if group_by == "department" and "department" in members:
+        group_codes, groups = pd.factorize(members["department"], sort=True)
+        return group_codes, list(groups)
+    if group_by == "age_band":
+        return None, [f"{age}-{age + AGE_BAND_WIDTH - 1}" for age in range(0, 100, AGE_BAND_WIDTH)]
+    return np.zeros(len(members), dtype=int), ["Total"]
+
+def reduce_member_periods(totals, group_codes, n_groups, years, stacked, values):
+    """
+    Add the per-period values of stacked members into (groups, years) totals with bincount.
+    
+    Parameters:
+    - totals: Dictionary of flat (groups * years) arrays, updated in place
+    - group_codes: Group of each member, None to group by the age band of each period
+    - n_groups: Number of groups
+    - years: Calendar years of the totals
+    - stacked: Stacked "ages", "years" and "lengths" of the members (see stack_compiled_plans)
+    - values: Dictionary of (members, periods) arrays to add to the totals of the same name
+    """
+    valid = np.arange(stacked["ages"].shape[-1]) < stacked["lengths"][:, None]
+    if group_codes is None:
+        member_groups = np.clip(stacked["ages"] // AGE_BAND_WIDTH, 0, n_groups - 1)
+    else:
+        member_groups = np.broadcast_to(np.asarray(group_codes)[:, None], valid.shape)
+    cells = (member_groups * len(years) + stacked["years"] - years[0])[valid]
+    for name, period_values in values.items():
+        totals[name] += np.bincount(cells, period_values[valid], minlength=n_groups * len(years))
+
+def cohort_contributions(store, members):
+    """
+    Calculate the contributions of cohort members from their compiled schedules.
+    
+    Parameters:
+    - store: Cohort store (see build_cohort_store)
+    - members: Indices of the members
+    
+    Returns:
+    - Tuple of the (members, periods) personal and employer contributions and the
+      (members, accounts, periods) contributions, buy-ins included
+    """
+    salaries = store["salaries"][members]
+    insurable_salaries, account_shares = split_insurable_salaries(
+        salaries, store["coordination_fees"][members], store["two_accounts"], store["upper_limit"]
+    )
+    personal_contributions = insurable_salaries * (store["personal_rates"][members] / 100)
+    employer_contributions = insurable_salaries * (store["employer_rates"][members] / 100)
+    
+    contributions = np.zeros((len(salaries), 2, salaries.shape[-1]))
+    contributions[:, :account_shares.shape[1]] = (personal_contributions + employer_contributions)[:, None, :] * account_shares
+    contributions[:, 0] += store["buy_ins"][members]
+    return personal_contributions, employer_contributions, contributions
+
+def build_cohort_store(base_settings, members, option_index=0, chunk_size=MEMBER_CHUNK_SIZE, result_directory=None):
+    """
+    Build the cohort store of many members: their compiled schedules and cached results.
+    
+    Each member depends on the shared employer contribution and coordination fee
+    tables through the employer rate and the coordination fee of each of its periods,
+    which are kept next to its fund values so that a table change only re-evaluates
+    the affected members (see update_cohort_store). Members are compiled and
+    accumulated in chunks written straight into the arrays of the store, so with a
+    result directory the memory does not grow with the workforce.
+    
+    Parameters:
+    - base_settings: Current plan settings used for the columns a member does not have
+    - members: DataFrame of members (see parse_members)
+    - option_index: Personal contribution option of all members
+    - chunk_size: Number of members compiled at once
+    - result_directory: Directory of a result store holding the member arrays on disk
+      (see create_result_store), None to keep them in memory
+    
+    Returns:
+    - Dictionary with the shared "schedules", the (members, periods) arrays "ages", "years",
+      "salaries", "coordination_fees", "employer_rates", "personal_rates", "buy_ins",
+      "personal_contributions" and "employer_contributions", the (members, accounts, periods)
+      "growth" and "account_values", the "start_values" and the number of periods of each
+      member in "lengths"
+    """
+    member_settings = [member_plan_settings(base_settings, member) for member in members.to_dict("records")]
+    
+    # Yearly periods, so no member has more periods than the calendar years from the
+    # earliest start to the latest retirement
+    start_years = [
+        int(str(settings["current_value_date"] or settings["birth_date"])[:4]) for settings in member_settings
+    ]
+    end_years = [int(settings["birth_date"][:4]) + int(settings["retirement_age"]) for settings in member_settings]
+    n_members = len(member_settings)
+    n_periods = max(max(end_years, default=0) - min(start_years, default=0) + 1, 1)
+    
+    arrays = {
+        "ages": ((n_members, n_periods), np.int16),
+        "years": ((n_members, n_periods), np.int16),
+        **{
+            name: ((n_members, n_periods), np.float64) for name in (
+                "salaries", "coordination_fees", "employer_rates", "personal_rates", "buy_ins",
+                "personal_contributions", "employer_contributions"
+            )
+        },
+        "growth": ((n_members, 2, n_periods), np.float64),
+        "account_values": ((n_members, 2, n_periods), np.float64),
+        "start_values": ((n_members, 2), np.float64),
+        "lengths": ((n_members,), np.int64)
+    }
+    if result_directory is None:
+        store = {name: np.empty(shape, dtype) for name, (shape, dtype) in arrays.items()}
+    else:
+        store = create_result_store(result_directory, arrays)
+    store.update({
+        "schedules": {
+            "employer_contributions": base_settings["employer_contributions"],
+            "coordination_fees": base_settings["coordination_fees"]
+        },
+        "option_index": option_index,
+        "two_accounts": base_settings["two_accounts"],
+        "upper_limit": base_settings["bvg_upper_limit"]
+    })
+    
+    for start in range(0, n_members, chunk_size):
+        stacked = stack_compiled_plans([compile_plan(settings) for settings in member_settings[start:start + chunk_size]])
+        stacked["personal_rates"] = stacked["personal_rates"][:, option_index]
+        rows = slice(start, start + len(stacked["lengths"]))
+        
+        # Pad the chunk to the periods of the store (no growth and no salary after retirement)
+        for name in ("ages", "years", "salaries", "coordination_fees", "employer_rates", "personal_rates", "buy_ins", "growth"):
+            values = stacked[name]
+            store[name][rows] = np.pad(
+                values, [(0, 0)] * (values.ndim - 1) + [(0, n_periods - values.shape[-1])],
+                constant_values=1.0 if name == "growth" else 0
+            )
+        store["start_values"][rows] = stacked["start_values"]
+        store["lengths"][rows] = stacked["lengths"]
+        
+        personal_contributions, employer_contributions, contributions = cohort_contributions(store, rows)
+        store["personal_contributions"][rows] = personal_contributions
+        store["employer_contributions"][rows] = employer_contributions
+        store["account_values"][rows] = accumulate_fund(store["start_values"][rows], store["growth"][rows], contributions)
+    
+    flush_result_store(store)
+    return store
+
+def update_cohort_store(store, employer_contributions, coordination_fees):
+    """
+    Re-evaluate a cohort store for new employer contribution and coordination fee tables.
+    
+    The tables are compiled for the periods of all members at once and compared with
+    the compiled schedules in the store. Only the members whose schedule changed are
+    re-evaluated, and only from their first changed period: the fund value entering
+    that period is reused and the suffix is accumulated again (members sharing the
+    same first changed period in one pass). Only the rows of these members are
+    written, in place, so an on-disk store is not copied into memory.
+    
+    Parameters:
+    - store: Cohort store (see build_cohort_store), updated in place
+    - employer_contributions: New employer contribution table
+    - coordination_fees: New coordination fee table
+    
+    Returns:
+    - Tuple of the store, the indices of the re-evaluated members and the first
+      re-evaluated calendar year of each of them
+    """
+    valid = np.arange(store["ages"].shape[-1]) < store["lengths"][:, None]
+    employer_rates = np.where(valid, get_employer_contributions(store["ages"], employer_contributions), 0.0)
+    member_coordination_fees = np.where(valid, compile_from_year_values(coordination_fees, store["years"], "amount", 0), 0.0)
+    
+    changed = (employer_rates != store["employer_rates"]) | (member_coordination_fees != store["coordination_fees"])
+    affected = np.flatnonzero(changed.any(axis=1))
+    first_periods = np.argmax(changed[affected], axis=1)
+    
+    store["schedules"] = {"employer_contributions": employer_contributions, "coordination_fees": coordination_fees}
+    if len(affected) == 0:
+        return store, affected, np.zeros(0, dtype=int)
+    
+    store["employer_rates"][affected] = employer_rates[affected]
+    store["coordination_fees"][affected] = member_coordination_fees[affected]
+    personal_contributions, member_employer_contributions, contributions = cohort_contributions(store, affected)
+    store["personal_contributions"][affected] = personal_contributions
+    store["employer_contributions"][affected] = member_employer_contributions
+    
+    # The suffix of each member only depends on the fund value entering it, which is not overwritten
+    for first in np.unique(first_periods):
+        in_group = first_periods == first
+        rows = affected[in_group]
+        entering_values = store["account_values"][rows, :, first - 1] if first > 0 else store["start_values"][rows]
+        store["account_values"][rows, :, first:] = accumulate_fund(
+            entering_values, store["growth"][rows, :, first:], contributions[in_group, :, first:]
+        )
+    
+    flush_result_store(store)
+    return store, affected, store["years"][affected, first_periods]
+
+def aggregate_cohort(store, members, group_by=None):
+    """
+    Aggregate the cached results of a cohort store into employer-level totals.
+    
+    Returns:
+    - Dictionary with the calendar "years", the "groups" labels ("Total" without grouping)
+      and the (groups, years) arrays "employer_contributions", "personal_contributions",
+      "fund_values" (end of each year) and "active_members"
+    """
+    valid = np.arange(store["ages"].shape[-1]) < store["lengths"][:, None]
+    member_years = store["years"][valid]
+    first_year = int(member_years.min()) if member_years.size else date.today().year
+    years = np.arange(first_year, (int(member_years.max()) if member_years.size else first_year) + 1)
+    
+    group_codes, groups = get_member_groups(members, group_by)
+    totals = {name: np.zeros(len(groups) * len(years)) for name in MEMBER_TOTALS}
+    reduce_member_periods(totals, group_codes, len(groups), years, store, {
+        "employer_contributions": store["employer_contributions"],
+        "personal_contributions": store["personal_contributions"],
+        "fund_values": store["account_values"].sum(axis=1),
+        "active_members": valid.astype(float)
+    })
+    
+    return {
+        "years": years,
+        "groups": groups,
+        **{name: values.reshape(len(groups), len(years)) for name, values in totals.items()}
+    }
+
+def export_projections(plan_settings_list, plan_names, option_labels, monthly=False, file_format="parquet"):
+    """
+    Export the projections of many plans and all their options to a Parquet or an Arrow IPC file.
+    
+    The chunks of iter_plans_chunks are written as they are simulated, in batches of
+    EXPORT_BATCH_ROWS rows, so besides the file only one batch of columns exists at
+    once; the rows of each plan come chunk by chunk, with the options of each chunk
+    of periods in turn. Years and ages are int16 and the plan and option labels are dictionary-encoded
+    (plans with the same name share an entry). The two account columns are there when
+    a plan has two accounts (null for the others) and "Is13thMonth" for monthly
+    projections; files are compressed as in export_table.
+    
+    Parameters:
+    - plan_settings_list: Settings of each plan (see get_plan_settings)
+    - plan_names: Name of each plan
+    - option_labels: Label of each of the 3 contribution options
+    - monthly: Whether to export monthly instead of yearly projections
+    - file_format: "parquet" or "arrow"
+    
+    Returns:
+    - Bytes of the file with "Plan" and "Option" followed by the projection columns
+      (see plan_period_columns)
+    """
+    plan_labels = pd.unique(pd.Series(plan_names))
+    plan_codes = pd.Index(plan_labels).get_indexer(plan_names).astype(np.int32)
+    account_columns = ["Extra-mandatory Fund Value", "Mandatory Fund Value"]
+    value_columns = [
+        "Salary", "Insurable Salary", "Personal Contribution", "Employer Contribution", "Buy-in",
+        "Total Contribution", "Fund Value"
+    ]
+    if any(plan_settings["two_accounts"] for plan_settings in plan_settings_list):
+        value_columns += account_columns
+    schema = pa.schema(
+        [
+            ("Plan", pa.dictionary(pa.int32(), pa.string())),
+            ("Option", pa.dictionary(pa.int8(), pa.string())),
+            ("Date", pa.timestamp("ns")),
+            ("Year", pa.int16()),
+            ("Age", pa.int16())
+        ]
+        + [(name, pa.float64()) for name in value_columns]
+        + ([("Is13thMonth", pa.bool_())] if monthly else [])
+    )
+    
+    sink = pa.BufferOutputStream()
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+    
+    with writer:
+        batches, n_rows = [], 0
+        for chunk in iter_plans_chunks(plan_settings_list, monthly):
+            n_chunk_rows = len(chunk["Option"])
+            columns = {
+                **chunk,
+                "Plan": pa.DictionaryArray.from_arrays(plan_codes[chunk["Plan"]], plan_labels),
+                "Option": pa.DictionaryArray.from_arrays(chunk["Option"], option_labels),
+                "Date": chunk["Date"].astype("datetime64[ns]")
+            }
+            for name in account_columns:
+                columns.setdefault(name, pa.nulls(n_chunk_rows, pa.float64()))
+            batches.append(pa.record_batch([columns[field.name] for field in schema], schema=schema))
+            n_rows += n_chunk_rows
+            if n_rows >= EXPORT_BATCH_ROWS:
+                writer.write_table(pa.Table.from_batches(batches).combine_chunks())
+                batches, n_rows = [], 0
+        if batches:
+            writer.write_table(pa.Table.from_batches(batches).combine_chunks())
+    return sink.getvalue().to_pybytes()
+
+def cohort_frame(store, members):
+    """
+    Build the long frame of the cached results of a cohort store for export.
+    
+    Returns:
+    - DataFrame with one row per member and period: "Member" (row of the members file),
+      "Department" (categorical, when the file has departments), "Year", "Age",
+      "Personal Contribution", "Employer Contribution" and "Fund Value"
+    """
+    valid = np.arange(store["ages"].shape[-1]) < store["lengths"][:, None]
+    member_index = np.broadcast_to(np.arange(len(valid), dtype=np.int32)[:, None], valid.shape)[valid]
+    df = pd.DataFrame({"Member": member_index})
+    if "department" in members:
+        df["Department"] = pd.Categorical(members["department"].to_numpy()[member_index])
+    df["Year"] = store["years"][valid].astype(np.int16)
+    df["Age"] = store["ages"][valid].astype(np.int16)
+    df["Personal Contribution"] = store["personal_contributions"][valid]
+    df["Employer Contribution"] = store["employer_contributions"][valid]
+    df["Fund Value"] = store["account_values"].sum(axis=1)[valid]
+    return df
+
+def export_table(df, file_format="parquet"):
+    """
+    Serialize a result frame to a Parquet or an Arrow IPC file.
+    
+    Categorical columns become dictionary-encoded columns. Parquet files are
+    compressed with zstd; Arrow IPC files are left uncompressed so that they can
+    be memory-mapped and read without copying.
+    
+    Parameters:
+    - df: Frame to export (e.g. from cohort_frame)
+    - file_format: "parquet" or "arrow"
+    
+    Returns:
+    - Bytes of the file
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    if file_format == "parquet":
+        pq.write_table(table, sink, compression="zstd")
+    else:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def cached_projection_export(plan_settings_list, plan_names, option_labels, monthly, file_format):
+    """Cached version of export_projections."""
+    return export_projections(plan_settings_list, plan_names, option_labels, monthly, file_format)
+
+def perturb_plan_settings(plan_settings, input_name, factor):
+    """
+    Scale one input of a plan by a factor (see SENSITIVITY_INPUTS).
+    
+    Year counts (retirement age, years to the maximum salary) are rounded and move by
+    at least one year, schedules are scaled entry by entry.
+    
+    Returns:
+    - New plan settings dictionary
+    """
+    settings = dict(plan_settings)
+    
+    def scale_years(value):
+        if value == 0 or factor == 1:
+            return value
+        change = max(1, round(abs(value * (factor - 1))))
+        return value + change if factor > 1 else max(value - change, 0)
+    
+    if input_name == "expected_yield":
+        settings["expected_yield"] = plan_settings["expected_yield"] * factor
+        settings["yield_schedule"] = [
+            dict(entry, **{"yield": entry["yield"] * factor}) for entry in plan_settings["yield_schedule"]
+        ]
+    elif input_name in ("current_salary", "maximum_salary"):
+        settings[input_name] = plan_settings[input_name] * factor
+    elif input_name in ("years_to_max_salary", "retirement_age"):
+        settings[input_name] = scale_years(plan_settings[input_name])
+    elif input_name == "contribution_rates":
+        settings["personal_contribution_ranges"] = [
+            dict(entry, options=[rate * factor for rate in entry["options"]])
+            for entry in plan_settings["personal_contribution_ranges"]
+        ]
+        settings["employer_contributions"] = [
+            dict(entry, percentage=entry["percentage"] * factor) for entry in plan_settings["employer_contributions"]
+        ]
+    elif input_name == "coordination_fees":
+        settings["coordination_fees"] = [
+            dict(entry, amount=entry["amount"] * factor) for entry in plan_settings["coordination_fees"]
+        ]
+    elif input_name == "occupation_levels":
+        settings["occupation_levels"] = [
+            dict(entry, percentage=entry["percentage"] * factor) for entry in plan_settings["occupation_levels"]
+        ]
+    return settings
+
+def sensitivity_analysis(plan_settings, change=10.0, inputs=SENSITIVITY_INPUTS):
+    """
+    Get how the final fund value of each option responds to -change% and +change% in each input.
+    
+    The plan and its 2 x len(inputs) variants are simulated in a single batch call.
+    
+    Parameters:
+    - plan_settings: Settings of the plan (see get_plan_settings)
+    - change: Relative change (%) applied to each input
+    - inputs: Names of the inputs to vary (see perturb_plan_settings)
+    
+    Returns:
+    - DataFrame with "Input", "Option" (index), "Base Value", "Low Value" and "High Value"
+      per input and option, or None when the plan has no projection
+    """
+    factors = (1 - change / 100, 1 + change / 100)
+    variants = [
+        perturb_plan_settings(plan_settings, input_name, factor)
+        for input_name in inputs
+        for factor in factors
+    ]
+    batch = simulate_plans_batch([plan_settings] + variants)
+    if batch["lengths"][0] == 0:
+        return None
+    
+    # Final value of every variant, a variant ending before the base plan keeps its final value
+    last_period = np.maximum(batch["lengths"] - 1, 0)
+    final_values = np.take_along_axis(batch["fund_values"], last_period[:, None, None], axis=-1)[..., 0]
+    base_values = final_values[0]
+    variant_values = final_values[1:].reshape(len(inputs), 2, -1)
+    n_options = len(base_values)
+    
+    return pd.DataFrame({
+        "Input": np.repeat(inputs, n_options),
+        "Option": np.tile(np.arange(n_options), len(inputs)),
+        "Base Value": np.tile(base_values, len(inputs)),
+        "Low Value": variant_values[:, 0].ravel(),
+        "High Value": variant_values[:, 1].ravel()
+    })
+
+def parse_fund_statements(uploaded_file):
+    """
+    Parse a date/value file of historical pension fund statements.
+
+    The date and value columns are detected by name (date/datum/data and
+    value/wert/valeur/valore/balance/guthaben/avoir/saldo), falling back to the
+    first two columns. Dates may use Swiss formatting (e.g. 31.12.2023) and values
+    Swiss or decimal-comma amounts (e.g. 85'000.00 or 85.000,00, see parse_amounts).
+    For several rows with the same date the last one is kept.
+
+    Returns:
+    - DataFrame with "Date" and "Value" columns sorted by date, or None if there
+      are fewer than 2 statements
+    """
+    try:
+        raw = pd.read_csv(uploaded_file, sep=None, engine="python", dtype=str)
+    except Exception:
+        return None
+
+    if raw.shape[1] < 2:
+        return None
+
+    date_column = find_csv_column(raw.columns, ["date", "datum", "data", "stichtag"], 0)
+    value_column = find_csv_column(raw.columns, ["value", "wert", "valeur", "valore", "balance", "guthaben", "avoir", "saldo"], 1)
+
+    dates = pd.to_datetime(raw[date_column].str.strip(), dayfirst=True, errors="coerce")
+    values = parse_amounts(raw[value_column])
+    statements = pd.DataFrame({"Date": dates, "Value": values}).dropna()
+    statements = statements.sort_values("Date").drop_duplicates("Date", keep="last").reset_index(drop=True)
+
+    if len(statements) < 2:
+        return None
+    return statements
+
+def calibrate_yield(plan_settings, statements, option_index=0, fit_contributions=False):
+    """
+    Estimate the realized yield of a plan from a series of fund statements.
+    
+    The plan is simulated monthly from the earliest statement for a whole grid of
+    yields at once, then for a finer grid around the best one. For a given yield the
+    fund value is linear in the contributions, F = A + s * B, so the optional
+    contribution correction s has a closed-form least-squares solution per yield.
+    
+    Parameters:
+    - plan_settings: Settings of the plan (see get_plan_settings)
+    - statements: DataFrame with "Date" and "Value" columns (see parse_fund_statements)
+    - option_index: Personal contribution option paid over the statement period
+    - fit_contributions: Whether to also fit the contribution correction (otherwise 1)
+    
+    Returns:
+    - Dictionary with the fitted "yield" (%), "contribution_scale", "rmse", the
+      "fitted" DataFrame ("Date", "Value", "Fitted Value") and the number of "dropped"
+      statements outside the projection (on or after the last period), or None if no
+      statement after the earliest one falls within the projection
+    """
+    start_value = float(statements["Value"].iloc[0])
+    compiled = compile_plan(
+        dict(plan_settings, current_value_date=statements["Date"].iloc[0].date(), current_pension_value=start_value),
+        monthly=True,
+        option_indices=(option_index,)
+    )
+    if compiled is None:
+        return None
+    
+    # Each statement is the fund value entering its period (the earliest one is the
+    # start value). Statements from the last period on are outside the projection.
+    statement_dates = statements["Date"].to_numpy().astype("datetime64[D]")
+    periods = np.searchsorted(compiled["dates"], statement_dates, side="left") - 1
+    in_projection = (periods >= 0) & (periods < len(compiled["dates"]) - 1)
+    fitted_periods = periods[in_projection]
+    observed = statements["Value"].to_numpy()[in_projection]
+    if len(observed) == 0:
+        return None
+    
+    contributions = compiled["personal_contributions"][0] + compiled["employer_contributions"] + compiled["buy_ins"]
+    
+    def evaluate(yields):
+        # Fund values of every yield of the grid as (yields, periods) arrays
+        growth = np.broadcast_to((1 + yields[:, None] / 100) ** (1/12), (len(yields), len(contributions)))
+        start_part = accumulate_fund(np.full(len(yields), start_value), growth, np.zeros(len(contributions)))
+        contribution_part = accumulate_fund(np.zeros(len(yields)), growth, contributions)
+        
+        if fit_contributions:
+            residuals = observed - start_part[:, fitted_periods]
+            fitted_contributions = contribution_part[:, fitted_periods]
+            scales = np.maximum(0.0, (residuals * fitted_contributions).sum(axis=1) / np.maximum((fitted_contributions ** 2).sum(axis=1), 1e-12))
+        else:
+            scales = np.ones(len(yields))
+        
+        fund_values = start_part + scales[:, None] * contribution_part
+        errors = ((fund_values[:, fitted_periods] - observed) ** 2).sum(axis=1)
+        return fund_values, scales, errors
+    
+    _, _, errors = evaluate(YIELD_CALIBRATION_GRID)
+    refined_yields = np.clip(
+        YIELD_CALIBRATION_GRID[np.argmin(errors)] + YIELD_CALIBRATION_REFINEMENT,
+        YIELD_CALIBRATION_GRID[0],
+        YIELD_CALIBRATION_GRID[-1]
+    )
+    fund_values, scales, errors = evaluate(refined_yields)
+    best = np.argmin(errors)
+    
+    # Show the start value with the fitted statements
+    shown = in_projection | (np.arange(len(periods)) == 0)
+    fitted_values = np.where(periods >= 0, fund_values[best, np.clip(periods, 0, len(contributions) - 1)], start_value)
+    fitted = pd.DataFrame({
+        "Date": statements["Date"][shown],
+        "Value": statements["Value"][shown],
+        "Fitted Value": fitted_values[shown]
+    })
+    
+    return {
+        "yield": float(refined_yields[best]),
+        "contribution_scale": float(scales[best]),
+        "rmse": float(np.sqrt(errors[best] / len(observed))),
+        "fitted": fitted,
+        "dropped": int((~shown).sum())
+    }
+
+def progressive_tax(incomes, tax_brackets):
+    """
+    Calculate the income tax from a progressive table of marginal rates.
+    
+    Parameters:
+    - incomes: Array of taxable incomes
+    - tax_brackets: List of {"income_from", "rate"} entries, the rate (%) applying from income_from on
+    
+    Returns:
+    - Numpy array of taxes with the shape of incomes
+    """
+    incomes = np.asarray(incomes, dtype=float)
+    if not tax_brackets:
+        return np.zeros(incomes.shape)
+    sorted_brackets = sorted(tax_brackets, key=lambda x: x["income_from"])
+    lower = np.array([bracket["income_from"] for bracket in sorted_brackets], dtype=float)
+    upper = np.append(lower[1:], np.inf)
+    rates = np.array([bracket["rate"] for bracket in sorted_brackets], dtype=float) / 100
+    return (np.clip(incomes[..., None] - lower, 0, upper - lower) * rates).sum(axis=-1)
+
+def optimize_buy_ins(plan_settings, budget, option_index=0, step=1000, yearly_limit=0,
+                     lock_years=BUY_IN_LOCK_YEARS, tax_brackets=None):
+    """
+    Split a buy-in budget across the years to retirement by dynamic programming.
+    
+    A buy-in paid in a year is worth its amount times the fund growth until retirement.
+    With a tax table, the tax saved by deducting the buy-in from that year's taxable
+    income (salary minus personal contributions) is added, grown at the same yield, so
+    the progressive rates spread the buy-ins over several years. The value of every
+    amount in every year is evaluated as one array, then the DP runs over the years
+    with the remaining budget (in steps) as state, vectorized over the states.
+    
+    Parameters:
+    - plan_settings: Settings of the plan (see get_plan_settings), its buy-ins are replaced
+    - budget: Total buy-in budget
+    - option_index: Personal contribution option
+    - step: Granularity of the buy-in amounts (increased to keep at most BUY_IN_MAX_STEPS steps)
+    - yearly_limit: Maximum buy-in per year (0 for no limit)
+    - lock_years: Years before retirement without buy-ins (benefits bought in cannot be
+      withdrawn as a lump sum within 3 years)
+    - tax_brackets: Progressive tax table (see progressive_tax), None to maximize the fund only
+    
+    Returns:
+    - Dictionary with the optimal "schedule" ([{"year", "amount"}]), the "details"
+      DataFrame per buy-in year and the "fund_gain" and "tax_savings" at retirement,
+      or None when no year allows a buy-in
+    """
+    compiled = compile_plan(dict(plan_settings, buy_ins=[]), monthly=False, option_indices=(option_index,))
+    if compiled is None:
+        return None
+    
+    # Buy-in years: every projected year but the locked ones before retirement
+    years = compiled["years"]
+    candidates = np.arange(max(len(years) - lock_years, 0))
+    if len(candidates) == 0 or budget <= 0:
+        return None
+    
+    step = max(float(step), budget / BUY_IN_MAX_STEPS)
+    n_steps = int(budget // step)
+    amounts = np.arange(n_steps + 1) * step
+    
+    # Growth until retirement of one franc paid in each year (into the main account)
+    cumulative_growth = np.cumprod(compiled["growth"][0])
+    growth_to_retirement = cumulative_growth[-1] / cumulative_growth[candidates]
+    
+    # (years, amounts) value at retirement of each possible buy-in
+    fund_gains = growth_to_retirement[:, None] * amounts
+    if tax_brackets:
+        taxable_incomes = (compiled["salaries"] - compiled["personal_contributions"][0])[candidates]
+        deductions = np.minimum(amounts, np.maximum(taxable_incomes, 0)[:, None])
+        tax_savings = progressive_tax(taxable_incomes, tax_brackets)[:, None] - progressive_tax(taxable_incomes[:, None] - deductions, tax_brackets)
+    else:
+        tax_savings = np.zeros_like(fund_gains)
+    values = fund_gains + growth_to_retirement[:, None] * tax_savings
+    
+    allowed = np.ones(n_steps + 1, dtype=bool)
+    if yearly_limit > 0:
+        allowed = amounts <= yearly_limit + 1e-9
+    
+    # Backward DP: best[u] is the best value of the later years with u steps left
+    remaining = np.arange(n_steps + 1)
+    spent = remaining[:, None] - remaining[None, :]  # (steps left, steps paid)
+    feasible = (spent >= 0) & allowed[None, :]
+    best = np.zeros(n_steps + 1)
+    choices = np.zeros((len(candidates), n_steps + 1), dtype=int)
+    for k in range(len(candidates) - 1, -1, -1):
+        totals = np.where(feasible, values[k][None, :] + best[np.maximum(spent, 0)], -np.inf)
+        choices[k] = np.argmax(totals, axis=1)
+        best = totals[remaining, choices[k]]
+    
+    # Follow the optimal choices forward from the whole budget
+    paid = np.zeros(len(candidates), dtype=int)
+    left = n_steps
+    for k in range(len(candidates)):
+        paid[k] = choices[k, left]
+        left -= paid[k]
+    
+    rows = np.arange(len(candidates))
+    details = pd.DataFrame({
+        "Year": years[candidates],
+        "Age": compiled["ages"][candidates],
+        "Buy-in": amounts[paid],
+        "Tax Saving": tax_savings[rows, paid],
+        "Value at Retirement": values[rows, paid]
+    })
+    schedule = [
+        {"year": int(year), "amount": float(amount)}
+        for year, amount in zip(details["Year"], details["Buy-in"]) if amount > 0
+    ]
+    
+    return {
+        "schedule": schedule,
+        "details": details[details["Buy-in"] > 0].reset_index(drop=True),
+        "fund_gain": float(fund_gains[rows, paid].sum()),
+        "tax_savings": float(tax_savings[rows, paid].sum())
+    }
+
+def parse_return_series(uploaded_file):
+    """
+    Parse a year/return file of historical annual returns (in %).
+
+    The year and return columns are detected by name (year/jahr/année/anno and
+    return/yield/rendite/zins/rendement/taux/rendimento/tasso), falling back to the
+    first two columns. Returns may be written with a % sign and a decimal comma.
+
+    Returns:
+    - List of {"year", "yield"} entries sorted by year, or None if there are fewer than 2 years
+    """
+    try:
+        raw = pd.read_csv(uploaded_file, sep=None, engine="python", dtype=str)
+    except Exception:
+        return None
+
+    if raw.shape[1] < 2:
+        return None
+
+    year_column = find_csv_column(raw.columns, ["year", "jahr", "année", "annee", "anno"], 0)
+    yield_column = find_csv_column(raw.columns, ["return", "yield", "rendite", "zins", "rendement", "taux", "rendimento", "tasso"], 1)
+
+    series = pd.DataFrame({
+        "year": pd.to_numeric(raw[year_column].str.strip(), errors="coerce"),
+        "yield": pd.to_numeric(raw[yield_column].str.replace(",", ".").str.replace(r"[^\d.\-]", "", regex=True), errors="coerce")
+    }).dropna()
+    series["year"] = series["year"].astype(int)
+    series = series.sort_values("year").drop_duplicates("year", keep="last")
+
+    if len(series) < 2:
+        return None
+    return series.to_dict("records")
+
+def backtest_plan(plan_settings, return_series, wrap=True):
+    """
+    Replay the contributions of a plan against every rolling window of a return series.
+    
+    The yearly plan is compiled once; each window of the series (one per start year)
+    gives the growth of the main account, so all windows and options are accumulated
+    at once as a (windows, options, periods) array. A mandatory account keeps its own
+    rate. With wrap, windows running past the last year of the series continue from
+    its first year, so every year of the series is a start year even when the series
+    is shorter than the projection.
+    
+    Parameters:
+    - plan_settings: Settings of the plan (see get_plan_settings)
+    - return_series: List of {"year", "yield"} annual returns (%)
+    - wrap: Whether windows wrap around the end of the series
+    
+    Returns:
+    - Dictionary with the "start_years" of the windows, the "fund_values" as
+      (windows, options, periods) array and the "ages" and "years" of the periods,
+      or None when there is no projection or no complete window
+    """
+    compiled = compile_plan(plan_settings, monthly=False)
+    if compiled is None or not return_series:
+        return None
+    
+    series = sorted(return_series, key=lambda x: x["year"])
+    series_years = np.array([entry["year"] for entry in series])
+    series_yields = np.array([entry["yield"] for entry in series], dtype=float)
+    n_periods = len(compiled["dates"])
+    
+    n_windows = len(series) if wrap else len(series) - n_periods + 1
+    if n_windows <= 0:
+        return None
+    window_index = (np.arange(n_windows)[:, None] + np.arange(n_periods)) % len(series)
+    growth = 1 + series_yields[window_index] / 100
+    
+    contributions = plan_contributions(compiled)
+    fund_values = accumulate_fund(compiled["start_values"][0], growth[:, None, :], contributions[None, :, 0])
+    if len(compiled["start_values"]) == 2:
+        fund_values = fund_values + accumulate_fund(compiled["start_values"][1], compiled["growth"][1], contributions[:, 1])
+    
+    return {
+        "start_years": series_years[:n_windows],
+        "fund_values": fund_values,
+        "ages": compiled["ages"],
+        "years": compiled["years"]
+    }
+
+def summarize_backtest(backtest, option_labels):
+    """Get the min/median/max final fund value of each option over the windows, with the start years of the extremes."""
+    final_values = backtest["fund_values"][..., -1]
+    worst, best = final_values.argmin(axis=0), final_values.argmax(axis=0)
+    return pd.DataFrame({
+        "Option": option_labels,
+        "Min": final_values.min(axis=0),
+        "Median": np.median(final_values, axis=0),
+        "Max": final_values.max(axis=0),
+        "Worst Start Year": backtest["start_years"][worst],
+        "Best Start Year": backtest["start_years"][best]
+    })
+
+def create_result_store(directory, arrays):
+    """
+    Create an on-disk result store of memory-mapped NumPy arrays.
+    
+    Each array is an .npy file of the directory, with the rows (members, paths or
+    scenarios) first and the periods last, so that engines write their chunks straight
+    to disk and readers only load the rows they slice.
+    
+    Parameters:
+    - directory: Directory of the store (created if missing, existing arrays are replaced)
+    - arrays: Dictionary of name: (shape, dtype)
+    
+    Returns:
+    - Dictionary of name: writable memory-mapped array
+    """
+    os.makedirs(directory, exist_ok=True)
+    return {
+        name: np.lib.format.open_memmap(os.path.join(directory, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+        for name, (shape, dtype) in arrays.items()
+    }
+
+def open_result_store(directory):
+    """Open an on-disk result store read-only (see create_result_store); nothing is read until sliced."""
+    return {
+        os.path.splitext(filename)[0]: np.load(os.path.join(directory, filename), mmap_mode="r")
+        for filename in sorted(os.listdir(directory)) if filename.endswith(".npy")
+    }
+
+def flush_result_store(store):
+    """Write the pending changes of the memory-mapped arrays of a result store to disk (other values are skipped)."""
+    for array in store.values():
+        if isinstance(array, np.memmap):
+            array.flush()
+
+def get_session_result_directory():
+    """Get the temporary directory of the result stores of the current session (created on first use)."""
+    if "result_directory" not in st.session_state:
+        st.session_state.result_directory = tempfile.mkdtemp(prefix="4sorge_")
+    return st.session_state.result_directory
+
+def simulate_stochastic_chunk(compiled, n_paths, seed_sequence, salary_volatility, yield_volatility, correlation):
+    """
+    Simulate one chunk of paths with correlated salary growth and yield shocks.
+    
+    Salary shocks accumulate into a lognormal multiplier of the projected salaries
+    (without drift, the current salary being known), which changes the insurable
+    salaries and thus the contributions; yield shocks make the growth of the main
+    account lognormal, with the expected growth as mean and yield_volatility as standard
+    deviation, so it stays positive whatever the volatility. The shocks of each year
+    are correlated standard normal draws.
+    
+    Parameters:
+    - compiled: Yearly compiled plan (see compile_plan)
+    - n_paths: Number of paths of the chunk
+    - seed_sequence: numpy SeedSequence of the chunk
+    - salary_volatility: Yearly volatility of the salary growth (%)
+    - yield_volatility: Yearly volatility of the yield (%)
+    - correlation: Correlation between the salary and yield shocks
+    
+    Returns:
+    - Numpy array of (paths, options, periods) fund values
+    """
+    rng = np.random.default_rng(seed_sequence)
+    n_periods = len(compiled["dates"])
+    salary_shocks, independent_shocks = rng.standard_normal((2, n_paths, n_periods))
+    yield_shocks = correlation * salary_shocks + np.sqrt(1 - correlation ** 2) * independent_shocks
+    
+    # Salary multipliers with a mean of 1 (no shock on the current year)
+    sigma = salary_volatility / 100
+    log_growth = sigma * salary_shocks - sigma ** 2 / 2
+    log_growth[:, 0] = 0.0
+    salaries = compiled["salaries"] * np.exp(np.cumsum(log_growth, axis=1))
+    insurable_salaries = np.maximum(0, salaries - compiled["coordination_fees"])
+    
+    # (paths, options, accounts, periods) contributions
+    rates = (compiled["personal_rates"] + compiled["employer_rates"]) / 100
+    contributions = (insurable_salaries[:, None, :] * rates)[:, :, None, :] * compiled["account_shares"]
+    contributions[:, :, 0] += compiled["buy_ins"]
+    
+    # Lognormal growth of the main account with the expected growth as mean
+    growth = np.broadcast_to(compiled["growth"], (n_paths,) + compiled["growth"].shape).copy()
+    yield_sigma = np.sqrt(np.log1p((yield_volatility / 100 / compiled["growth"][0]) ** 2))
+    growth[:, 0] *= np.exp(yield_sigma * yield_shocks - yield_sigma ** 2 / 2)
+    
+    account_values = accumulate_fund(compiled["start_values"], growth[:, None], contributions)
+    return account_values.sum(axis=2)
+
+def create_quantile_sketch(n_series, size):
+    """
+    Create an empty streaming quantile sketch for many series (e.g. options and periods).
+    
+    The sketch keeps at most size weighted centroids per series, so its memory does
+    not depend on the number of values added (see update_quantile_sketch).
+    """
+    return {
+        "means": np.empty((n_series, 0)),
+        "weights": np.empty((n_series, 0)),
+        "size": int(size)
+    }
+
+def update_quantile_sketch(sketch, values):
+    """
+    Add a chunk of values to a quantile sketch (merging digest, like a t-digest).
+    
+    The centroids and the new values of each series are sorted together and merged
+    into size bins of the quantile scale k(q) = size * (arcsin(2q - 1) / pi + 1/2),
+    which keeps small centroids in the tails, where the 10th and 90th percentiles are.
+    All series are merged at once.
+    
+    Parameters:
+    - sketch: Quantile sketch (see create_quantile_sketch), updated in place
+    - values: Array of (values, series) new values
+    """
+    size = sketch["size"]
+    n_series = sketch["means"].shape[0]
+    means = np.concatenate([sketch["means"], values.T], axis=1)
+    weights = np.concatenate([sketch["weights"], np.ones(values.T.shape)], axis=1)
+    
+    # Sort each series (empty centroids have a NaN mean and go last)
+    order = np.argsort(means, axis=1)
+    means = np.take_along_axis(means, order, axis=1)
+    weights = np.take_along_axis(weights, order, axis=1)
+    
+    cumulative_weights = np.cumsum(weights, axis=1)
+    quantiles = (cumulative_weights - weights / 2) / cumulative_weights[:, -1:]
+    bins = np.minimum((size * (np.arcsin(2 * quantiles - 1) / np.pi + 0.5)).astype(int), size - 1)
+    flat_bins = (bins + np.arange(n_series)[:, None] * size).ravel()
+    
+    valid = weights.ravel() > 0
+    merged_weights = np.bincount(flat_bins[valid], weights.ravel()[valid], minlength=n_series * size)
+    merged_sums = np.bincount(flat_bins[valid], (means * weights).ravel()[valid], minlength=n_series * size)
+    
+    sketch["weights"] = merged_weights.reshape(n_series, size)
+    sketch["means"] = np.divide(
+        merged_sums, merged_weights, out=np.full(n_series * size, np.nan), where=merged_weights > 0
+    ).reshape(n_series, size)
+
+def query_quantile_sketch(sketch, quantiles):
+    """
+    Estimate quantiles of every series of a sketch by interpolating between centroids.
+    
+    Returns:
+    - Numpy array of (quantiles, series) estimates
+    """
+    order = np.argsort(sketch["means"], axis=1)
+    means = np.take_along_axis(sketch["means"], order, axis=1)
+    weights = np.take_along_axis(sketch["weights"], order, axis=1)
+    
+    # Rank of the middle of each centroid; empty centroids are at the end
+    n_valid = (weights > 0).sum(axis=1)
+    cumulative_weights = np.cumsum(weights, axis=1)
+    middles = cumulative_weights - weights / 2
+    series = np.arange(len(means))
+    
+    estimates = []
+    for quantile in quantiles:
+        ranks = quantile * cumulative_weights[:, -1]
+        upper = np.minimum((middles < ranks[:, None]).sum(axis=1), n_valid - 1)
+        lower = np.maximum(upper - 1, 0)
+        span = middles[series, upper] - middles[series, lower]
+        fraction = np.clip(np.divide(ranks - middles[series, lower], span, out=np.zeros(len(means)), where=span > 0), 0, 1)
+        estimates.append(means[series, lower] + fraction * (means[series, upper] - means[series, lower]))
+    return np.array(estimates)
+
+def simulate_stochastic(plan_settings, n_paths, seed, salary_volatility, yield_volatility, correlation,
+                        workers=1, quantiles=STOCHASTIC_QUANTILES, sketch_size=STOCHASTIC_SKETCH_SIZE,
+                        result_directory=None):
+    """
+    Simulate many paths of a plan with correlated salary and yield shocks.
+    
+    The paths are split into chunks of STOCHASTIC_CHUNK_SIZE, each with its own random
+    stream spawned from the seed (SeedSequence.spawn). The chunks and their streams do
+    not depend on the number of workers, and the chunks are always added to the
+    statistics in the same order, so the results are bit-identical whether the chunks
+    run in this process or in a process pool. Each chunk is folded into streaming
+    quantile sketches and running sums and then dropped, so the memory stays bounded
+    whatever the number of paths. With a result directory, the fund values of every
+    path are also written to an on-disk result store as the chunks come in.
+    
+    Parameters:
+    - plan_settings: Settings of the plan (see get_plan_settings)
+    - n_paths: Number of paths
+    - seed: Seed of the simulation (recorded to reproduce it)
+    - salary_volatility: Yearly volatility of the salary growth (%)
+    - yield_volatility: Yearly volatility of the yield (%)
+    - correlation: Correlation between the salary and yield shocks
+    - workers: Number of processes (1 to run in this process)
+    - quantiles: Quantiles of the fund values to estimate (e.g. 0.1 for the 10th percentile)
+    - sketch_size: Centroids kept per option and period (more is more accurate and uses more memory)
+    - result_directory: Directory of the result store of the paths ("fund_values" as
+      (paths, options, periods), "ages" and "years"), None to keep no paths
+    
+    Returns:
+    - Dictionary with the estimated "quantiles" as (quantiles, options, periods) array,
+      the "mean" fund values as (options, periods) array and the "ages" and "years" of
+      the periods, or None when there is no projection
+    """
+    compiled = compile_plan(plan_settings, monthly=False)
+    if compiled is None:
+        return None
+    
+    chunk_sizes = [min(STOCHASTIC_CHUNK_SIZE, n_paths - start) for start in range(0, n_paths, STOCHASTIC_CHUNK_SIZE)]
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    chunk_arguments = (
+        [compiled] * len(chunk_sizes),
+        chunk_sizes,
+        seed_sequences,
+        [salary_volatility] * len(chunk_sizes),
+        [yield_volatility] * len(chunk_sizes),
+        [correlation] * len(chunk_sizes)
+    )
+    
+    n_options, n_periods = compiled["personal_contributions"].shape
+    sketch = create_quantile_sketch(n_options * n_periods, sketch_size)
+    totals = np.zeros(n_options * n_periods)
+    
+    result_store = None
+    if result_directory is not None:
+        result_store = create_result_store(result_directory, {
+            "fund_values": ((n_paths, n_options, n_periods), np.float64),
+            "ages": ((n_periods,), np.int16),
+            "years": ((n_periods,), np.int16)
+        })
+        result_store["ages"][:] = compiled["ages"]
+        result_store["years"][:] = compiled["years"]
+    
+    def add_chunks(chunks):
+        # Chunks come in order from both map implementations
+        first_path = 0
+        for chunk in chunks:
+            values = chunk.reshape(len(chunk), -1)
+            update_quantile_sketch(sketch, values)
+            totals[:] += values.sum(axis=0)
+            if result_store is not None:
+                result_store["fund_values"][first_path:first_path + len(chunk)] = chunk
+            first_path += len(chunk)
+    
+    if workers > 1 and len(chunk_sizes) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            add_chunks(executor.map(simulate_stochastic_chunk, *chunk_arguments))
+    else:
+        add_chunks(map(simulate_stochastic_chunk, *chunk_arguments))
+    if result_store is not None:
+        flush_result_store(result_store)
+    
+    return {
+        "quantiles": query_quantile_sketch(sketch, quantiles).reshape(len(quantiles), n_options, n_periods),
+        "mean": (totals / n_paths).reshape(n_options, n_periods),
+        "ages": compiled["ages"],
+        "years": compiled["years"]
+    }
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def cached_simulate_stochastic(plan_settings, n_paths, seed, salary_volatility, yield_volatility, correlation,
+                               sketch_size=STOCHASTIC_SKETCH_SIZE, _workers=1):
+    """
+    Cached version of simulate_stochastic, without kept paths.
+    
+    Keyed on the plan settings, the paths, the seed, the volatilities, the correlation
+    and the sketch size; the number of workers does not change the results and is not
+    part of the key.
+    """
+    return simulate_stochastic(
+        plan_settings, n_paths, seed, salary_volatility, yield_volatility, correlation,
+        _workers, sketch_size=sketch_size
+    )
+
+def format_month_labels(sim):
+    """Format the month labels of a monthly projection, with special handling for the 13th month."""
+    labels = sim["Date"].dt.strftime("%b %Y")
+    
+    if "Is13thMonth" in sim:
+        # Format based on language
+        prefix = {"de": "13er", "fr": "13e", "it": "13a"}.get(st.session_state.language, "13th")
+        thirteenth_labels = prefix + " " + sim["Year"].astype(str)
+        labels = labels.where(~sim["Is13thMonth"].astype(bool), thirteenth_labels)
+    
+    return labels
+
+def get_print_css():
+    """Return minimal CSS styling for the app"""
+    return """
+        <style>
+        /* Basic styling for the app */
+        .dataframe {
+            width: 100%;
+            max-width: 100%;
+        }
+        </style>
+    """
+
+def generate_printable_html(simulations, is_monthly=False):
+    """
+    Generate a standalone HTML document for printing
+    
+    Parameters:
+    - simulations: List of DataFrames with simulation results
+    - is_monthly: Whether the view is monthly or yearly
+    
+    Returns:
+    - HTML string of the printable document
+    """
+    if not simulations:
+        return None
+    
+    # Prepare data for each section
+    final_values_data = []
+    for sim in simulations:
+        final_value = sim["Fund Value"].iloc[-1]
+        option_name = sim["Option"].iloc[0]
+        final_values_data.append({"Option": option_name, "Final Value": final_value})
+    
+    # Convert to HTML tables
+    final_values_df = pd.DataFrame(final_values_data)
+    final_values_html = final_values_df.style.format({"Final Value": "CHF {:,.0f}"}).to_html()
+    
+    # Create detailed tables for each option
+    detailed_tables = []
+    for sim in simulations:
+        option_name = sim["Option"].iloc[0]
+        
+        # Format the table
+        if is_monthly:
+            detailed_df = sim.copy()
+            detailed_df["Month"] = format_month_labels(detailed_df)
+            columns_to_show = ["Month", "Age", "Salary", "Insurable Salary", "Personal Contribution", "Employer Contribution", "Total Contribution", "Fund Value"]
+        else:
+            detailed_df = sim.copy()
+            detailed_df["Year"] = detailed_df["Date"].dt.year
+            columns_to_show = ["Year", "Age", "Salary", "Insurable Salary", "Personal Contribution", "Employer Contribution", "Total Contribution", "Fund Value"]
+        if "Buy-in" in detailed_df:
+            columns_to_show.insert(columns_to_show.index("Total Contribution"), "Buy-in")
+        
+        formatted_df = detailed_df[columns_to_show].style.format({
+            "Salary": "CHF {:,.0f}",
+            "Insurable Salary": "CHF {:,.0f}",
+            "Personal Contribution": "CHF {:,.0f}",
+            "Employer Contribution": "CHF {:,.0f}",
+            "Buy-in": "CHF {:,.0f}",
+            "Total Contribution": "CHF {:,.0f}",
+            "Fund Value": "CHF {:,.0f}"
+        })
+        
+        table_html = formatted_df.to_html()
+        detailed_tables.append((option_name, table_html))
+    
+    # Generate charts for comparison and each option
+    import io
+    import base64
+    import plotly.io as pio
+    
+    # Comparison chart
+    combined_df = downsample_lines(pd.concat(simulations), "Fund Value", ["Option"])
+    fig_comparison = px.line(combined_df, x="Age", y="Fund Value", color="Option",
+                title=t("fund_growth_comparison"),
+                labels={"Fund Value": t("total_fund_value"), "Age": t("age")})
+    
+    fig_comparison.update_layout(
+        height=500,
+        margin=dict(l=50, r=50, t=80, b=50),
+        paper_bgcolor='white',
+        plot_bgcolor='white'
+    )
+    
+    comparison_chart_img = pio.to_image(fig_comparison, format="png", width=800, height=400)
+    comparison_chart_base64 = base64.b64encode(comparison_chart_img).decode('utf-8')
+    
+    # Contribution charts
+    contribution_charts = []
+    for sim in simulations:
+        option_name = sim["Option"].iloc[0]
+        
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=sim["Age"],
+            y=sim["Personal Contribution"],
+            name=t("personal_contribution"),
+            marker_color='#1f77b4'
+        ))
+        fig.add_trace(go.Bar(
+            x=sim["Age"],
+            y=sim["Employer Contribution"],
+            name=t("employer_contribution"),
+            marker_color='#72b7ec'
+        ))
+        fig.update_layout(
+            barmode="stack",
+            title=f"{t('annual_contributions')} - {option_name}",
+            xaxis_title=t("age"),
+            yaxis_title=t("total_contribution"),
+            height=400,
+            margin=dict(l=50, r=50, t=80, b=50),
+            paper_bgcolor='white',
+            plot_bgcolor='white'
+        )
+        
+        chart_img = pio.to_image(fig, format="png", width=800, height=400)
+        chart_base64 = base64.b64encode(chart_img).decode('utf-8')
+        contribution_charts.append((option_name, chart_base64))
+    
+    # Build the complete HTML document with proper page breaks
+    html = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Pension Fund Report</title>
+        <style>
+            body {{
+                font-family: Arial, sans-serif;
+                margin: 0;
+                padding: 0;
+            }}
+            .page {{
+                page-break-after: always;
+                padding: 20px 30px;
+            }}
             .last-page {{
                 padding: 20px 30px;
             }}
@@ -1313,6 +3651,105 @@ def generate_printable_html(simulations, is_monthly=False):
     
     return html
 
+@st.cache_data(show_spinner=False, max_entries=20)
+def cached_printable_html(simulations, is_monthly, language):
+    """
+    Cached version of generate_printable_html.
+    
+    The chart images are rendered with Kaleido, which is slow, so the report is
+    only rebuilt when the simulations or the (report) language change.
+    """
+    return generate_printable_html(simulations, is_monthly)
+
+def lttb_indices(x, y, n_out):
+    """
+    Select the points to keep with the Largest-Triangle-Three-Buckets algorithm.
+    
+    This shape-preserving downsampling keeps the first and last points and, for
+    each bucket in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket.
+    
+    Returns:
+    - Numpy array with the indices of the kept points
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    
+    # n_out - 2 buckets between the first and the last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i < n_out - 3 else (n - 1, n)
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        indices[i + 1] = previous
+    
+    return indices
+
+def downsample_lines(chart_df, y, line_columns, max_points=CHART_MAX_POINTS_PER_LINE):
+    """Downsample each line of a long-format chart frame with LTTB (rows keep their order)."""
+    if chart_df.groupby(line_columns, sort=False, observed=True).size().max() <= max_points:
+        return chart_df
+    
+    parts = []
+    for _, line_df in chart_df.groupby(line_columns, sort=False, observed=True):
+        # Use the period position as x so that months sharing the same age stay distinct
+        keep = lttb_indices(np.arange(len(line_df)), line_df[y].to_numpy(), max_points)
+        parts.append(line_df.iloc[keep])
+    return pd.concat(parts)
+
+def create_fund_growth_figure(chart_df, color, line_dash=None, full_resolution=False):
+    """
+    Create the fund growth line chart for one or more simulations.
+    
+    Parameters:
+    - chart_df: Long-format frame with "Age", "Year" and "Fund Value" columns
+    - color: Column used to color the lines
+    - line_dash: Optional column used for the line dash
+    - full_resolution: Whether to draw all points instead of a downsampled series
+    
+    Returns:
+    - The Plotly figure (drawn with WebGL above CHART_WEBGL_THRESHOLD points)
+    """
+    line_columns = [column for column in (color, line_dash) if column]
+    if not full_resolution:
+        chart_df = downsample_lines(chart_df, "Fund Value", line_columns)
+    
+    fig = px.line(
+        chart_df,
+        x="Age",
+        y="Fund Value",
+        color=color,
+        line_dash=line_dash,
+        custom_data=["Year"],
+        render_mode="webgl" if len(chart_df) > CHART_WEBGL_THRESHOLD else "svg",
+        title=t("fund_growth_comparison"),
+        labels={"Fund Value": t("total_fund_value"), "Age": t("age")}
+    )
+    
+    # Update hover template to include year
+    fig.update_traces(
+        hovertemplate=f'{t("age")}: %{{x}}<br>{t("year")}: %{{customdata[0]}}<br>{t("fund_value")}: CHF %{{y:,.0f}}'
+    )
+    fig.update_layout(hovermode="x unified")
+    
+    return fig
+
 def create_download_link(html, filename="pension_report.html"):
     """Create a download link for the HTML file"""
     import base64
@@ -1453,6 +3890,44 @@ def create_contribution_chart(sim_data, option_name, container_id=None, static_p
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+def add_fan_traces(fig, x, lower, median, upper, labels, color="#1f77b4", name=None):
+    """
+    Add a fan chart band (filled between lower and upper) and its median line to a figure.
+    
+    Parameters:
+    - fig: Plotly figure
+    - x: Values of the x axis (e.g. ages)
+    - lower, median, upper: Values of the band and of its middle line
+    - labels: Legend labels of (lower, median, upper)
+    - color: Hex color of the line and (transparent) band
+    - name: Optional name prefixed to the labels (e.g. the plan)
+    """
+    red, green, blue = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+    prefix = f"{name} - " if name else ""
+    hovertemplate = 'CHF %{y:,.0f}<extra></extra>'
+    fig.add_trace(go.Scatter(
+        x=x, y=upper, name=prefix + labels[2], legendgroup=name,
+        line=dict(width=0), showlegend=False, hovertemplate=hovertemplate
+    ))
+    fig.add_trace(go.Scatter(
+        x=x, y=lower, name=prefix + labels[0], legendgroup=name,
+        fill="tonexty", fillcolor=f"rgba({red}, {green}, {blue}, 0.2)", line=dict(width=0),
+        showlegend=False, hovertemplate=hovertemplate
+    ))
+    fig.add_trace(go.Scatter(
+        x=x, y=median, name=prefix + labels[1], legendgroup=name,
+        line=dict(color=color), hovertemplate=hovertemplate
+    ))
+
+def update_fan_layout(fig):
+    """Apply the axis titles and CHF formatting of the fan charts."""
+    fig.update_layout(
+        xaxis_title=t("age"),
+        yaxis_title=t("fund_value"),
+        hovermode="x unified",
+        yaxis=dict(tickformat="CHF,.0f")
+    )
+
 def get_fund_value_at_date(simulation_df, target_date):
     """Get the fund value at a specific date from the simulation."""
     if simulation_df.empty:
@@ -1464,6 +3939,288 @@ def get_fund_value_at_date(simulation_df, target_date):
     
     return closest_row['Fund Value']
 
+def get_annual_pension(simulation_df, plan_settings):
+    """Get the annual pension at retirement from the final fund value and the conversion rate(s)."""
+    final_row = simulation_df.iloc[-1]
+    if "Mandatory Fund Value" in simulation_df:
+        return (
+            final_row["Extra-mandatory Fund Value"] * plan_settings["conversion_rate"] / 100
+            + final_row["Mandatory Fund Value"] * plan_settings["mandatory_conversion_rate"] / 100
+        )
+    return final_row["Fund Value"] * plan_settings["conversion_rate"] / 100
+
+# Payout phase functions
+def sample_lognormal_returns(rng, size, mean_yield, volatility):
+    """
+    Sample yearly returns with lognormal growth factors, so no return is below -100%.
+    
+    Parameters:
+    - rng: Numpy random generator
+    - size: Shape of the sample
+    - mean_yield: Expected yearly return (e.g. 0.02 for 2%)
+    - volatility: Standard deviation of the yearly return (e.g. 0.05 for 5%)
+    
+    Returns:
+    - Numpy array of returns with the given mean and standard deviation
+    """
+    sigma_squared = np.log1p((volatility / (1 + mean_yield)) ** 2)
+    log_growth = rng.normal(np.log1p(mean_yield) - sigma_squared / 2, np.sqrt(sigma_squared), size)
+    return np.expm1(log_growth)
+
+def simulate_payouts(capital, full_annuity, annuity_shares, retirement_age, drawdown_yield, drawdown_end_age,
+                     ahv_annual=0.0, ahv_age=None, returns=None, max_age=PAYOUT_MAX_AGE):
+    """
+    Project the payout phase for several annuity / lump-sum splits at once.
+    
+    For each annuity share, that share of the capital is converted into a lifelong
+    annuity and the rest is withdrawn as a lump sum, invested and drawn down in level
+    yearly withdrawals (at the start of each year) until drawdown_end_age. With
+    growth G[k] over the first k years, the lump-sum balance at the start of year k is
+    B[k] = G[k] * (L - W * sum(1 / G[j] for drawdown years j < k)), so the whole phase is evaluated
+    without a loop. Depletion is absorbing: once the lump sum is used up, the balance
+    and the withdrawals stay at 0.
+    
+    Parameters:
+    - capital: Fund value at retirement
+    - full_annuity: Annual annuity if the whole capital is converted
+    - annuity_shares: Array of annuity shares (0 to 1) to compare
+    - retirement_age: Age at retirement
+    - drawdown_yield: Expected yield (%) of the invested lump sum
+    - drawdown_end_age: Age at which the lump sum should be used up
+    - ahv_annual: Annual 1st pillar (AHV/AVS) pension
+    - ahv_age: Age at which the 1st pillar pension starts (default: retirement_age)
+    - returns: Optional (scenarios, years) array of yearly returns of the lump sum
+      (e.g. 0.02 for 2%, clipped just above -100%); the expected yield is used when not given
+    - max_age: Last age of the projection
+    
+    Returns:
+    - Dictionary with the "ages", the yearly "ahv" pension, the yearly "annuity" per split,
+      the yearly "drawdown" withdrawals and the lump-sum "balance" at the start of each
+      year (per scenario and split when returns are given) and the planned "withdrawal"
+    """
+    ages = np.arange(retirement_age, max_age + 1)
+    shares = np.asarray(annuity_shares, dtype=float)
+    lump_sums = (1 - shares) * capital
+    
+    # Level withdrawal using the lump sum up by drawdown_end_age at the expected yield
+    drawdown_years = max(drawdown_end_age - retirement_age, 1)
+    rate = drawdown_yield / 100
+    if rate == 0:
+        annuity_due_factor = drawdown_years
+    else:
+        annuity_due_factor = (1 - (1 + rate) ** -drawdown_years) / rate * (1 + rate)
+    withdrawals = lump_sums / annuity_due_factor
+    
+    if returns is None:
+        returns = np.full((1, len(ages)), rate)
+    # A growth factor of 0 would break the closed form, the balance is depleted anyway
+    growth = np.cumprod(1 + np.maximum(returns[:, :len(ages)], -1 + 1e-9), axis=-1)
+    growth_before = np.concatenate([np.ones((len(growth), 1)), growth[:, :-1]], axis=-1)
+    # Only the years up to drawdown_end_age withdraw, a remaining balance keeps growing
+    in_drawdown = ages < retirement_age + drawdown_years
+    discounted_withdrawals = np.concatenate([np.zeros((len(growth), 1)), np.cumsum(in_drawdown / growth_before, axis=-1)[:, :-1]], axis=-1)
+    
+    # (scenarios, splits, years) balances before the withdrawal of each year
+    balance = growth_before[:, None, :] * (lump_sums[None, :, None] - withdrawals[None, :, None] * discounted_withdrawals[:, None, :])
+    balance = np.where(np.maximum.accumulate(balance <= 0, axis=-1), 0.0, balance)
+    drawdown = np.where(in_drawdown, np.clip(balance, 0, withdrawals[None, :, None]), 0.0)
+    
+    ahv_age = retirement_age if ahv_age is None else ahv_age
+    return {
+        "ages": ages,
+        "ahv": np.where(ages >= ahv_age, ahv_annual, 0.0),
+        "annuity": np.outer(shares * full_annuity, np.ones(len(ages))),
+        "drawdown": drawdown,
+        "balance": balance,
+        "withdrawal": withdrawals
+    }
+
+def summarize_payouts(payouts, survival=None, ages_at_death=None):
+    """
+    Summarize the payout phase of each split with the expected lifetime income.
+    
+    Parameters:
+    - payouts: Result of simulate_payouts
+    - survival: Probability to be alive at the start of each year (deterministic longevity)
+    - ages_at_death: Sampled age at death of each scenario (Monte Carlo longevity)
+    
+    Returns:
+    - Dictionary of arrays per split: "first_year_income", "late_income" (after the
+      drawdown), "expected_income" (lifetime) and, with ages at death, the 10th
+      percentile of the lifetime income and the median lump sum left at death
+    """
+    income = payouts["ahv"] + payouts["annuity"] + payouts["drawdown"]  # (scenarios, splits, years)
+    summary = {
+        "first_year_income": income[:, :, 0].mean(axis=0),
+        "late_income": payouts["ahv"][-1] + payouts["annuity"][:, -1]
+    }
+    
+    if ages_at_death is None:
+        summary["expected_income"] = (income * survival).sum(axis=-1).mean(axis=0)
+        return summary
+    
+    # A payment is received when alive at the start of the year
+    alive = payouts["ages"][None, :] < ages_at_death[:, None]
+    lifetime_income = (income * alive[:, None, :]).sum(axis=-1)
+    year_of_death = np.clip(np.searchsorted(payouts["ages"], ages_at_death), 0, len(payouts["ages"]) - 1)
+    left_at_death = np.take_along_axis(
+        payouts["balance"] - payouts["drawdown"], np.broadcast_to(year_of_death[:, None, None], lifetime_income.shape + (1,)), axis=-1
+    )[..., 0]
+    
+    summary["expected_income"] = lifetime_income.mean(axis=0)
+    summary["income_p10"] = np.percentile(lifetime_income, 10, axis=0)
+    summary["median_left_at_death"] = np.median(left_at_death, axis=0)
+    return summary
+
+# Life table functions
+def gompertz_makeham_rates(makeham, gompertz, growth, ages):
+    """
+    Get yearly mortality rates q(x) from a Gompertz-Makeham force of mortality
+    mu(x) = makeham + gompertz * exp(growth * x).
+    
+    Returns:
+    - Numpy array of the probabilities of dying within a year at each age
+    """
+    ages = np.asarray(ages, dtype=float)
+    cumulative_hazard = makeham + gompertz * np.exp(growth * ages) * np.expm1(growth) / growth
+    return -np.expm1(-cumulative_hazard)
+
+def get_mortality_rates(mortality_table=None):
+    """
+    Get the mortality rates of the life table, indexed by sex and age.
+    
+    Parameters:
+    - mortality_table: Optional imported rows with "age", "male" and "female" mortality
+      rates; ages between the rows are interpolated and ages outside of them use the
+      bundled Gompertz-Makeham approximation
+    
+    Returns:
+    - Numpy array of shape (len(SEXES), MORTALITY_MAX_AGE + 1), everyone dies by MORTALITY_MAX_AGE
+    """
+    ages = np.arange(MORTALITY_MAX_AGE + 1)
+    rates = np.array([gompertz_makeham_rates(*GOMPERTZ_MAKEHAM_PARAMETERS[sex], ages) for sex in SEXES])
+    
+    if mortality_table:
+        table = pd.DataFrame(mortality_table).sort_values("age")
+        inside = (ages >= table["age"].min()) & (ages <= table["age"].max())
+        for s, sex in enumerate(SEXES):
+            rates[s, inside] = np.interp(ages[inside], table["age"], table[sex])
+    
+    rates[:, -1] = 1.0
+    return np.clip(rates, 0.0, 1.0)
+
+def parse_mortality_table(uploaded_file):
+    """
+    Parse a CSV life table with an age column and the mortality rates q(x) of men and women.
+    
+    The columns are detected by name (age/alter/âge/età, male/men/mann/homme/uomo and
+    female/women/frau/femme/donna), falling back to the first three columns. Rates
+    given in per mille (above 1) are converted to probabilities.
+    
+    Returns:
+    - List of {"age", "male", "female"} rows, or None if the file is not a valid life table
+    """
+    try:
+        raw = pd.read_csv(uploaded_file, sep=None, engine="python")
+    except Exception:
+        return None
+    
+    if raw.shape[1] < 3:
+        return None
+    
+    table = pd.DataFrame({
+        "age": pd.to_numeric(raw[find_csv_column(raw.columns, ["age", "alter", "âge", "età", "x"], 0, exact=True)], errors="coerce"),
+        "male": pd.to_numeric(raw[find_csv_column(raw.columns, ["male", "men", "m", "mann", "männer", "homme", "hommes", "uomo", "uomini"], 1, exact=True)], errors="coerce"),
+        "female": pd.to_numeric(raw[find_csv_column(raw.columns, ["female", "women", "f", "w", "frau", "frauen", "femme", "femmes", "donna", "donne"], 2, exact=True)], errors="coerce")
+    }).dropna()
+    
+    if len(table) < 2:
+        return None
+    
+    for sex in SEXES:
+        if table[sex].max() > 1:
+            table[sex] = table[sex] / 1000
+    table["age"] = table["age"].astype(int)
+    return table.drop_duplicates("age", keep="last").to_dict("records")
+
+def survival_probabilities(mortality_rates, sexes, start_ages, n_years):
+    """
+    Get the probabilities of being alive at the start of each year, for many people at once.
+    
+    Parameters:
+    - mortality_rates: Mortality rates by sex and age (see get_mortality_rates)
+    - sexes: Sex ("male" or "female") of each person
+    - start_ages: Age of each person at the start of the first year
+    - n_years: Number of years
+    
+    Returns:
+    - Numpy array of shape (people, n_years); the first year has probability 1
+    """
+    sex_index = (np.asarray(sexes) == "female").astype(int)
+    ages = np.minimum(np.asarray(start_ages, dtype=int)[:, None] + np.arange(n_years), MORTALITY_MAX_AGE)
+    yearly_survival = 1 - mortality_rates[sex_index[:, None], ages]
+    return np.concatenate([np.ones((len(ages), 1)), np.cumprod(yearly_survival, axis=1)[:, :-1]], axis=1)
+
+def sample_ages_at_death(rng, size, mortality_rates, sex, start_age):
+    """
+    Sample ages at death of people alive at start_age from the life table (inverse transform).
+    
+    The year of death is drawn from the survival probabilities and the death falls
+    uniformly within that year.
+    
+    Parameters:
+    - rng: Numpy random generator
+    - size: Number of people
+    - mortality_rates: Mortality rates by sex and age (see get_mortality_rates)
+    - sex: Sex ("male" or "female") of the people
+    - start_age: Age at which the people are alive
+    
+    Returns:
+    - Numpy array of ages at death
+    """
+    survival = survival_probabilities(mortality_rates, [sex], [start_age], MORTALITY_MAX_AGE - start_age + 1)[0]
+    # Years survived: the number of year starts alive at, survival being decreasing
+    years_lived = np.searchsorted(-survival, -rng.random(size)) - 1
+    return start_age + years_lived + rng.random(size)
+
+def expected_present_values(mortality_rates, sexes, retirement_ages, annual_pensions,
+                            ahv_annuals, ahv_ages, discount_rates):
+    """
+    Get the expected present values at retirement of the 2nd pillar annuity and of the
+    1st pillar (AHV/AVS) pension, for many people (or plans and options) at once.
+    
+    Each pension is paid yearly in advance while alive, so its expected present value is
+    the dot product of the discounted survival probabilities with its yearly payments.
+    
+    Parameters:
+    - mortality_rates: Mortality rates by sex and age (see get_mortality_rates)
+    - sexes: Sex of each person
+    - retirement_ages: Age of each person at retirement
+    - annual_pensions: Annual 2nd pillar annuity of each person
+    - ahv_annuals: Annual 1st pillar pension of each person
+    - ahv_ages: Age at which the 1st pillar pension of each person starts
+    - discount_rates: Technical interest rate (%) of each person
+    
+    Returns:
+    - Tuple of numpy arrays: expected present values of the annuities and of the 1st pillar pensions
+    """
+    retirement_ages = np.asarray(retirement_ages, dtype=int)
+    n_years = MORTALITY_MAX_AGE - int(retirement_ages.min(initial=MORTALITY_MAX_AGE)) + 1
+    years = np.arange(n_years)
+    
+    survival = survival_probabilities(mortality_rates, sexes, retirement_ages, n_years)
+    discount = (1 + np.asarray(discount_rates, dtype=float)[:, None] / 100) ** -years
+    weights = survival * discount
+    
+    ahv_payments = np.where(
+        years >= (np.asarray(ahv_ages) - retirement_ages)[:, None],
+        np.asarray(ahv_annuals, dtype=float)[:, None],
+        0.0
+    )
+    annuity_values = weights.sum(axis=1) * np.asarray(annual_pensions, dtype=float)
+    ahv_values = np.einsum("nk,nk->n", weights, ahv_payments)
+    return annuity_values, ahv_values
+
 # 1st Pillar calculation functions
 def get_minimum_contribution(year, minimum_contributions):
     """Get minimum contribution for a specific year."""
@@ -1481,25 +4238,160 @@ def get_average_annual_income(year, average_annual_incomes):
             applicable_income = entry["amount"]
     return applicable_income
 
-def get_monthly_pension_amount(average_income, monthly_payout_rates):
-    """Get the monthly pension amount based on the average income."""
-    applicable_amount = 0
-    for rate in sorted(monthly_payout_rates, key=lambda x: x["income_from"]):
-        if rate["income_from"] <= average_income <= rate["income_to"]:
-            applicable_amount = rate["monthly_amount"]
-            break
-    return applicable_amount
+def get_monthly_pension_amount(average_income, monthly_payout_rates):
+    """Get the monthly pension amount based on the average income."""
+    applicable_amount = 0
+    for rate in sorted(monthly_payout_rates, key=lambda x: x["income_from"]):
+        if rate["income_from"] <= average_income <= rate["income_to"]:
+            applicable_amount = rate["monthly_amount"]
+            break
+    return applicable_amount
+
+def get_yearly_income(year, yearly_incomes, default_income=0):
+    """Get the yearly income for a specific year based on user-defined ranges."""
+    if not yearly_incomes:
+        return default_income
+        
+    applicable_income = default_income
+    for entry in yearly_incomes:
+        if entry["year_from"] <= year <= entry["year_to"]:
+            applicable_income = entry["amount"]
+    return applicable_income
+
+def compile_yearly_incomes(yearly_incomes, start_year, end_year, default_income=0):
+    """
+    Compile user-defined yearly income ranges into one income array.
+
+    Parameters:
+    - yearly_incomes: List of yearly income ranges (year_from, year_to, amount)
+    - start_year: First year of the array
+    - end_year: Last year of the array (inclusive)
+    - default_income: Income for years not covered by any range
+
+    Returns:
+    - Numpy array with one income per year from start_year to end_year
+    """
+    incomes = np.full(max(0, end_year - start_year + 1), float(default_income))
+    # Later ranges override earlier ones, as in get_yearly_income
+    for entry in yearly_incomes or []:
+        first = max(entry["year_from"], start_year) - start_year
+        last = min(entry["year_to"], end_year) - start_year
+        if first <= last:
+            incomes[first:last + 1] = entry["amount"]
+    return incomes
+
+def compile_from_year_values(entries, years, value_key="amount", default=0):
+    """Look up a "from_year" schedule (e.g. minimum contributions) for an array of years."""
+    years = np.asarray(years)
+    if not entries:
+        return np.full(years.shape, float(default))
+    sorted_entries = sorted(entries, key=lambda x: x["from_year"])
+    from_years = np.array([entry["from_year"] for entry in sorted_entries])
+    values = np.array([float(default)] + [entry[value_key] for entry in sorted_entries])
+    # Index 0 is the default for years before the first entry
+    return values[np.searchsorted(from_years, years, side="right")]
+
+def compile_year_amounts(entries, years, value_key="amount"):
+    """Sum the amounts of a "year" list (e.g. buy-ins) for an array of years (0 for years without entries)."""
+    years = np.asarray(years)
+    if not entries:
+        return np.zeros(years.shape)
+    entry_years = np.array([entry["year"] for entry in entries])
+    amounts = np.array([float(entry[value_key]) for entry in entries])
+    return (amounts * (years[..., None] == entry_years)).sum(axis=-1)
+
+def find_csv_column(columns, keywords, fallback, exact=False):
+    """
+    Find the column of a parsed CSV file by its (multilingual) header.
+    
+    Parameters:
+    - columns: Columns of the parsed file
+    - keywords: Lowercase keywords of the column
+    - fallback: Position of the column when no header matches
+    - exact: Whether the header must equal a keyword instead of containing one (for
+      short keywords like "m" or "f")
+    
+    Returns:
+    - The first matching column, or the column at the fallback position
+    """
+    for column in columns:
+        header = str(column).strip().lower()
+        if (header in keywords) if exact else any(keyword in header for keyword in keywords):
+            return column
+    return columns[fallback]
+
+def parse_amounts(values):
+    """
+    Parse a column of amounts written with Swiss, German, French or English separators.
+    
+    The last "." or "," is the decimal mark unless exactly three digits follow it and the
+    other separator is not used (85'000.50, 85.000,50, 85 000,50, 85000,50 and 85,000.50
+    are all 85000.5, while 85.000 and 1,250,000 are thousands).
+    
+    Parameters:
+    - values: Series of strings
+    
+    Returns:
+    - Series of floats, NaN for unparseable values
+    """
+    cleaned = values.str.replace(r"[^\d.,\-]", "", regex=True)
+    parts = cleaned.str.extract(r"^(.*?)(?:[.,](\d*))?$")
+    whole, fraction = parts[0].str.replace(r"[.,]", "", regex=True), parts[1]
+    mixed = cleaned.str.contains(",", regex=False) & cleaned.str.contains(".", regex=False)
+    is_decimal = fraction.notna() & ((fraction.str.len() != 3) | mixed)
+    number = whole + np.where(is_decimal, "." + fraction.fillna(""), fraction.fillna(""))
+    return pd.to_numeric(number, errors="coerce")
+
+def parse_income_history(uploaded_file):
+    """
+    Parse a year/income file (e.g. an individual account (IK) extract exported to CSV).
+
+    The year and income columns are detected by name (year/jahr/année/anno and
+    income/einkommen/revenu/reddito), falling back to the first two columns.
+    Amounts may use Swiss or decimal-comma formatting (e.g. 85'000.00 or 85.000,00,
+    see parse_amounts). Several rows for the same year (e.g. several employers) are summed.
+
+    Returns:
+    - DataFrame with "Year" and "Income" columns sorted by year, or None if invalid
+    """
+    try:
+        raw = pd.read_csv(uploaded_file, sep=None, engine="python", dtype=str)
+    except Exception:
+        return None
+
+    if raw.shape[1] < 2:
+        return None
+
+    year_column = find_csv_column(raw.columns, ["year", "jahr", "année", "annee", "anno"], 0)
+    income_column = find_csv_column(raw.columns, ["income", "einkommen", "revenu", "reddito", "amount", "betrag", "montant", "importo"], 1)
 
-def get_yearly_income(year, yearly_incomes, default_income=0):
-    """Get the yearly income for a specific year based on user-defined ranges."""
-    if not yearly_incomes:
-        return default_income
-        
-    applicable_income = default_income
-    for entry in yearly_incomes:
-        if entry["year_from"] <= year <= entry["year_to"]:
-            applicable_income = entry["amount"]
-    return applicable_income
+    # Parse both columns in one vectorized pass
+    years = pd.to_numeric(raw[year_column].str.strip(), errors="coerce")
+    incomes = parse_amounts(raw[income_column])
+    history = pd.DataFrame({"Year": years, "Income": incomes}).dropna()
+    history = history[(history["Year"] >= 1900) & (history["Year"] <= 2100)]
+
+    if history.empty:
+        return None
+
+    history["Year"] = history["Year"].astype(int)
+    return history.groupby("Year", as_index=False)["Income"].sum()
+
+def income_history_to_ranges(history):
+    """Compress a Year/Income history into yearly income ranges (consecutive equal years are merged)."""
+    years = history["Year"].to_numpy()
+    incomes = history["Income"].round().astype(int).to_numpy()
+
+    # A new range starts whenever the year is not consecutive or the amount changes
+    starts = np.ones(len(years), dtype=bool)
+    starts[1:] = (np.diff(years) != 1) | (np.diff(incomes) != 0)
+    start_idx = np.flatnonzero(starts)
+    end_idx = np.append(start_idx[1:], len(years)) - 1
+
+    return [
+        {"year_from": int(years[s]), "year_to": int(years[e]), "amount": int(incomes[s])}
+        for s, e in zip(start_idx, end_idx)
+    ]
 
 def calculate_first_pillar_pension(
     birth_date, retirement_age, retirement_offset_years,
@@ -1533,32 +4425,24 @@ def calculate_first_pillar_pension(
     # Calculate contribution start year (age 21)
     start_year = birth_date.year + 21
     
-    # Initialize variables for standard calculation
-    standard_contribution_years = []
-    standard_incomes = []
-    standard_min_contributions = []
-    standard_penalties = []
-    standard_total_income = 0
-    standard_valid_years = 0
-    standard_penalty_years = 0
+    # For display purposes, we'll use the adjusted retirement data
+    adjusted_retirement_age = retirement_age + retirement_offset_years
+    retirement_year = birth_date.year + adjusted_retirement_age
+    
+    # Compile incomes and minimum contributions once for all years needed
+    last_year = max(standard_retirement_year, retirement_year)
+    all_years = np.arange(start_year, last_year + 1)
+    all_incomes = compile_yearly_incomes(yearly_incomes, start_year, last_year, 0)
+    all_min_contributions = compile_from_year_values(minimum_contributions, all_years)
+    all_penalties = all_incomes < all_min_contributions
     
     # Calculate for standard retirement
-    for year in range(start_year, standard_retirement_year + 1):
-        income = get_yearly_income(year, yearly_incomes, 0)
-        min_contribution = get_minimum_contribution(year, minimum_contributions)
-        
-        is_penalty_year = income < min_contribution
-        
-        standard_contribution_years.append(year)
-        standard_incomes.append(income)
-        standard_min_contributions.append(min_contribution)
-        standard_penalties.append(is_penalty_year)
-        
-        if not is_penalty_year:
-            standard_total_income += income
-            standard_valid_years += 1
-        else:
-            standard_penalty_years += 1
+    n_standard = max(0, standard_retirement_year - start_year + 1)
+    standard_contribution_years = all_years[:n_standard]
+    standard_penalties = all_penalties[:n_standard]
+    standard_valid_years = int(np.count_nonzero(~standard_penalties))
+    standard_penalty_years = int(np.count_nonzero(standard_penalties))
+    standard_total_income = all_incomes[:n_standard][~standard_penalties].sum()
     
     # Calculate average income over valid contribution years
     standard_avg_income = standard_total_income / max(1, standard_valid_years)
@@ -1566,36 +4450,12 @@ def calculate_first_pillar_pension(
     # Calculate contribution percentage
     contribution_percentage = min(1.0, standard_valid_years / required_contribution_years)
     
-    # For display purposes, we'll use the adjusted retirement data
-    adjusted_retirement_age = retirement_age + retirement_offset_years
-    retirement_year = birth_date.year + adjusted_retirement_age
-    
-    # Initialize variables for adjusted calculation
-    adjusted_contribution_years = []
-    adjusted_incomes = []
-    adjusted_min_contributions = []
-    adjusted_penalties = []
-    adjusted_total_income = 0
-    adjusted_valid_years = 0
-    adjusted_penalty_years = 0
-    
-    # Calculate adjusted years data for visualization
-    for year in range(start_year, retirement_year + 1):
-        income = get_yearly_income(year, yearly_incomes, 0)
-        min_contribution = get_minimum_contribution(year, minimum_contributions)
-        
-        is_penalty_year = income < min_contribution
-        
-        adjusted_contribution_years.append(year)
-        adjusted_incomes.append(income)
-        adjusted_min_contributions.append(min_contribution)
-        adjusted_penalties.append(is_penalty_year)
-        
-        if not is_penalty_year:
-            adjusted_total_income += income
-            adjusted_valid_years += 1
-        else:
-            adjusted_penalty_years += 1
+    # Adjusted years data for visualization
+    n_adjusted = max(0, retirement_year - start_year + 1)
+    adjusted_contribution_years = all_years[:n_adjusted]
+    adjusted_incomes = all_incomes[:n_adjusted]
+    adjusted_min_contributions = all_min_contributions[:n_adjusted]
+    adjusted_penalties = all_penalties[:n_adjusted]
     
     # Get the maximum reference income for the standard retirement year
     max_reference_income = get_average_annual_income(standard_retirement_year, average_annual_incomes)
@@ -1635,7 +4495,7 @@ def calculate_first_pillar_pension(
     # Create the yearly data DataFrame for visualization
     yearly_data = pd.DataFrame({
         "Year": adjusted_contribution_years,
-        "Age": [year - birth_date.year for year in adjusted_contribution_years],
+        "Age": adjusted_contribution_years - birth_date.year,
         "Income": adjusted_incomes,
         "Minimum Contribution": adjusted_min_contributions,
         "Is Penalty Year": adjusted_penalties
@@ -1664,6 +4524,46 @@ def calculate_first_pillar_pension(
     
     return result
 
+@st.cache_data(show_spinner=False, max_entries=50)
+def cached_first_pillar_pension(birth_date, retirement_age, first_pillar_data):
+    """Cached version of calculate_first_pillar_pension, keyed on all of its inputs."""
+    return calculate_first_pillar_pension(
+        birth_date,
+        retirement_age,
+        first_pillar_data.get("retirement_offset_years", 0),
+        first_pillar_data.get("yearly_incomes", []),
+        first_pillar_data.get("minimum_contributions", []),
+        first_pillar_data.get("average_annual_incomes", []),
+        first_pillar_data.get("monthly_payout_rates", []),
+        first_pillar_data.get("required_contribution_years", 45)
+    )
+
+def get_first_pillar_result(data, plan_data=None):
+    """
+    Get the (cached) 1st pillar pension result of the current data.
+    
+    Parameters:
+    - data: Pension data with the 1st pillar data
+    - plan_data: Plan whose birth date and retirement age are used (default: data)
+    
+    Returns:
+    - Dictionary with projection results (see calculate_first_pillar_pension)
+    """
+    plan_data = data if plan_data is None else plan_data
+    return cached_first_pillar_pension(
+        plan_data["birth_date"],
+        plan_data["retirement_age"],
+        data.get("first_pillar_data", DEFAULT_PENSION_DATA["first_pillar_data"])
+    )
+
+def get_first_pillar_annual_pension(data, plan_data=None):
+    """Get the annual 1st pillar pension and the years between the retirement and its start (see get_first_pillar_result)."""
+    plan_data = data if plan_data is None else plan_data
+    result = get_first_pillar_result(data, plan_data)
+    if not result:
+        return 0.0, 0
+    return 12 * result["monthly_pension"], result["retirement_age"] - plan_data["retirement_age"]
+
 def generate_first_pillar_html(result):
     """
     Generate a standalone HTML document for the 1st pillar report.
@@ -1903,6 +4803,64 @@ def generate_first_pillar_html(result):
 
     return html
 
+def currency_column_config(columns):
+    """Column config showing the given columns as CHF amounts, formatted client-side."""
+    return {column: st.column_config.NumberColumn(format="CHF %.0f") for column in columns}
+
+def schedule_editor(entries, columns, key, ranges=()):
+    """
+    Edit a schedule (list of dicts) with a single data editor table.
+
+    Parameters:
+    - entries: List of schedule entries, e.g. [{"from_year": 2000, "amount": 25725}]
+    - columns: List of (field, column config, type) tuples, one per column
+    - key: Unique widget key
+    - ranges: List of (start field, end field) pairs; rows whose end is before their
+      start are shown with an error and ignored
+
+    Returns:
+    - List of schedule entries as edited by the user
+    """
+    fields = [field for field, _, _ in columns]
+    state_key = f"{key}_state"
+
+    # Keep the editor input stable between reruns so that edits are not lost.
+    # Only reset it if the schedule was changed elsewhere (e.g. data import).
+    state = st.session_state.get(state_key)
+    if state is None or state["output"] != entries:
+        state = {
+            "base": pd.DataFrame(entries, columns=fields),
+            "output": entries
+        }
+        st.session_state[state_key] = state
+        if key in st.session_state:
+            del st.session_state[key]
+
+    edited_df = st.data_editor(
+        state["base"],
+        column_config={field: config for field, config, _ in columns},
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        key=key
+    )
+
+    # Convert back to schedule entries, ignoring incomplete rows and reversed ranges
+    complete = edited_df[fields].notna().all(axis=1).to_numpy()
+    reversed_rows = np.zeros(len(edited_df), dtype=bool)
+    for start, end in ranges:
+        reversed_rows |= complete & (edited_df[end] < edited_df[start]).to_numpy()
+    if reversed_rows.any():
+        st.error(t("invalid_schedule_ranges").format(rows=", ".join(str(row + 1) for row in np.flatnonzero(reversed_rows))))
+    edited_df = edited_df[complete & ~reversed_rows]
+    result = [
+        {field: cast(value) for (field, _, cast), value in zip(columns, row)}
+        for row in edited_df[fields].itertuples(index=False, name=None)
+    ]
+
+    state["output"] = result
+    return result
+
 # Streamlit app
 def main():
     st.set_page_config(
@@ -1938,7 +4896,7 @@ def main():
         st.rerun()
 
     # Sidebar for navigation
-    menu_options = [t("first_pillar"), t("pension_calculator"), t("plan_management"), t("comparison")]
+    menu_options = [t("first_pillar"), t("pension_calculator"), t("plan_management"), t("comparison"), t("payout_phase"), t("employer_view")]
     
     selected_menu = st.sidebar.selectbox(
         t("navigation"), 
@@ -1957,12 +4915,22 @@ def main():
     elif selected_menu == t("comparison"):
         simulations = []  # No simulations on this page
         comparison_page()
+    elif selected_menu == t("payout_phase"):
+        simulations = []  # No simulations on this page
+        payout_phase_page()
+    elif selected_menu == t("employer_view"):
+        simulations = []  # No simulations on this page
+        employer_page()
     
     # Print Report section in sidebar (before data management)
     if simulations:
         st.sidebar.markdown("---")
         st.sidebar.header(t("print_report"))
-        printable_html = generate_printable_html(simulations, is_monthly=(selected_menu == t("pension_calculator") and "is_monthly" in st.session_state and st.session_state.is_monthly))
+        printable_html = cached_printable_html(
+            simulations,
+            selected_menu == t("pension_calculator") and "is_monthly" in st.session_state and st.session_state.is_monthly,
+            st.session_state.language
+        )
         download_link = create_download_link(printable_html)
         st.sidebar.markdown(download_link, unsafe_allow_html=True)
         st.sidebar.markdown(t("print_instructions_1"))
@@ -1984,6 +4952,34 @@ def main():
         unsafe_allow_html=True
     )
     
+    # Export the projections of the current settings and all saved plans (prepared on
+    # demand, so the export is not built on every rerun)
+    st.sidebar.markdown(f"### {t('export_projections')}")
+    data = st.session_state.pension_data
+    export_cols = st.sidebar.columns(2)
+    with export_cols[0]:
+        export_format = st.selectbox(t("file_format"), list(EXPORT_FORMATS), format_func=str.capitalize, key="export_format")
+    with export_cols[1]:
+        export_frequency = st.selectbox(t("frequency"), ["yearly", "monthly"], format_func=t, key="export_frequency")
+    plan_names = [t("current_settings")] + list(data["pension_plans"])
+    plan_settings_list = [get_plan_settings(data)] + [get_plan_settings(plan) for plan in data["pension_plans"].values()]
+    export_key = (plan_settings_list, plan_names, export_frequency, export_format, st.session_state.language)
+    if st.sidebar.button(t("prepare_export"), key="prepare_projection_export"):
+        st.session_state.projection_export = (export_key, cached_projection_export(
+            plan_settings_list, plan_names, [f"{t('option')} {i+1}" for i in range(3)],
+            export_frequency == "monthly", export_format
+        ))
+    projection_export = st.session_state.get("projection_export")
+    if projection_export and projection_export[0] == export_key:
+        extension, mime = EXPORT_FORMATS[export_format]
+        st.sidebar.download_button(
+            t("download_projections"),
+            data=projection_export[1],
+            file_name=f"4sorge_projections.{extension}",
+            mime=mime,
+            key="download_projections"
+        )
+    
     # Import data button
     st.sidebar.markdown(f"### {t('import_data')}")
     uploaded_file = st.sidebar.file_uploader(t("upload_data"), type=['json'])
@@ -2009,377 +5005,677 @@ def pension_calculator_page():
     
     st.header(t("pension_calculator"))
     
-    # Configuration inputs (columns, personal info, etc.)
-    col1, col2 = st.columns(2)
+    # Inputs are batched in a form so that the simulation only reruns once a
+    # coherent set of changes is applied. Live mode reruns on every change.
+    live_mode = st.toggle(t("live_update"), key="live_update", help=t("live_update_info"))
+    input_container = st.container() if live_mode else st.form("calculator_inputs", border=False)
     
-    with col1:
-        # Personal information section
-        st.subheader(t("personal_information"))
-        birth_date = st.date_input(
-            t("date_of_birth"),
-            value=datetime.strptime(data["birth_date"], "%Y-%m-%d").date()
-        )
-        data["birth_date"] = birth_date.strftime("%Y-%m-%d")
-        
-        retirement_age = st.number_input(
-            t("retirement_age"),
-            min_value=50,
-            max_value=75,
-            value=data["retirement_age"]
-        )
-        data["retirement_age"] = retirement_age
-    
-        # Salary information section
-        st.subheader(t("salary_information"))
-        current_salary = st.number_input(
-            t("current_salary"),
-            min_value=0,
-            value=data["current_salary"],
-            step=1000
-        )
-        data["current_salary"] = current_salary
-        
-        default_max_salary = max(data["maximum_salary"], current_salary)
-        max_salary = st.number_input(
-            t("maximum_salary"),
-            min_value=current_salary,
-            value=default_max_salary,
-            step=1000
-        )
-        data["maximum_salary"] = max_salary
+    with input_container:
+        # Configuration inputs (columns, personal info, etc.)
+        col1, col2 = st.columns(2)
         
-        years_to_max = st.number_input(
-            t("years_to_max"),
-            min_value=0,
-            max_value=50,
-            value=data["years_to_max_salary"]
-        )
-        data["years_to_max_salary"] = years_to_max
-        
-        # Bonus settings section
-        st.subheader(t("bonus_settings"))
-        
-        has_13th_salary = st.checkbox(
-            t("13th_salary"),
-            value=data.get("has_13th_salary", False)
-        )
-        data["has_13th_salary"] = has_13th_salary
-        
-        bonus_options = [
-            ("no_bonus", t("no_bonus")),
-            ("percentage_bonus", t("percentage_bonus")),
-            ("fixed_amount", t("fixed_amount"))
-        ]
-        
-        default_bonus_type = data.get("bonus_type", "percentage")
-        default_idx = 0
-        for i, (val, _) in enumerate(bonus_options):
-            if val == "percentage" and default_bonus_type == "percentage":
-                default_idx = i
-                break
-            elif val == "fixed_amount" and default_bonus_type == "fixed":
-                default_idx = i
-                break
-        
-        bonus_type = st.radio(
-            t("bonus_settings"),
-            [label for _, label in bonus_options],
-            index=default_idx,
-            horizontal=True
-        )
-        
-        if bonus_type == t("percentage_bonus"):
-            data["bonus_type"] = "percentage"
-            bonus_percentage = st.number_input(
-                t("bonus_percentage"),
-                min_value=0.0,
-                max_value=100.0,
-                value=data.get("bonus_percentage", 0.0),
-                step=0.5
+        with col1:
+            # Personal information section
+            st.subheader(t("personal_information"))
+            birth_date = st.date_input(
+                t("date_of_birth"),
+                value=datetime.strptime(data["birth_date"], "%Y-%m-%d").date()
             )
-            data["bonus_percentage"] = bonus_percentage
-            data["bonus_fixed"] = 0.0
-        elif bonus_type == t("fixed_amount"):
-            data["bonus_type"] = "fixed"
-            bonus_fixed = st.number_input(
-                t("bonus_amount"),
+            data["birth_date"] = birth_date.strftime("%Y-%m-%d")
+            
+            retirement_age = st.number_input(
+                t("retirement_age"),
+                min_value=50,
+                max_value=75,
+                value=data["retirement_age"]
+            )
+            data["retirement_age"] = retirement_age
+        
+            # Salary information section
+            st.subheader(t("salary_information"))
+            current_salary = st.number_input(
+                t("current_salary"),
                 min_value=0,
-                value=data.get("bonus_fixed", 0),
+                value=data["current_salary"],
                 step=1000
             )
-            data["bonus_fixed"] = bonus_fixed
-            data["bonus_percentage"] = 0.0
-        else:  # No bonus
-            data["bonus_type"] = "no_bonus"
-            data["bonus_percentage"] = 0.0
-            data["bonus_fixed"] = 0.0
-    
-    with col2:
-        # Pension fund info section
-        st.subheader(t("pension_fund_info"))
-        
-        current_pension_value = st.number_input(
-            t("current_pension_value"),
-            min_value=0,
-            value=data["current_pension_value"],
-            step=1000
-        )
-        data["current_pension_value"] = current_pension_value
-        
-        current_value_date = st.date_input(
-            t("as_of_date"),
-            value=datetime.strptime(data["current_value_date"], "%Y-%m-%d").date()
-        )
-        data["current_value_date"] = current_value_date.strftime("%Y-%m-%d")
-        
-        expected_yield = st.number_input(
-            t("expected_yield"),
-            min_value=0.0,
-            max_value=20.0,
-            value=data["expected_yield"],
-            step=0.1
-        )
-        data["expected_yield"] = expected_yield
-        
-        # Contribution options section
-        st.subheader(t("contribution_options"))
-        contribution_tab, employer_tab, coordination_tab, occupation_tab = st.tabs([
-            t("personal_contributions"), 
-            t("employer_contributions"), 
-            t("coordination_fee"),
-            t("occupation_level")
-        ])
-        
-        with contribution_tab:
-            st.write(t("set_contribution_options"))
+            data["current_salary"] = current_salary
             
-            num_personal_ranges = st.number_input(
-                t("number_of_ranges"),
-                min_value=1,
-                max_value=10,
-                value=len(data.get("personal_contribution_ranges", DEFAULT_PENSION_DATA["personal_contribution_ranges"]))
+            default_max_salary = max(data["maximum_salary"], current_salary)
+            max_salary = st.number_input(
+                t("maximum_salary"),
+                min_value=current_salary,
+                value=default_max_salary,
+                step=1000
             )
+            data["maximum_salary"] = max_salary
             
-            personal_contribution_ranges = []
-            for i in range(num_personal_ranges):
-                st.write(f"{t('range')} {i+1}")
-                cols = st.columns(5)
-                
-                if "personal_contribution_ranges" in data and i < len(data["personal_contribution_ranges"]):
-                    default_range = data["personal_contribution_ranges"][i]
-                else:
-                    default_range = {
-                        "age_from": 22 + i * 10,
-                        "age_to": 34 + i * 10,
-                        "options": [5.95 + i, 6.95 + i, 8.0 + i]
-                    }
-                
-                with cols[0]:
-                    age_from = st.number_input(
-                        t("from_age"),
-                        min_value=18,
-                        max_value=70,
-                        value=default_range["age_from"],
-                        key=f"personal_age_from_{i}"
-                    )
-                
-                with cols[1]:
-                    age_to = st.number_input(
-                        t("to_age"),
-                        min_value=age_from + 1,
-                        max_value=70,
-                        value=default_range["age_to"],
-                        key=f"personal_age_to_{i}"
-                    )
-                
-                options = []
-                for j, col in enumerate([cols[2], cols[3], cols[4]]):
-                    with col:
-                        option_value = st.number_input(
-                            f"{t('option')} {j+1} (%)",
-                            min_value=0.0,
-                            max_value=50.0,
-                            value=default_range["options"][j] if j < len(default_range["options"]) else 6.0 + j,
-                            step=0.5,
-                            key=f"personal_option_{i}_{j}"
-                        )
-                        options.append(option_value)
-                
-                personal_contribution_ranges.append({
-                    "age_from": age_from,
-                    "age_to": age_to,
-                    "options": options
-                })
+            years_to_max = st.number_input(
+                t("years_to_max"),
+                min_value=0,
+                max_value=50,
+                value=data["years_to_max_salary"]
+            )
+            data["years_to_max_salary"] = years_to_max
+            
+            # Bonus settings section
+            st.subheader(t("bonus_settings"))
+            
+            has_13th_salary = st.checkbox(
+                t("13th_salary"),
+                value=data.get("has_13th_salary", False)
+            )
+            data["has_13th_salary"] = has_13th_salary
+            
+            bonus_options = [
+                ("no_bonus", t("no_bonus")),
+                ("percentage_bonus", t("percentage_bonus")),
+                ("fixed_amount", t("fixed_amount"))
+            ]
+            
+            default_bonus_type = data.get("bonus_type", "percentage")
+            default_idx = 0
+            for i, (val, _) in enumerate(bonus_options):
+                if val == "percentage" and default_bonus_type == "percentage":
+                    default_idx = i
+                    break
+                elif val == "fixed_amount" and default_bonus_type == "fixed":
+                    default_idx = i
+                    break
+            
+            bonus_type = st.radio(
+                t("bonus_settings"),
+                [label for _, label in bonus_options],
+                index=default_idx,
+                horizontal=True
+            )
+            
+            # Both amounts stay editable so that they can be changed together with the
+            # bonus type before recalculating; only the selected one is applied
+            bonus_cols = st.columns(2)
+            with bonus_cols[0]:
+                data["bonus_percentage"] = st.number_input(
+                    t("bonus_percentage"),
+                    min_value=0.0,
+                    max_value=100.0,
+                    value=float(data.get("bonus_percentage", 0.0)),
+                    step=0.5
+                )
+            with bonus_cols[1]:
+                data["bonus_fixed"] = st.number_input(
+                    t("bonus_amount"),
+                    min_value=0.0,
+                    value=float(data.get("bonus_fixed", 0.0)),
+                    step=1000.0
+                )
             
-            data["personal_contribution_ranges"] = personal_contribution_ranges
+            if bonus_type == t("percentage_bonus"):
+                data["bonus_type"] = "percentage"
+            elif bonus_type == t("fixed_amount"):
+                data["bonus_type"] = "fixed"
+            else:  # No bonus
+                data["bonus_type"] = "no_bonus"
         
-        with employer_tab:
-            st.write(t("configure_employer_contributions"))
+        with col2:
+            # Pension fund info section
+            st.subheader(t("pension_fund_info"))
             
-            num_employer_ranges = st.number_input(
-                t("number_of_ranges"),
-                min_value=1,
-                max_value=10,
-                value=len(data.get("employer_contributions", DEFAULT_PENSION_DATA["employer_contributions"])),
-                key="num_employer_ranges"
+            current_pension_value = st.number_input(
+                t("current_pension_value"),
+                min_value=0,
+                value=data["current_pension_value"],
+                step=1000
             )
+            data["current_pension_value"] = current_pension_value
             
-            employer_contributions = []
-            for i in range(num_employer_ranges):
-                st.write(f"{t('range')} {i+1}")
-                cols = st.columns(3)
-                
-                if "employer_contributions" in data and i < len(data["employer_contributions"]):
-                    default_range = data["employer_contributions"][i]
-                else:
-                    default_range = {
-                        "age_from": 22 + i * 10,
-                        "age_to": 34 + i * 10,
-                        "percentage": 6.8 + i * 2
-                    }
+            current_value_date = st.date_input(
+                t("as_of_date"),
+                value=datetime.strptime(data["current_value_date"], "%Y-%m-%d").date()
+            )
+            data["current_value_date"] = current_value_date.strftime("%Y-%m-%d")
+            
+            expected_yield = st.number_input(
+                t("expected_yield"),
+                min_value=float(YIELD_CALIBRATION_GRID[0]),
+                max_value=float(YIELD_CALIBRATION_GRID[-1]),
+                value=data["expected_yield"],
+                step=0.1
+            )
+            data["expected_yield"] = expected_yield
+            
+            data["conversion_rate"] = st.number_input(
+                t("conversion_rate"),
+                min_value=0.0,
+                max_value=10.0,
+                value=float(data.get("conversion_rate", DEFAULT_PENSION_DATA["conversion_rate"])),
+                step=0.1,
+                help=t("conversion_rate_info")
+            )
+            
+            # BVG mandatory and extra-mandatory accounts (all inputs stay visible so
+            # that they can be changed together with the mode before recalculating)
+            with st.expander(t("bvg_accounts")):
+                data["two_accounts"] = st.checkbox(
+                    t("two_accounts"),
+                    value=data.get("two_accounts", DEFAULT_PENSION_DATA["two_accounts"]),
+                    help=t("two_accounts_info")
+                )
                 
-                with cols[0]:
-                    age_from = st.number_input(
-                        t("from_age"),
-                        min_value=18,
-                        max_value=70,
-                        value=default_range["age_from"],
-                        key=f"employer_age_from_{i}"
+                account_cols = st.columns(2)
+                with account_cols[0]:
+                    data["current_mandatory_value"] = st.number_input(
+                        t("current_mandatory_value"),
+                        min_value=0,
+                        value=data.get("current_mandatory_value", DEFAULT_PENSION_DATA["current_mandatory_value"]),
+                        step=1000
                     )
-                
-                with cols[1]:
-                    age_to = st.number_input(
-                        t("to_age"),
-                        min_value=age_from + 1,
-                        max_value=70,
-                        value=default_range["age_to"],
-                        key=f"employer_age_to_{i}"
+                    data["mandatory_yield"] = st.number_input(
+                        t("mandatory_yield"),
+                        min_value=0.0,
+                        max_value=20.0,
+                        value=float(data.get("mandatory_yield", DEFAULT_PENSION_DATA["mandatory_yield"])),
+                        step=0.05
                     )
-                
-                with cols[2]:
-                    percentage = st.number_input(
-                        t("contribution_percentage"),
+                with account_cols[1]:
+                    data["bvg_upper_limit"] = st.number_input(
+                        t("bvg_upper_limit"),
+                        min_value=0,
+                        value=data.get("bvg_upper_limit", DEFAULT_PENSION_DATA["bvg_upper_limit"]),
+                        step=100
+                    )
+                    data["mandatory_conversion_rate"] = st.number_input(
+                        t("mandatory_conversion_rate"),
                         min_value=0.0,
-                        max_value=50.0,
-                        value=default_range["percentage"],
-                        step=0.5,
-                        key=f"employer_contribution_{i}"
+                        max_value=10.0,
+                        value=float(data.get("mandatory_conversion_rate", DEFAULT_PENSION_DATA["mandatory_conversion_rate"])),
+                        step=0.1
                     )
-                
-                employer_contributions.append({
-                    "age_from": age_from,
-                    "age_to": age_to,
-                    "percentage": percentage
-                })
-            
-            data["employer_contributions"] = employer_contributions
             
-        with coordination_tab:
-            st.write(t("coordination_fee_info"))
+            # Life expectancy used for the expected present values
+            with st.expander(t("life_expectancy")):
+                life_cols = st.columns(2)
+                with life_cols[0]:
+                    data["sex"] = st.selectbox(
+                        t("sex"),
+                        SEXES,
+                        index=SEXES.index(data.get("sex", DEFAULT_PENSION_DATA["sex"])),
+                        format_func=t
+                    )
+                with life_cols[1]:
+                    data["technical_interest_rate"] = st.number_input(
+                        t("technical_interest_rate"),
+                        min_value=0.0,
+                        max_value=10.0,
+                        value=float(data.get("technical_interest_rate", DEFAULT_PENSION_DATA["technical_interest_rate"])),
+                        step=0.25,
+                        help=t("technical_interest_rate_info")
+                    )
             
-            num_coordination_entries = st.number_input(
-                t("number_of_entries"),
-                min_value=1,
-                max_value=10,
-                value=len(data.get("coordination_fees", DEFAULT_PENSION_DATA["coordination_fees"])),
-                key="num_coordination_entries"
-            )
+            # Contribution options section
+            st.subheader(t("contribution_options"))
+            contribution_tab, employer_tab, coordination_tab, occupation_tab, yield_tab, buy_in_tab = st.tabs([
+                t("personal_contributions"), 
+                t("employer_contributions"), 
+                t("coordination_fee"),
+                t("occupation_level"),
+                t("yield_schedule"),
+                t("buy_ins")
+            ])
             
-            coordination_fees = []
-            for i in range(num_coordination_entries):
-                st.write(f"{t('entry')} {i+1}")
-                cols = st.columns(2)
+            with contribution_tab:
+                st.write(t("set_contribution_options"))
                 
-                if "coordination_fees" in data and i < len(data["coordination_fees"]):
-                    default_entry = data["coordination_fees"][i]
-                else:
-                    default_entry = {
-                        "from_year": 2000 + i * 5,
-                        "amount": 24120 + i * 1000
+                # Flatten the 3 options of each range into separate columns
+                personal_rows = [
+                    {
+                        "age_from": entry["age_from"],
+                        "age_to": entry["age_to"],
+                        **{f"option_{j+1}": entry["options"][j] if j < len(entry["options"]) else 6.0 + j for j in range(3)}
                     }
+                    for entry in data.get("personal_contribution_ranges", DEFAULT_PENSION_DATA["personal_contribution_ranges"])
+                ]
                 
-                with cols[0]:
-                    from_year = st.number_input(
-                        t("from_year"),
-                        min_value=1900,
-                        max_value=2100,
-                        value=default_entry["from_year"],
-                        key=f"coordination_from_year_{i}"
-                    )
-                
-                with cols[1]:
-                    amount = st.number_input(
-                        t("amount"),
-                        min_value=0,
-                        max_value=100000,
-                        value=default_entry["amount"],
-                        step=100,
-                        key=f"coordination_amount_{i}"
-                    )
+                edited_personal_rows = schedule_editor(
+                    personal_rows,
+                    [
+                        ("age_from", st.column_config.NumberColumn(t("from_age"), min_value=18, max_value=70, step=1, required=True), int),
+                        ("age_to", st.column_config.NumberColumn(t("to_age"), min_value=18, max_value=70, step=1, required=True), int)
+                    ] + [
+                        (f"option_{j+1}", st.column_config.NumberColumn(f"{t('option')} {j+1} (%)", min_value=0.0, max_value=50.0, step=0.05, required=True), float)
+                        for j in range(3)
+                    ],
+                    key="personal_contribution_editor",
+                    ranges=[("age_from", "age_to")]
+                )
                 
-                coordination_fees.append({
-                    "from_year": from_year,
-                    "amount": amount
-                })
-            
-            data["coordination_fees"] = coordination_fees
-            
-        with occupation_tab:
-            st.write(t("occupation_info"))
-            
-            num_occupation_entries = st.number_input(
-                t("number_of_entries"),
-                min_value=1,
-                max_value=10,
-                value=len(data.get("occupation_levels", DEFAULT_PENSION_DATA["occupation_levels"])),
-                key="num_occupation_entries"
-            )
+                data["personal_contribution_ranges"] = [
+                    {
+                        "age_from": row["age_from"],
+                        "age_to": row["age_to"],
+                        "options": [row["option_1"], row["option_2"], row["option_3"]]
+                    }
+                    for row in edited_personal_rows
+                ]
             
-            occupation_levels = []
-            for i in range(num_occupation_entries):
-                st.write(f"{t('entry')} {i+1}")
-                cols = st.columns(2)
+            with employer_tab:
+                st.write(t("configure_employer_contributions"))
                 
-                if "occupation_levels" in data and i < len(data["occupation_levels"]):
-                    default_entry = data["occupation_levels"][i]
-                else:
-                    default_entry = {
-                        "from_year": 2000 + i * 5,
-                        "percentage": 100.0
-                    }
+                data["employer_contributions"] = schedule_editor(
+                    data.get("employer_contributions", DEFAULT_PENSION_DATA["employer_contributions"]),
+                    [
+                        ("age_from", st.column_config.NumberColumn(t("from_age"), min_value=18, max_value=70, step=1, required=True), int),
+                        ("age_to", st.column_config.NumberColumn(t("to_age"), min_value=18, max_value=70, step=1, required=True), int),
+                        ("percentage", st.column_config.NumberColumn(t("contribution_percentage"), min_value=0.0, max_value=50.0, step=0.05, required=True), float)
+                    ],
+                    key="employer_contribution_editor",
+                    ranges=[("age_from", "age_to")]
+                )
                 
-                with cols[0]:
-                    from_year = st.number_input(
-                        t("from_year"),
-                        min_value=1900,
-                        max_value=2100,
-                        value=default_entry["from_year"],
-                        key=f"occupation_from_year_{i}"
-                    )
+            with coordination_tab:
+                st.write(t("coordination_fee_info"))
                 
-                with cols[1]:
-                    percentage = st.number_input(
-                        t("percentage"),
-                        min_value=0.0,
-                        max_value=100.0,
-                        value=default_entry["percentage"],
-                        step=5.0,
-                        key=f"occupation_percentage_{i}"
-                    )
+                data["coordination_fees"] = schedule_editor(
+                    data.get("coordination_fees", DEFAULT_PENSION_DATA["coordination_fees"]),
+                    [
+                        ("from_year", st.column_config.NumberColumn(t("from_year"), min_value=1900, max_value=2100, step=1, required=True), int),
+                        ("amount", st.column_config.NumberColumn(t("amount"), min_value=0, max_value=100000, step=100, required=True), int)
+                    ],
+                    key="coordination_fee_editor"
+                )
+                
+            with occupation_tab:
+                st.write(t("occupation_info"))
+                
+                data["occupation_levels"] = schedule_editor(
+                    data.get("occupation_levels", DEFAULT_PENSION_DATA["occupation_levels"]),
+                    [
+                        ("from_year", st.column_config.NumberColumn(t("from_year"), min_value=1900, max_value=2100, step=1, required=True), int),
+                        ("percentage", st.column_config.NumberColumn(t("percentage"), min_value=0.0, max_value=100.0, step=5.0, required=True), float)
+                    ],
+                    key="occupation_level_editor"
+                )
+                
+            with yield_tab:
+                st.write(t("yield_schedule_info"))
                 
-                occupation_levels.append({
-                    "from_year": from_year,
-                    "percentage": percentage
-                })
+                data["yield_schedule"] = schedule_editor(
+                    data.get("yield_schedule", DEFAULT_PENSION_DATA["yield_schedule"]),
+                    [
+                        ("from_year", st.column_config.NumberColumn(t("from_year"), min_value=1900, max_value=2100, step=1, required=True), int),
+                        ("yield", st.column_config.NumberColumn(t("yield_percentage"), min_value=float(YIELD_CALIBRATION_GRID[0]), max_value=float(YIELD_CALIBRATION_GRID[-1]), step=0.1, required=True), float)
+                    ],
+                    key="yield_schedule_editor"
+                )
             
-            data["occupation_levels"] = occupation_levels
+            with buy_in_tab:
+                st.write(t("buy_ins_info"))
+                
+                data["buy_ins"] = schedule_editor(
+                    data.get("buy_ins", DEFAULT_PENSION_DATA["buy_ins"]),
+                    [
+                        ("year", st.column_config.NumberColumn(t("year"), min_value=1900, max_value=2100, step=1, required=True), int),
+                        ("amount", st.column_config.NumberColumn(t("amount"), min_value=0, step=1000, format="CHF %d", required=True), float)
+                    ],
+                    key="buy_ins_editor"
+                )
+        
+        if not live_mode:
+            st.form_submit_button(t("recalculate"), type="primary")
     
     # Update session state
     st.session_state.pension_data = data
     
-    # Simulate and display results
-    st.header(t("simulation_results"))
+    # Calibrate the expected yield from historical statements
+    with st.expander(t("calibrate_yield")):
+        st.write(t("calibrate_yield_info"))
+        statements_file = st.file_uploader(t("upload_data"), type=["csv", "txt"], key="statements_file")
+        
+        calibration_cols = st.columns(2)
+        with calibration_cols[0]:
+            calibration_option = st.selectbox(
+                t("option"),
+                range(3),
+                format_func=lambda i: f"{t('option')} {i+1}",
+                key="calibration_option"
+            )
+        with calibration_cols[1]:
+            fit_contributions = st.checkbox(
+                t("fit_contribution_correction"),
+                help=t("fit_contribution_correction_info"),
+                key="fit_contribution_correction"
+            )
+        
+        if statements_file is not None:
+            statements = parse_fund_statements(statements_file)
+            calibration = None
+            if statements is not None:
+                calibration = calibrate_yield(get_plan_settings(data), statements, calibration_option, fit_contributions)
+            
+            if calibration is None:
+                st.error(t("invalid_statements"))
+            else:
+                st.info(
+                    f"{t('fitted_yield')}: {calibration['yield']:.2f}% | "
+                    f"{t('contribution_correction')}: {calibration['contribution_scale']:.2f} | "
+                    f"{t('fit_error')}: CHF {calibration['rmse']:,.0f}"
+                )
+                if calibration["dropped"]:
+                    st.warning(t("statements_dropped").format(count=calibration["dropped"]))
+                
+                fitted_df = calibration["fitted"].rename(columns={"Value": t("statement_value"), "Fitted Value": t("fitted_value")})
+                fig_fit = px.line(
+                    fitted_df,
+                    x="Date",
+                    y=[t("statement_value"), t("fitted_value")],
+                    markers=True,
+                    labels={"Date": t("date"), "value": t("fund_value"), "variable": ""}
+                )
+                st.plotly_chart(fig_fit, use_container_width=True)
+                
+                if st.button(t("apply_fitted_yield")):
+                    data["expected_yield"] = round(calibration["yield"], 2)
+                    st.rerun()
+    
+    # Optimize the split of a buy-in budget across the years
+    with st.expander(t("optimize_buy_ins")):
+        st.write(t("optimize_buy_ins_info"))
+        
+        optimizer_cols = st.columns(3)
+        with optimizer_cols[0]:
+            buy_in_budget = st.number_input(t("buy_in_budget"), min_value=0, value=50000, step=5000, key="buy_in_budget")
+            buy_in_option = st.selectbox(
+                t("option"),
+                range(3),
+                format_func=lambda i: f"{t('option')} {i+1}",
+                key="buy_in_option"
+            )
+        with optimizer_cols[1]:
+            buy_in_step = st.number_input(t("buy_in_step"), min_value=100, value=1000, step=100, key="buy_in_step")
+            yearly_buy_in_limit = st.number_input(t("yearly_buy_in_limit"), min_value=0, value=0, step=5000, key="yearly_buy_in_limit")
+        with optimizer_cols[2]:
+            lock_years = st.number_input(t("lock_years"), min_value=0, max_value=10, value=BUY_IN_LOCK_YEARS, key="buy_in_lock_years")
+            after_tax = st.checkbox(t("optimize_after_tax"), value=True, key="buy_in_after_tax")
+        
+        if after_tax:
+            st.write(t("tax_table_info"))
+            data["tax_brackets"] = schedule_editor(
+                data.get("tax_brackets", DEFAULT_PENSION_DATA["tax_brackets"]),
+                [
+                    ("income_from", st.column_config.NumberColumn(t("income_from"), min_value=0, step=1000, format="CHF %d", required=True), int),
+                    ("rate", st.column_config.NumberColumn(t("tax_rate"), min_value=0.0, max_value=100.0, step=0.5, required=True), float)
+                ],
+                key="tax_brackets_editor"
+            )
+        
+        optimization = optimize_buy_ins(
+            get_plan_settings(data),
+            buy_in_budget,
+            buy_in_option,
+            buy_in_step,
+            yearly_buy_in_limit,
+            lock_years,
+            data["tax_brackets"] if after_tax else None
+        )
+        
+        if optimization is None:
+            st.warning(t("no_buy_in_years"))
+        else:
+            st.info(
+                f"{t('fund_gain')}: CHF {optimization['fund_gain']:,.0f} | "
+                f"{t('tax_savings')}: CHF {optimization['tax_savings']:,.0f}"
+            )
+            details_df = optimization["details"].rename(columns={
+                "Year": t("year"),
+                "Age": t("age"),
+                "Buy-in": t("buy_in"),
+                "Tax Saving": t("tax_saving"),
+                "Value at Retirement": t("value_at_retirement")
+            })
+            st.dataframe(
+                details_df,
+                column_config=currency_column_config([t("buy_in"), t("tax_saving"), t("value_at_retirement")]),
+                hide_index=True
+            )
+            
+            if st.button(t("apply_buy_in_schedule")):
+                data["buy_ins"] = optimization["schedule"]
+                st.rerun()
+    
+    # Backtest the plan against historical yields over rolling windows
+    with st.expander(t("historical_backtest")):
+        st.write(t("historical_backtest_info"))
+        return_series_file = st.file_uploader(t("upload_data"), type=["csv", "txt"], key="return_series_file")
+        
+        if return_series_file is not None and st.button(t("import_return_series")):
+            return_series = parse_return_series(return_series_file)
+            if return_series is None:
+                st.error(t("invalid_return_series"))
+            else:
+                data["historical_yields"] = return_series
+                st.rerun()
+        
+        if data.get("historical_yields"):
+            return_series = data["historical_yields"]
+            st.info(f"{t('imported_return_series')}: {return_series[0]['year']}-{return_series[-1]['year']}")
+            if st.button(t("use_bundled_return_series")):
+                data["historical_yields"] = []
+                st.rerun()
+        else:
+            return_series = HISTORICAL_YIELDS
+            st.info(t("bundled_return_series"))
+        
+        backtest_cols = st.columns(2)
+        with backtest_cols[0]:
+            backtest_option = st.selectbox(
+                t("option"),
+                range(3),
+                format_func=lambda i: f"{t('option')} {i+1}",
+                key="backtest_option"
+            )
+        with backtest_cols[1]:
+            wrap_windows = st.checkbox(t("wrap_windows"), value=True, help=t("wrap_windows_info"), key="backtest_wrap")
+        
+        backtest = backtest_plan(get_plan_settings(data), return_series, wrap_windows)
+        if backtest is None:
+            st.warning(t("no_backtest_windows"))
+        else:
+            option_labels = [f"{t('option')} {i+1}" for i in range(3)]
+            backtest_df = summarize_backtest(backtest, option_labels).rename(columns={
+                "Option": t("option"),
+                "Min": t("minimum"),
+                "Median": t("median"),
+                "Max": t("maximum"),
+                "Worst Start Year": t("worst_start_year"),
+                "Best Start Year": t("best_start_year")
+            })
+            st.dataframe(
+                backtest_df,
+                column_config=currency_column_config([t("minimum"), t("median"), t("maximum")]),
+                hide_index=True
+            )
+            
+            # Band of the fund values over all windows for the selected option
+            option_values = backtest["fund_values"][:, backtest_option]
+            fig_backtest = go.Figure()
+            add_fan_traces(
+                fig_backtest, backtest["ages"],
+                option_values.min(axis=0), np.median(option_values, axis=0), option_values.max(axis=0),
+                (t("minimum"), t("median"), t("maximum"))
+            )
+            update_fan_layout(fig_backtest)
+            st.plotly_chart(fig_backtest, use_container_width=True)
+    
+    # Simulate random salary growth and yields
+    with st.expander(t("stochastic_simulation")):
+        st.write(t("stochastic_simulation_info"))
+        
+        if "stochastic_settings" not in data:
+            data["stochastic_settings"] = DEFAULT_PENSION_DATA["stochastic_settings"].copy()
+        stochastic_settings = data["stochastic_settings"]
+        
+        stochastic_cols = st.columns(3)
+        with stochastic_cols[0]:
+            stochastic_settings["salary_volatility"] = st.number_input(
+                t("salary_volatility"), min_value=0.0, max_value=50.0,
+                value=float(stochastic_settings["salary_volatility"]), step=0.5
+            )
+            stochastic_settings["yield_volatility"] = st.number_input(
+                t("yield_volatility"), min_value=0.0, max_value=50.0,
+                value=float(stochastic_settings["yield_volatility"]), step=0.5
+            )
+        with stochastic_cols[1]:
+            stochastic_settings["correlation"] = st.slider(
+                t("correlation"), min_value=-1.0, max_value=1.0,
+                value=float(stochastic_settings["correlation"]), step=0.05
+            )
+            stochastic_settings["paths"] = st.number_input(
+                t("paths"), min_value=100, max_value=1000000,
+                value=int(stochastic_settings["paths"]), step=1000
+            )
+        with stochastic_cols[2]:
+            stochastic_settings["seed"] = st.number_input(
+                t("seed"), min_value=0, value=int(stochastic_settings["seed"]), step=1, help=t("seed_info")
+            )
+            stochastic_settings["workers"] = st.number_input(
+                t("workers"), min_value=1, max_value=32,
+                value=int(stochastic_settings["workers"]), step=1, help=t("workers_info")
+            )
+            stochastic_settings["sketch_size"] = st.number_input(
+                t("quantile_accuracy"), min_value=20, max_value=5000,
+                value=int(stochastic_settings.get("sketch_size", STOCHASTIC_SKETCH_SIZE)), step=20,
+                help=t("quantile_accuracy_info")
+            )
+        
+        stochastic_option = st.selectbox(
+            t("option"),
+            range(3),
+            format_func=lambda i: f"{t('option')} {i+1}",
+            key="stochastic_option"
+        )
+        keep_paths = st.checkbox(t("keep_paths"), help=t("keep_paths_info"), key="stochastic_keep_paths")
+        
+        stochastic_arguments = (
+            get_plan_settings(data),
+            stochastic_settings["paths"],
+            stochastic_settings["seed"],
+            stochastic_settings["salary_volatility"],
+            stochastic_settings["yield_volatility"],
+            stochastic_settings["correlation"],
+            stochastic_settings["sketch_size"]
+        )
+        if keep_paths:
+            # Only the paths of the shown simulation are kept on disk: a new simulation
+            # writes a new result store and removes the previous one
+            stochastic_key = json.dumps(stochastic_arguments, sort_keys=True, default=str)
+            if st.session_state.get("stochastic_paths_key") != stochastic_key:
+                paths_directory = tempfile.mkdtemp(prefix="paths_", dir=get_session_result_directory())
+                st.session_state.stochastic_paths = simulate_stochastic(
+                    *stochastic_arguments[:6], stochastic_settings["workers"],
+                    sketch_size=stochastic_arguments[6], result_directory=paths_directory
+                )
+                if st.session_state.get("stochastic_paths_directory"):
+                    shutil.rmtree(st.session_state.stochastic_paths_directory, ignore_errors=True)
+                st.session_state.stochastic_paths_directory = paths_directory
+                st.session_state.stochastic_paths_key = stochastic_key
+            stochastic = st.session_state.stochastic_paths
+        else:
+            stochastic = cached_simulate_stochastic(*stochastic_arguments, _workers=stochastic_settings["workers"])
+        if stochastic is None:
+            st.warning(t("no_data_available"))
+        else:
+            # Quantiles of the final values (STOCHASTIC_QUANTILES: 10th percentile, median, 90th percentile)
+            final_quantiles = stochastic["quantiles"][..., -1]
+            percentiles_df = pd.DataFrame({
+                t("option"): [f"{t('option')} {i+1}" for i in range(final_quantiles.shape[1])],
+                t("percentile_10"): final_quantiles[0],
+                t("median"): final_quantiles[1],
+                t("percentile_90"): final_quantiles[2],
+                t("mean"): stochastic["mean"][:, -1]
+            })
+            st.dataframe(
+                percentiles_df,
+                column_config=currency_column_config(percentiles_df.columns[1:]),
+                hide_index=True
+            )
+            
+            # Band of the fund values between the 10th and 90th percentiles for the selected option
+            bands = stochastic["quantiles"][:, stochastic_option]
+            fig_stochastic = go.Figure()
+            add_fan_traces(
+                fig_stochastic, stochastic["ages"], bands[0], bands[1], bands[2],
+                (t("percentile_10"), t("median"), t("percentile_90"))
+            )
+            update_fan_layout(fig_stochastic)
+            st.plotly_chart(fig_stochastic, use_container_width=True)
+            st.caption(f"{t('seed')}: {stochastic_settings['seed']} | {t('paths')}: {stochastic_settings['paths']:,}")
+            
+            if keep_paths:
+                path_browser(st.session_state.stochastic_paths_directory, stochastic_option)
+    
+    # Import a life table (the bundled approximation is used otherwise)
+    with st.expander(t("mortality_table")):
+        st.write(t("mortality_table_info"))
+        mortality_file = st.file_uploader(t("upload_data"), type=["csv", "txt"], key="mortality_file")
+        
+        if mortality_file is not None and st.button(t("import_mortality_table")):
+            mortality_table = parse_mortality_table(mortality_file)
+            if mortality_table is None:
+                st.error(t("invalid_mortality_table"))
+            else:
+                data["mortality_table"] = mortality_table
+                st.rerun()
+        
+        if data.get("mortality_table"):
+            st.info(f"{t('imported_mortality_table')}: {len(data['mortality_table'])} {t('ages')}")
+            if st.button(t("use_bundled_mortality_table")):
+                data["mortality_table"] = []
+                st.rerun()
+        else:
+            st.info(t("bundled_mortality_table"))
+    
+    # Simulate and display results
+    st.header(t("simulation_results"))
+    
+    plan_settings = get_plan_settings(data)
+    
+    # The fund value checker, the view toggle and the detail blocks are fragments:
+    # interacting with them only reruns the fragment, which reads the cached
+    # simulations instead of rerunning the whole page
+    fund_value_checker(plan_settings)
+    simulation_results(plan_settings)
+    sensitivity_panel(plan_settings)
+    
+    # Return simulations for use in the sidebar
+    return get_option_simulations(plan_settings, st.session_state.get("is_monthly", False))
+
+def get_option_simulations(plan_settings, monthly=False):
+    """Get the (cached) simulations of the 3 personal contribution options of a plan."""
+    simulations = cached_simulate_plan(plan_settings, monthly)
+    option_labels = [f"{t('option')} {i+1}" for i in range(3)]  # Always have 3 options
+    for i, sim in enumerate(simulations):
+        sim["Option"] = pd.Categorical.from_codes(np.full(len(sim), i), option_labels)
+    return simulations
+
+@st.fragment
+def fund_value_checker(plan_settings):
+    """Check the fund value at a specific date (reruns on its own)."""
+    st.subheader(t("check_fund_value"))
+    check_date = st.date_input(t("select_month_year"), value=date.today())
+    
+    if st.button(t("show_value")):
+        # Use the monthly simulations for accurate date checking
+        for monthly_sim in get_option_simulations(plan_settings, True):
+            value = get_fund_value_at_date(monthly_sim, check_date)
+            option_name = monthly_sim["Option"].iloc[0]
+            
+            if value is not None:
+                st.info(f"{option_name}: {t('fund_value_at_date').format(check_date.strftime('%B %Y'))} = CHF {value:,.2f}")
+            else:
+                st.warning(f"{option_name}: {t('no_data_available')}")
 
+@st.fragment
+def simulation_results(plan_settings):
+    """Show the simulation results with the yearly/monthly toggle (reruns on its own)."""
     # Toggle for yearly/monthly view
     st.subheader(t("toggle_view"))
     view_toggle = st.radio(
@@ -2392,72 +5688,7 @@ def pension_calculator_page():
     # Store is_monthly in session state for use in the sidebar
     st.session_state.is_monthly = is_monthly
     
-    # Simulate for each personal contribution option
-    simulations = []
-    for i in range(3):  # Always have 3 options
-        sim = simulate_pension(
-            data["birth_date"],
-            data["retirement_age"],
-            data["current_salary"],
-            data["maximum_salary"],
-            data["years_to_max_salary"],
-            data["expected_yield"],
-            i,  # Option index (0, 1, or 2)
-            data["personal_contribution_ranges"],
-            data["employer_contributions"],
-            data["current_pension_value"],
-            data["current_value_date"],
-            data.get("has_13th_salary", False),
-            data.get("bonus_type", "percentage"),
-            data.get("bonus_percentage", 0.0),
-            data.get("bonus_fixed", 0.0),
-            is_monthly,  # Use the existing is_monthly value
-            data.get("coordination_fees", DEFAULT_PENSION_DATA["coordination_fees"]),
-            data.get("occupation_levels", DEFAULT_PENSION_DATA["occupation_levels"])
-        )
-        if not sim.empty:
-            sim["Option"] = f"{t('option')} {i+1}"
-            simulations.append(sim)
-
-    # Check Fund Value at Specific Date
-    st.subheader(t("check_fund_value"))
-    check_date = st.date_input(t("select_month_year"), value=date.today())
-    
-    if st.button(t("show_value")):
-        for idx, sim in enumerate(simulations):
-            # Make sure we simulate monthly for accurate date checking
-            monthly_sim = simulate_pension(
-                data["birth_date"],
-                data["retirement_age"],
-                data["current_salary"],
-                data["maximum_salary"],
-                data["years_to_max_salary"],
-                data["expected_yield"],
-                idx,
-                data["personal_contribution_ranges"],
-                data["employer_contributions"],
-                data["current_pension_value"],
-                data["current_value_date"],
-                data.get("has_13th_salary", False),
-                data.get("bonus_type", "percentage"),
-                data.get("bonus_percentage", 0.0),
-                data.get("bonus_fixed", 0.0),
-                True,  # Always monthly for this calculation
-                data.get("coordination_fees", DEFAULT_PENSION_DATA["coordination_fees"]),
-                data.get("occupation_levels", DEFAULT_PENSION_DATA["occupation_levels"])
-            )
-            value = get_fund_value_at_date(monthly_sim, check_date)
-            
-            # Get option name defensively
-            try:
-                option_name = sim["Option"].iloc[0]
-            except:
-                option_name = f"{t('option')} {idx+1}"  # Fallback
-            
-            if value is not None:
-                st.info(f"{option_name}: {t('fund_value_at_date').format(check_date.strftime('%B %Y'))} = CHF {value:,.2f}")
-            else:
-                st.warning(f"{option_name}: {t('no_data_available')}")
+    simulations = get_option_simulations(plan_settings, is_monthly)
     
     if simulations:
         # Combined dataframe
@@ -2469,107 +5700,210 @@ def pension_calculator_page():
         for sim in simulations:
             final_value = sim["Fund Value"].iloc[-1]
             option_name = sim["Option"].iloc[0]
-            final_values.append({"Option": option_name, "Final Value": final_value})
+            final_row = {"Option": option_name, "Final Value": final_value}
+            if "Mandatory Fund Value" in sim:
+                final_row["Mandatory Fund Value"] = sim["Mandatory Fund Value"].iloc[-1]
+                final_row["Extra-mandatory Fund Value"] = sim["Extra-mandatory Fund Value"].iloc[-1]
+            final_row["Annual Pension"] = get_annual_pension(sim, plan_settings)
+            final_values.append(final_row)
         
         final_values_df = pd.DataFrame(final_values)
-        st.dataframe(final_values_df.style.format({"Final Value": "CHF {:,.0f}"}))
+        
+        # Expected present values at retirement of the 3 options at once
+        data = st.session_state.pension_data
+        ahv_annual, ahv_age_offset = get_first_pillar_annual_pension(data)
+        n_options = len(final_values_df)
+        retirement_ages = np.full(n_options, plan_settings["retirement_age"])
+        final_values_df["EPV Annuity"], final_values_df["EPV AHV"] = expected_present_values(
+            get_mortality_rates(data.get("mortality_table")),
+            np.full(n_options, plan_settings["sex"]),
+            retirement_ages,
+            final_values_df["Annual Pension"].to_numpy(),
+            np.full(n_options, ahv_annual),
+            retirement_ages + max(ahv_age_offset, 0),
+            np.full(n_options, plan_settings["technical_interest_rate"])
+        )
+        st.dataframe(final_values_df, column_config=currency_column_config(final_values_df.columns[1:]))
+        st.caption(t("epv_info"))
         
         # Comparison Chart
         st.subheader(t("fund_growth_comparison"))
+        full_resolution = st.checkbox(t("full_resolution"), help=t("full_resolution_info"), key="calculator_full_resolution")
         
-        fig = px.line(combined_df, x="Age", y="Fund Value", color="Option",
-                    title=t("fund_growth_comparison"),
-                    labels={"Fund Value": t("total_fund_value"), "Age": t("age")})
-        
-        fig.update_traces(
-            hovertemplate=f'{t("age")}: %{{x}}<br>{t("year")}: %{{customdata}}<br>{t("fund_value")}: CHF %{{y:,.0f}}'
-        )
-        fig.update_layout(
-            hovermode="x unified",
-            height=500
-        )
-        fig.update_traces(customdata=combined_df["Year"])
+        fig = create_fund_growth_figure(combined_df, "Option", full_resolution=full_resolution)
+        fig.update_layout(height=500)
         
         st.plotly_chart(fig, use_container_width=True)
         
         # Display all three options
-        for i, sim in enumerate(simulations):
-            option_name = sim["Option"].iloc[0]
-            
-            st.subheader(f"{t('detailed_projection')} {option_name}")
-            
-            # Format the table
-            if is_monthly:
-                detailed_df = sim.copy()
-                
-                # Format month display with special handling for 13th month
-                def format_month(row):
-                    if row.get("Is13thMonth", False):
-                        # Format based on language
-                        year = row["Year"]
-                        if st.session_state.language == "de":
-                            return f"13er {year}"
-                        elif st.session_state.language == "fr":
-                            return f"13e {year}"
-                        elif st.session_state.language == "it":
-                            return f"13a {year}"
-                        else:  # default/english
-                            return f"13th {year}"
-                    else:
-                        return row["Date"].strftime("%b %Y")
-                
-                detailed_df["Month"] = detailed_df.apply(format_month, axis=1)
-                columns_to_show = ["Month", "Age", "Salary", "Insurable Salary", "Personal Contribution", "Employer Contribution", "Total Contribution", "Fund Value"]
-            else:
-                detailed_df = sim.copy()
-                detailed_df["Year"] = detailed_df["Date"].dt.year
-                columns_to_show = ["Year", "Age", "Salary", "Insurable Salary", "Personal Contribution", "Employer Contribution", "Total Contribution", "Fund Value"]
-            
-            formatted_df = detailed_df[columns_to_show].style.format({
-                "Salary": "CHF {:,.0f}",
-                "Insurable Salary": "CHF {:,.0f}",
-                "Personal Contribution": "CHF {:,.0f}",
-                "Employer Contribution": "CHF {:,.0f}",
-                "Total Contribution": "CHF {:,.0f}",
-                "Fund Value": "CHF {:,.0f}"
-            })
-            
-            st.dataframe(formatted_df)
-            
-            # Contribution breakdown chart
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=sim["Age"],
-                y=sim["Personal Contribution"],
-                name=t("personal_contribution"),
-                marker_color='#1f77b4',
-                hovertemplate='CHF %{y:,.0f}<extra></extra>'  # Format hover text as CHF integers
-            ))
-            fig.add_trace(go.Bar(
-                x=sim["Age"],
-                y=sim["Employer Contribution"],
-                name=t("employer_contribution"),
-                marker_color='#72b7ec',
-                hovertemplate='CHF %{y:,.0f}<extra></extra>'  # Format hover text as CHF integers
-            ))
-            fig.update_layout(
-                barmode="stack",
-                title=f"{t('annual_contributions')} - {option_name}",
-                xaxis_title=t("age"),
-                yaxis_title=t("total_contribution"),
-                hovermode="x unified",
-                height=400,
-                yaxis=dict(
-                    tickformat="CHF,.0f",  # Format y-axis ticks as CHF integers
-                )
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        for sim in simulations:
+            option_details(sim, is_monthly)
     else:
         st.warning(t("no_data_available"))
+
+@st.fragment
+def sensitivity_panel(plan_settings):
+    """Show a tornado chart of the final fund value for changes of each input (reruns on its own)."""
+    st.subheader(t("sensitivity_analysis"))
+    st.write(t("sensitivity_analysis_info"))
+    
+    sensitivity_cols = st.columns(2)
+    with sensitivity_cols[0]:
+        change = st.slider(t("sensitivity_change"), min_value=1, max_value=50, value=10, step=1)
+    with sensitivity_cols[1]:
+        option_index = st.selectbox(
+            t("option"),
+            range(3),
+            format_func=lambda i: f"{t('option')} {i+1}",
+            key="sensitivity_option"
+        )
     
-    # Return simulations for use in the sidebar
-    return simulations
+    sensitivity_df = sensitivity_analysis(plan_settings, change)
+    if sensitivity_df is None:
+        st.warning(t("no_data_available"))
+        return
+    
+    input_labels = {
+        "expected_yield": t("expected_yield"),
+        "current_salary": t("current_salary"),
+        "maximum_salary": t("maximum_salary"),
+        "years_to_max_salary": t("years_to_max"),
+        "contribution_rates": t("contribution_rates"),
+        "coordination_fees": t("coordination_fee"),
+        "occupation_levels": t("occupation_level"),
+        "retirement_age": t("retirement_age")
+    }
+    
+    # Largest effect on top (bars are drawn from the bottom)
+    option_df = sensitivity_df[sensitivity_df["Option"] == option_index].copy()
+    option_df["Range"] = (option_df["High Value"] - option_df["Low Value"]).abs()
+    option_df = option_df.sort_values("Range")
+    labels = option_df["Input"].map(input_labels)
+    base_value = option_df["Base Value"].iloc[0]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=labels,
+        x=option_df["Low Value"] - base_value,
+        base=base_value,
+        orientation='h',
+        name=f"-{change}%",
+        marker_color='#d62728',
+        customdata=option_df["Low Value"],
+        hovertemplate='CHF %{customdata:,.0f}<extra></extra>'
+    ))
+    fig.add_trace(go.Bar(
+        y=labels,
+        x=option_df["High Value"] - base_value,
+        base=base_value,
+        orientation='h',
+        name=f"+{change}%",
+        marker_color='#2ca02c',
+        customdata=option_df["High Value"],
+        hovertemplate='CHF %{customdata:,.0f}<extra></extra>'
+    ))
+    fig.add_vline(x=base_value, line_dash="dash", line_color="grey")
+    fig.update_layout(
+        barmode="overlay",
+        xaxis_title=t("final_value"),
+        xaxis=dict(tickformat="CHF,.0f"),
+        height=400
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.fragment
+def path_browser(result_directory, option_index):
+    """
+    Browse the stored paths of a stochastic simulation one page at a time.
+    
+    Only the paths of the page are read from the on-disk result store, and paging
+    reruns this fragment without simulating again.
+    """
+    store = open_result_store(result_directory)
+    n_paths = len(store["fund_values"])
+    
+    first_path = st.number_input(
+        t("first_path"), min_value=1, max_value=max(n_paths, 1), value=1, step=PATH_BROWSER_PAGE_SIZE,
+        key="path_browser_first"
+    ) - 1
+    paths = np.asarray(store["fund_values"][first_path:first_path + PATH_BROWSER_PAGE_SIZE, option_index])
+    ages = np.asarray(store["ages"])
+    
+    fig_paths = go.Figure()
+    for p, path_values in enumerate(paths):
+        fig_paths.add_trace(go.Scattergl(
+            x=ages, y=path_values, mode="lines", line=dict(width=1), opacity=0.4,
+            name=f"{t('path')} {first_path + p + 1}", showlegend=False
+        ))
+    fig_paths.update_layout(
+        xaxis_title=t("age"), yaxis_title=t("fund_value"), yaxis=dict(tickformat="CHF,.0f"),
+        height=400, margin=dict(l=20, r=20, t=30, b=20)
+    )
+    st.plotly_chart(fig_paths, use_container_width=True)
+    st.caption(t("paths_shown").format(first=first_path + 1, last=first_path + len(paths), total=n_paths))
+
+@st.fragment
+def option_details(sim, is_monthly):
+    """Show the detailed projection and contribution chart of one option (reruns on its own)."""
+    option_name = sim["Option"].iloc[0]
+    
+    st.subheader(f"{t('detailed_projection')} {option_name}")
+    
+    # Format the table
+    if is_monthly:
+        detailed_df = sim.copy()
+        detailed_df["Month"] = format_month_labels(detailed_df)
+        columns_to_show = ["Month", "Age", "Salary", "Insurable Salary", "Personal Contribution", "Employer Contribution", "Total Contribution", "Fund Value"]
+    else:
+        detailed_df = sim.copy()
+        detailed_df["Year"] = detailed_df["Date"].dt.year
+        columns_to_show = ["Year", "Age", "Salary", "Insurable Salary", "Personal Contribution", "Employer Contribution", "Total Contribution", "Fund Value"]
+    if "Buy-in" in detailed_df:
+        columns_to_show.insert(columns_to_show.index("Total Contribution"), "Buy-in")
+    
+    # Send the raw numbers and let the frontend format them
+    st.dataframe(
+        detailed_df[columns_to_show],
+        column_config=currency_column_config(columns_to_show[2:])
+    )
+    
+    # Contribution breakdown chart
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=sim["Age"],
+        y=sim["Personal Contribution"],
+        name=t("personal_contribution"),
+        marker_color='#1f77b4',
+        hovertemplate='CHF %{y:,.0f}<extra></extra>'  # Format hover text as CHF integers
+    ))
+    fig.add_trace(go.Bar(
+        x=sim["Age"],
+        y=sim["Employer Contribution"],
+        name=t("employer_contribution"),
+        marker_color='#72b7ec',
+        hovertemplate='CHF %{y:,.0f}<extra></extra>'  # Format hover text as CHF integers
+    ))
+    if "Buy-in" in sim:
+        fig.add_trace(go.Bar(
+            x=sim["Age"],
+            y=sim["Buy-in"],
+            name=t("buy_in"),
+            marker_color='#ff7f0e',
+            hovertemplate='CHF %{y:,.0f}<extra></extra>'  # Format hover text as CHF integers
+        ))
+    fig.update_layout(
+        barmode="stack",
+        title=f"{t('annual_contributions')} - {option_name}",
+        xaxis_title=t("age"),
+        yaxis_title=t("total_contribution"),
+        hovermode="x unified",
+        height=400,
+        yaxis=dict(
+            tickformat="CHF,.0f",  # Format y-axis ticks as CHF integers
+        )
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
 
 def plan_management_page():
     # Access data from session state
@@ -2609,24 +5943,7 @@ def plan_management_page():
     
     if st.button(t("create_from_current")):
         if plan_name and plan_name not in data["pension_plans"]:
-            new_plan = {
-                "birth_date": data["birth_date"],
-                "retirement_age": data["retirement_age"],
-                "current_salary": data["current_salary"],
-                "maximum_salary": data["maximum_salary"],
-                "years_to_max_salary": data["years_to_max_salary"],
-                "expected_yield": data["expected_yield"],
-                "personal_contribution_ranges": data["personal_contribution_ranges"],
-                "employer_contributions": data["employer_contributions"],
-                "current_pension_value": data["current_pension_value"],
-                "current_value_date": data["current_value_date"],
-                "has_13th_salary": data.get("has_13th_salary", False),
-                "bonus_type": data.get("bonus_type", "percentage"),
-                "bonus_percentage": data.get("bonus_percentage", 0.0),
-                "bonus_fixed": data.get("bonus_fixed", 0.0),
-                "coordination_fees": data.get("coordination_fees", DEFAULT_PENSION_DATA["coordination_fees"]),
-                "occupation_levels": data.get("occupation_levels", DEFAULT_PENSION_DATA["occupation_levels"])
-            }
+            new_plan = get_plan_settings(data)
             data["pension_plans"][plan_name] = new_plan
             st.success(t("plan_created").format(plan_name))
         elif not plan_name:
@@ -2662,69 +5979,34 @@ def comparison_page():
     if include_current:
         selected_plans.append(t("current_settings"))
     
-    # Simulate and compare
-    comparison_data = []
-    
-    for plan_name in selected_plans:
-        if plan_name == t("current_settings"):
-            plan_data = data
-        else:
-            plan_data = data["pension_plans"][plan_name]
-        
-        # Simulate for each personal contribution option
-        for i in range(3):  # Always use 3 options
-            sim = simulate_pension(
-                plan_data["birth_date"],
-                plan_data["retirement_age"],
-                plan_data["current_salary"],
-                plan_data["maximum_salary"],
-                plan_data["years_to_max_salary"],
-                plan_data["expected_yield"],
-                i,  # Option index
-                plan_data.get("personal_contribution_ranges", DEFAULT_PENSION_DATA["personal_contribution_ranges"]),
-                plan_data["employer_contributions"],
-                plan_data["current_pension_value"],
-                plan_data["current_value_date"],
-                plan_data.get("has_13th_salary", False),
-                plan_data.get("bonus_type", "percentage"),
-                plan_data.get("bonus_percentage", 0.0),
-                plan_data.get("bonus_fixed", 0.0),
-                False,
-                plan_data.get("coordination_fees", DEFAULT_PENSION_DATA["coordination_fees"]),
-                plan_data.get("occupation_levels", DEFAULT_PENSION_DATA["occupation_levels"])
-            )
-            
-            if not sim.empty:
-                sim["Plan"] = plan_name
-                sim["Contribution Option"] = f"{t('option')} {i+1}"
-                comparison_data.append(sim)
+    # Simulate and compare all plans and options in one batch
+    plan_settings_list = [
+        get_plan_settings(data if plan_name == t("current_settings") else data["pension_plans"][plan_name])
+        for plan_name in selected_plans
+    ]
+    option_labels = [f"{t('option')} {i+1}" for i in range(3)]  # Always use 3 options
+    # 1st pillar pension of the income history with the birth date and retirement age of each plan
+    ahv_annuals, ahv_age_offsets = zip(*[
+        get_first_pillar_annual_pension(data, plan_settings) for plan_settings in plan_settings_list
+    ])
+    comparison_df, summary_df = compare_plans(
+        plan_settings_list, selected_plans, option_labels,
+        mortality_rates=get_mortality_rates(data.get("mortality_table")),
+        ahv_annual=np.array(ahv_annuals),
+        ahv_age_offset=np.array(ahv_age_offsets),
+        display_dtype=np.float32
+    )
     
-    if not comparison_data:
+    if summary_df.empty:
         st.warning(t("no_data_for_comparison"))
         return
     
-    # Combine all data
-    comparison_df = pd.concat(comparison_data)
-    
     # Create comparison visualizations
     st.subheader(t("final_value_comparison"))
     
     # Bar chart of final values
-    final_values = []
-    for sim in comparison_data:
-        final_value = sim["Fund Value"].iloc[-1]
-        plan_name = sim["Plan"].iloc[0]
-        option = sim["Contribution Option"].iloc[0]
-        final_values.append({
-            "Plan": plan_name,
-            "Option": option,
-            "Final Value": final_value
-        })
-    
-    final_values_df = pd.DataFrame(final_values)
-    
     fig_bar = px.bar(
-        final_values_df,
+        summary_df,
         x="Plan",
         y="Final Value",
         color="Option",
@@ -2736,52 +6018,394 @@ def comparison_page():
     st.plotly_chart(fig_bar, use_container_width=True)
     
     # Line chart comparison over time
-    fig_line = px.line(
-        comparison_df,
-        x="Age",
-        y="Fund Value",
-        color="Plan",
-        line_dash="Contribution Option",
-        title=t("fund_growth_comparison"),
-        labels={"Fund Value": t("total_fund_value"), "Age": t("age")}
-    )
-    
-    # Update hover template to include year
-    fig_line.update_traces(
-        hovertemplate=f'{t("age")}: %{{x}}<br>{t("year")}: %{{customdata}}<br>{t("fund_value")}: CHF %{{y:,.0f}}'
-    )
-    fig_line.update_layout(hovermode="x unified")
-    fig_line.update_traces(customdata=comparison_df["Year"])
+    full_resolution = st.checkbox(t("full_resolution"), help=t("full_resolution_info"), key="comparison_full_resolution")
+    fig_line = create_fund_growth_figure(comparison_df, "Plan", "Contribution Option", full_resolution)
     
     st.plotly_chart(fig_line, use_container_width=True)
     
+    # Fan chart of the stochastic simulation of each plan (settings of the calculator)
+    if st.checkbox(t("show_stochastic_bands"), help=t("show_stochastic_bands_info"), key="comparison_stochastic"):
+        stochastic_settings = data.get("stochastic_settings", DEFAULT_PENSION_DATA["stochastic_settings"])
+        stochastic_option = st.selectbox(
+            t("option"),
+            range(3),
+            format_func=lambda i: option_labels[i],
+            key="comparison_stochastic_option"
+        )
+        fig_fan = go.Figure()
+        colors = px.colors.qualitative.Plotly
+        for p, (plan_name, plan_settings) in enumerate(zip(selected_plans, plan_settings_list)):
+            stochastic = cached_simulate_stochastic(
+                plan_settings,
+                stochastic_settings["paths"],
+                stochastic_settings["seed"],
+                stochastic_settings["salary_volatility"],
+                stochastic_settings["yield_volatility"],
+                stochastic_settings["correlation"],
+                stochastic_settings.get("sketch_size", STOCHASTIC_SKETCH_SIZE),
+                _workers=stochastic_settings["workers"]
+            )
+            if stochastic is None:
+                continue
+            bands = stochastic["quantiles"][:, stochastic_option]
+            add_fan_traces(
+                fig_fan, stochastic["ages"], bands[0], bands[1], bands[2],
+                (t("percentile_10"), t("median"), t("percentile_90")),
+                color=colors[p % len(colors)],
+                name=plan_name
+            )
+        update_fan_layout(fig_fan)
+        st.plotly_chart(fig_fan, use_container_width=True)
+    
     # Table comparison of key metrics
     st.subheader(t("key_metrics_comparison"))
-    metrics = []
-    
-    for sim in comparison_data:
-        plan_name = sim["Plan"].iloc[0]
-        option = sim["Contribution Option"].iloc[0]
-        
-        metrics.append({
-            t("plan"): plan_name,
-            t("option"): option,
-            t("starting_value"): sim["Fund Value"].iloc[0],
-            t("final_value"): sim["Fund Value"].iloc[-1],
-            t("total_growth"): sim["Fund Value"].iloc[-1] - sim["Fund Value"].iloc[0],
-            t("avg_annual_contribution"): sim["Total Contribution"].mean(),
-            t("years_to_retirement"): len(sim) - 1
-        })
+    metrics_df = summary_df.rename(columns={
+        "Plan": t("plan"),
+        "Option": t("option"),
+        "Starting Value": t("starting_value"),
+        "Final Value": t("final_value"),
+        "Total Growth": t("total_growth"),
+        "Average Contribution": t("avg_annual_contribution"),
+        "Years to Retirement": t("years_to_retirement"),
+        "Annual Pension": t("annual_pension"),
+        "EPV Annuity": t("epv_annuity"),
+        "EPV AHV": t("epv_ahv")
+    })
+    st.dataframe(
+        metrics_df,
+        column_config=currency_column_config([
+            t("starting_value"),
+            t("final_value"),
+            t("total_growth"),
+            t("avg_annual_contribution"),
+            t("annual_pension"),
+            t("epv_annuity"),
+            t("epv_ahv")
+        ])
+    )
+    st.caption(t("epv_info"))
+
+def payout_phase_page():
+    """
+    Payout phase page: compare annuity / lump-sum splits of the 2nd pillar capital
+    together with the 1st pillar pension
+    """
+    # Access data from session state
+    data = st.session_state.pension_data
+    
+    if "payout_settings" not in data:
+        data["payout_settings"] = DEFAULT_PENSION_DATA["payout_settings"].copy()
+    
+    payout_settings = data["payout_settings"]
+    
+    st.header(t("payout_phase"))
+    st.info(t("payout_phase_info"))
+    
+    plan_settings = get_plan_settings(data)
+    simulations = get_option_simulations(plan_settings)
+    if not simulations:
+        st.warning(t("no_data_available"))
+        return
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        option_index = st.selectbox(
+            t("option"),
+            range(len(simulations)),
+            format_func=lambda i: simulations[i]["Option"].iloc[0],
+            key="payout_option"
+        )
+        payout_settings["annuity_share"] = st.slider(
+            t("annuity_share"),
+            min_value=0.0,
+            max_value=100.0,
+            value=float(payout_settings["annuity_share"]),
+            step=5.0,
+            help=t("annuity_share_info")
+        )
+        payout_settings["drawdown_yield"] = st.number_input(
+            t("drawdown_yield"),
+            min_value=-10.0,
+            max_value=20.0,
+            value=float(payout_settings["drawdown_yield"]),
+            step=0.25
+        )
+        payout_settings["drawdown_end_age"] = st.number_input(
+            t("drawdown_end_age"),
+            min_value=data["retirement_age"] + 1,
+            max_value=PAYOUT_MAX_AGE,
+            value=max(int(payout_settings["drawdown_end_age"]), data["retirement_age"] + 1)
+        )
+    
+    with col2:
+        # Longevity follows the life table of the expected present values
+        st.caption(t("payout_mortality_table") if data.get("mortality_table") else t("bundled_mortality_table"))
+        payout_settings["monte_carlo"] = st.checkbox(
+            t("monte_carlo"),
+            value=payout_settings["monte_carlo"],
+            help=t("monte_carlo_info")
+        )
+        if payout_settings["monte_carlo"]:
+            payout_settings["return_volatility"] = st.number_input(
+                t("return_volatility"),
+                min_value=0.0,
+                max_value=50.0,
+                value=float(payout_settings["return_volatility"]),
+                step=0.5
+            )
+            payout_settings["scenarios"] = st.number_input(
+                t("scenarios"),
+                min_value=100,
+                max_value=100000,
+                value=int(payout_settings["scenarios"]),
+                step=100
+            )
+    
+    data["payout_settings"] = payout_settings
+    st.session_state.pension_data = data
+    
+    # Capital and full annuity of the selected option, 1st pillar pension
+    sim = simulations[option_index]
+    capital = sim["Fund Value"].iloc[-1]
+    full_annuity = get_annual_pension(sim, plan_settings)
+    ahv_annual, ahv_age_offset = get_first_pillar_annual_pension(data)
+    ahv_age = data["retirement_age"] + ahv_age_offset
+    
+    # Selected split first, then the splits compared in the table
+    annuity_shares = np.concatenate([[payout_settings["annuity_share"] / 100], PAYOUT_ANNUITY_SHARES])
+    retirement_age = data["retirement_age"]
+    n_years = PAYOUT_MAX_AGE - retirement_age + 1
+    mortality_rates = get_mortality_rates(data.get("mortality_table"))
+    
+    if payout_settings["monte_carlo"]:
+        rng = np.random.default_rng(PAYOUT_RANDOM_SEED)
+        scenarios = int(payout_settings["scenarios"])
+        returns = sample_lognormal_returns(
+            rng, (scenarios, n_years),
+            payout_settings["drawdown_yield"] / 100,
+            payout_settings["return_volatility"] / 100
+        )
+        ages_at_death = sample_ages_at_death(rng, scenarios, mortality_rates, plan_settings["sex"], retirement_age)
+        payouts = simulate_payouts(
+            capital, full_annuity, annuity_shares, retirement_age, payout_settings["drawdown_yield"],
+            payout_settings["drawdown_end_age"], ahv_annual, ahv_age, returns
+        )
+        summary = summarize_payouts(payouts, ages_at_death=ages_at_death)
+    else:
+        payouts = simulate_payouts(
+            capital, full_annuity, annuity_shares, retirement_age, payout_settings["drawdown_yield"],
+            payout_settings["drawdown_end_age"], ahv_annual, ahv_age
+        )
+        survival = survival_probabilities(mortality_rates, [plan_settings["sex"]], [retirement_age], len(payouts["ages"]))
+        summary = summarize_payouts(payouts, survival=survival)
+    
+    # Key figures of the selected split
+    col1, col2, col3 = st.columns(3)
+    col1.metric(t("capital_at_retirement"), f"CHF {capital:,.0f}")
+    col2.metric(t("first_year_income"), f"CHF {summary['first_year_income'][0]:,.0f}")
+    col3.metric(t("income_after_drawdown"), f"CHF {summary['late_income'][0]:,.0f}")
+    col1.metric(t("lump_sum"), f"CHF {(1 - annuity_shares[0]) * capital:,.0f}")
+    col2.metric(t("yearly_withdrawal"), f"CHF {payouts['withdrawal'][0]:,.0f}")
+    col3.metric(t("expected_lifetime_income"), f"CHF {summary['expected_income'][0]:,.0f}")
+    
+    # Yearly income of the selected split by source (mean over the scenarios)
+    st.subheader(t("payout_income_by_age"))
+    income_df = pd.DataFrame({
+        t("age"): payouts["ages"],
+        t("first_pillar"): payouts["ahv"],
+        t("annuity"): payouts["annuity"][0],
+        t("drawdown"): payouts["drawdown"][:, 0].mean(axis=0)
+    })
+    income_df = income_df.melt(id_vars=t("age"), var_name=t("source"), value_name=t("yearly_income"))
+    fig = px.bar(income_df, x=t("age"), y=t("yearly_income"), color=t("source"))
+    fig.update_layout(bargap=0.1)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Comparison of the annuity / lump-sum splits
+    st.subheader(t("payout_split_comparison"))
+    split_df = pd.DataFrame({
+        t("annuity_share"): annuity_shares[1:] * 100,
+        t("first_year_income"): summary["first_year_income"][1:],
+        t("income_after_drawdown"): summary["late_income"][1:],
+        t("expected_lifetime_income"): summary["expected_income"][1:]
+    })
+    currency_columns = [t("first_year_income"), t("income_after_drawdown"), t("expected_lifetime_income")]
+    if payout_settings["monte_carlo"]:
+        split_df[t("lifetime_income_p10")] = summary["income_p10"][1:]
+        split_df[t("median_left_at_death")] = summary["median_left_at_death"][1:]
+        currency_columns += [t("lifetime_income_p10"), t("median_left_at_death")]
+    column_config = currency_column_config(currency_columns)
+    column_config[t("annuity_share")] = st.column_config.NumberColumn(format="%.0f%%")
+    st.dataframe(split_df, column_config=column_config, hide_index=True)
+
+def employer_page():
+    """
+    Employer view: projected contributions and fund values aggregated over all members
+    """
+    # Access data from session state
+    data = st.session_state.pension_data
+    
+    st.header(t("employer_view"))
+    st.info(t("employer_view_info"))
+    
+    members_file = st.file_uploader(t("upload_members"), type=["csv", "txt"], key="members_file")
+    if members_file is not None and st.session_state.get("members_file_id") != members_file.file_id:
+        members = parse_members(members_file)
+        if members is None:
+            st.error(t("invalid_members"))
+            return
+        st.session_state.members = members
+        st.session_state.members_file_id = members_file.file_id
+    
+    members = st.session_state.get("members")
+    if members is None:
+        return
+    
+    employer_cols = st.columns(2)
+    with employer_cols[0]:
+        option_index = st.selectbox(
+            t("option"),
+            range(3),
+            format_func=lambda i: f"{t('option')} {i+1}",
+            key="employer_option"
+        )
+    with employer_cols[1]:
+        group_labels = {None: t("total"), "department": t("department"), "age_band": t("age_band")}
+        group_by = st.radio(
+            t("group_by"),
+            list(group_labels),
+            format_func=lambda x: group_labels[x],
+            horizontal=True,
+            key="employer_group_by"
+        )
+    
+    # What-if tables shared by all members, starting from the current settings
+    base_settings = get_plan_settings(data)
+    if "cohort_schedules" not in st.session_state:
+        st.session_state.cohort_schedules = {
+            "employer_contributions": base_settings["employer_contributions"],
+            "coordination_fees": base_settings["coordination_fees"]
+        }
+    schedules = st.session_state.cohort_schedules
+    
+    with st.expander(t("what_if_shared_parameters")):
+        st.info(t("what_if_shared_parameters_info"))
+        if st.button(t("reset_to_plan"), key="cohort_reset"):
+            schedules["employer_contributions"] = base_settings["employer_contributions"]
+            schedules["coordination_fees"] = base_settings["coordination_fees"]
+        
+        what_if_cols = st.columns(2)
+        with what_if_cols[0]:
+            st.write(t("employer_contributions"))
+            schedules["employer_contributions"] = schedule_editor(
+                schedules["employer_contributions"],
+                [
+                    ("age_from", st.column_config.NumberColumn(t("from_age"), min_value=18, max_value=70, step=1, required=True), int),
+                    ("age_to", st.column_config.NumberColumn(t("to_age"), min_value=18, max_value=70, step=1, required=True), int),
+                    ("percentage", st.column_config.NumberColumn(t("contribution_percentage"), min_value=0.0, max_value=50.0, step=0.05, required=True), float)
+                ],
+                key="cohort_employer_editor",
+                ranges=[("age_from", "age_to")]
+            )
+        with what_if_cols[1]:
+            st.write(t("coordination_fee"))
+            schedules["coordination_fees"] = schedule_editor(
+                schedules["coordination_fees"],
+                [
+                    ("from_year", st.column_config.NumberColumn(t("from_year"), min_value=1900, max_value=2100, step=1, required=True), int),
+                    ("amount", st.column_config.NumberColumn(t("amount"), min_value=0, max_value=100000, step=100, required=True), int)
+                ],
+                key="cohort_coordination_editor"
+            )
+    
+    # The cohort store is rebuilt when the members or the other settings change, and
+    # re-evaluated incrementally when only the shared tables change. Its member arrays
+    # are kept in an on-disk result store; a rebuild writes a new one and removes the
+    # previous one, whose arrays may still be mapped
+    store_key = (
+        st.session_state.get("members_file_id"),
+        json.dumps({key: value for key, value in base_settings.items() if key not in schedules}, sort_keys=True, default=str),
+        option_index
+    )
+    store = st.session_state.get("cohort_store")
+    if store is None or st.session_state.get("cohort_store_key") != store_key:
+        store_directory = tempfile.mkdtemp(prefix="cohort_", dir=get_session_result_directory())
+        with st.spinner(t("simulating_members")):
+            store = build_cohort_store(dict(base_settings, **schedules), members, option_index, result_directory=store_directory)
+        if st.session_state.get("cohort_store_directory"):
+            shutil.rmtree(st.session_state.cohort_store_directory, ignore_errors=True)
+        st.session_state.cohort_store = store
+        st.session_state.cohort_store_directory = store_directory
+        st.session_state.cohort_store_key = store_key
+        st.session_state.cohort_update = None
+    elif store["schedules"] != schedules:
+        store, affected, first_years = update_cohort_store(
+            store, schedules["employer_contributions"], schedules["coordination_fees"]
+        )
+        st.session_state.cohort_store = store
+        st.session_state.cohort_update = (len(affected), int(first_years.min()) if len(affected) else None)
+    
+    cohort_update = st.session_state.get("cohort_update")
+    if cohort_update and cohort_update[0]:
+        st.caption(t("members_reevaluated").format(count=cohort_update[0], total=len(members), year=cohort_update[1]))
+    
+    aggregation = aggregate_cohort(store, members, group_by)
+    groups = [t("total") if group == "Total" else group for group in aggregation["groups"]]
+    years = aggregation["years"]
+    
+    # Key figures of the first projected year
+    col1, col2, col3 = st.columns(3)
+    col1.metric(t("members"), f"{len(members):,}")
+    col2.metric(f"{t('employer_contribution')} {years[0]}", f"CHF {aggregation['employer_contributions'][:, 0].sum():,.0f}")
+    col3.metric(f"{t('fund_value')} {years[0]}", f"CHF {aggregation['fund_values'][:, 0].sum():,.0f}")
+    
+    # Long format frame of the non-empty groups
+    employer_df = pd.DataFrame({
+        t("year"): np.tile(years, len(groups)),
+        t("group"): np.repeat(groups, len(years)),
+        t("employer_contribution"): aggregation["employer_contributions"].ravel(),
+        t("personal_contribution"): aggregation["personal_contributions"].ravel(),
+        t("fund_value"): aggregation["fund_values"].ravel(),
+        t("active_members"): aggregation["active_members"].ravel()
+    })
+    employer_df = employer_df[employer_df.groupby(t("group"))[t("active_members")].transform("sum") > 0]
+    
+    st.subheader(t("employer_contributions_by_year"))
+    fig_contributions = px.bar(employer_df, x=t("year"), y=t("employer_contribution"), color=t("group"))
+    fig_contributions.update_layout(yaxis=dict(tickformat="CHF,.0f"))
+    st.plotly_chart(fig_contributions, use_container_width=True)
     
-    metrics_df = pd.DataFrame(metrics)
+    st.subheader(t("aggregate_fund_value"))
+    fig_funds = px.area(employer_df, x=t("year"), y=t("fund_value"), color=t("group"))
+    fig_funds.update_layout(yaxis=dict(tickformat="CHF,.0f"))
+    st.plotly_chart(fig_funds, use_container_width=True)
+    
+    yearly_df = employer_df.groupby(t("year"), as_index=False)[
+        [t("employer_contribution"), t("personal_contribution"), t("fund_value"), t("active_members")]
+    ].sum()
     st.dataframe(
-        metrics_df.style.format({
-            t("starting_value"): "CHF {:,.0f}",
-            t("final_value"): "CHF {:,.0f}",
-            t("total_growth"): "CHF {:,.0f}",
-            t("avg_annual_contribution"): "CHF {:,.0f}"
-        })
+        yearly_df,
+        column_config=currency_column_config([t("employer_contribution"), t("personal_contribution"), t("fund_value")]),
+        hide_index=True
     )
+    
+    # Export the results of every member and year (prepared on demand, as it can be large)
+    st.subheader(t("export_member_results"))
+    cohort_format = st.selectbox(t("file_format"), list(EXPORT_FORMATS), format_func=str.capitalize, key="cohort_export_format")
+    export_key = (store_key, store["schedules"], cohort_format)
+    if st.button(t("prepare_export"), key="cohort_prepare_export"):
+        st.session_state.cohort_export = (export_key, export_table(cohort_frame(store, members), cohort_format))
+    cohort_export = st.session_state.get("cohort_export")
+    if cohort_export and cohort_export[0] == export_key:
+        extension, mime = EXPORT_FORMATS[cohort_format]
+        st.download_button(
+            t("download_member_results"),
+            data=cohort_export[1],
+            file_name=f"4sorge_members.{extension}",
+            mime=mime,
+            key="download_member_results"
+        )
 
 def first_pillar_page():
     """
@@ -2813,10 +6437,6 @@ def first_pillar_page():
             first_pillar_data["retirement_offset_years"] = st.session_state.retirement_offset_slider
             data["first_pillar_data"] = first_pillar_data
             st.session_state.pension_data = data
-            
-            # Force recalculation by clearing any cached values
-            if "first_pillar_result" in st.session_state:
-                del st.session_state.first_pillar_result
         
         # Early/Late retirement settings first (before calculating results)
         st.subheader(t("early_late_retirement"))
@@ -2840,21 +6460,9 @@ def first_pillar_page():
         else:
             st.info(t('standard_retirement'))
         
-        # Calculate 1st pillar pension based on current data (including slider value)
-        # Use a cached result if available, otherwise calculate fresh
-        if "first_pillar_result" not in st.session_state:
-            st.session_state.first_pillar_result = calculate_first_pillar_pension(
-                data["birth_date"],
-                data["retirement_age"],
-                first_pillar_data.get("retirement_offset_years", 0),
-                first_pillar_data.get("yearly_incomes", []),
-                first_pillar_data.get("minimum_contributions", []),
-                first_pillar_data.get("average_annual_incomes", []),
-                first_pillar_data.get("monthly_payout_rates", []),
-                first_pillar_data.get("required_contribution_years", 45)
-            )
-        
-        result = st.session_state.first_pillar_result
+        # Calculate 1st pillar pension based on current data (including slider value),
+        # cached on its inputs
+        result = get_first_pillar_result(data)
         
         if result:
             # Display summary results
@@ -3131,139 +6739,41 @@ def first_pillar_page():
         # Minimum annual contributions
         st.write(t("minimum_annual_contribution"))
         
-        num_min_contributions = st.number_input(
-            t("number_of_entries"),
-            min_value=1,
-            max_value=20,
-            value=len(first_pillar_data.get("minimum_contributions", [])),
-            key="num_min_contributions"
+        first_pillar_data["minimum_contributions"] = schedule_editor(
+            first_pillar_data.get("minimum_contributions", []),
+            [
+                ("from_year", st.column_config.NumberColumn(t("from_year"), min_value=1900, max_value=2100, step=1, required=True), int),
+                ("amount", st.column_config.NumberColumn(t("amount"), min_value=0, max_value=10000, step=1, required=True), int)
+            ],
+            key="minimum_contribution_editor"
         )
         
-        min_contributions = []
-        for i in range(num_min_contributions):
-            cols = st.columns(2)
-            
-            default_entry = {"from_year": 2000, "amount": 500}
-            if "minimum_contributions" in first_pillar_data and i < len(first_pillar_data["minimum_contributions"]):
-                default_entry = first_pillar_data["minimum_contributions"][i]
-            
-            with cols[0]:
-                from_year = st.number_input(
-                    t("from_year"),
-                    min_value=1900,
-                    max_value=2100,
-                    value=default_entry["from_year"],
-                    key=f"min_contrib_year_{i}"
-                )
-            
-            with cols[1]:
-                amount = st.number_input(
-                    t("amount"),
-                    min_value=0,
-                    max_value=10000,
-                    value=default_entry["amount"],
-                    key=f"min_contrib_amount_{i}"
-                )
-            
-            min_contributions.append({"from_year": from_year, "amount": amount})
-        
-        first_pillar_data["minimum_contributions"] = min_contributions
-        
         # Average annual incomes
         st.write(t("average_annual_income"))
         
-        num_avg_incomes = st.number_input(
-            t("number_of_entries"),
-            min_value=1,
-            max_value=20,
-            value=len(first_pillar_data.get("average_annual_incomes", [])),
-            key="num_avg_incomes"
+        first_pillar_data["average_annual_incomes"] = schedule_editor(
+            first_pillar_data.get("average_annual_incomes", []),
+            [
+                ("from_year", st.column_config.NumberColumn(t("from_year"), min_value=1900, max_value=2100, step=1, required=True), int),
+                ("amount", st.column_config.NumberColumn(t("amount"), min_value=0, max_value=500000, step=100, required=True), int)
+            ],
+            key="average_income_editor"
         )
         
-        avg_incomes = []
-        for i in range(num_avg_incomes):
-            cols = st.columns(2)
-            
-            default_entry = {"from_year": 2000, "amount": 85000}
-            if "average_annual_incomes" in first_pillar_data and i < len(first_pillar_data["average_annual_incomes"]):
-                default_entry = first_pillar_data["average_annual_incomes"][i]
-            
-            with cols[0]:
-                from_year = st.number_input(
-                    t("from_year"),
-                    min_value=1900,
-                    max_value=2100,
-                    value=default_entry["from_year"],
-                    key=f"avg_income_year_{i}"
-                )
-            
-            with cols[1]:
-                amount = st.number_input(
-                    t("amount"),
-                    min_value=0,
-                    max_value=500000,
-                    value=default_entry["amount"],
-                    key=f"avg_income_amount_{i}"
-                )
-            
-            avg_incomes.append({"from_year": from_year, "amount": amount})
-        
-        first_pillar_data["average_annual_incomes"] = avg_incomes
-        
         # Monthly payout rates
         st.write(t("monthly_payout_rates"))
         
-        num_payout_rates = st.number_input(
-            t("number_of_entries"),
-            min_value=1,
-            max_value=10,
-            value=len(first_pillar_data.get("monthly_payout_rates", [])),
-            key="num_payout_rates"
+        first_pillar_data["monthly_payout_rates"] = schedule_editor(
+            first_pillar_data.get("monthly_payout_rates", []),
+            [
+                ("income_from", st.column_config.NumberColumn(t("income_from"), min_value=0, max_value=1000000, step=100, required=True), int),
+                ("income_to", st.column_config.NumberColumn(t("income_to"), min_value=0, max_value=10000000, step=100, required=True), int),
+                ("monthly_amount", st.column_config.NumberColumn(t("monthly_amount"), min_value=0, max_value=10000, step=1, required=True), int)
+            ],
+            key="payout_rate_editor",
+            ranges=[("income_from", "income_to")]
         )
         
-        payout_rates = []
-        for i in range(num_payout_rates):
-            cols = st.columns(3)
-            
-            default_entry = {"income_from": 0, "income_to": 85000, "monthly_amount": 2000}
-            if "monthly_payout_rates" in first_pillar_data and i < len(first_pillar_data["monthly_payout_rates"]):
-                default_entry = first_pillar_data["monthly_payout_rates"][i]
-            
-            with cols[0]:
-                income_from = st.number_input(
-                    t("income_from"),
-                    min_value=0,
-                    max_value=1000000,
-                    value=default_entry["income_from"],
-                    key=f"payout_from_{i}"
-                )
-            
-            with cols[1]:
-                income_to = st.number_input(
-                    t("income_to"),
-                    min_value=income_from,
-                    max_value=10000000,
-                    value=default_entry["income_to"],
-                    key=f"payout_to_{i}"
-                )
-            
-            with cols[2]:
-                monthly_amount = st.number_input(
-                    t("monthly_amount"),
-                    min_value=0,
-                    max_value=10000,
-                    value=default_entry["monthly_amount"],
-                    key=f"payout_amount_{i}"
-                )
-            
-            payout_rates.append({
-                "income_from": income_from,
-                "income_to": income_to,
-                "monthly_amount": monthly_amount
-            })
-        
-        first_pillar_data["monthly_payout_rates"] = payout_rates
-        
         # Required contribution years
         required_years = st.number_input(
             t("required_contribution_years"),
@@ -3276,93 +6786,35 @@ def first_pillar_page():
     with fpillar_tabs[2]:
         # Projection tab - allows entering income history
         st.subheader(t("yearly_income"))
+        
+        # Bulk import of a full income history (e.g. IK extract exported to CSV)
+        with st.expander(t("import_income_history")):
+            st.write(t("import_income_history_info"))
+            income_file = st.file_uploader(t("upload_data"), type=["csv", "txt"], key="income_history_file")
+            
+            if income_file is not None and st.button(t("import_income_history")):
+                history = parse_income_history(income_file)
+                if history is not None:
+                    first_pillar_data["yearly_incomes"] = income_history_to_ranges(history)
+                    
+                    st.success(t("income_history_imported").format(len(history)))
+                else:
+                    st.error(t("invalid_income_history"))
+        
         st.write(t("add_income_range"))
         
         # Table of yearly incomes
-        num_income_entries = st.number_input(
-            t("number_of_entries"),
-            min_value=0,
-            max_value=50,
-            value=len(first_pillar_data.get("yearly_incomes", [])),
-            key="num_income_entries"
+        yearly_incomes = schedule_editor(
+            first_pillar_data.get("yearly_incomes", []),
+            [
+                ("year_from", st.column_config.NumberColumn(t("income_year_from"), min_value=1900, max_value=2100, step=1, required=True), int),
+                ("year_to", st.column_config.NumberColumn(t("income_year_to"), min_value=1900, max_value=2100, step=1, required=True), int),
+                ("amount", st.column_config.NumberColumn(t("income_amount"), min_value=0, max_value=1000000, step=100, required=True), int)
+            ],
+            key="yearly_income_editor",
+            ranges=[("year_from", "year_to")]
         )
         
-        # Calculate retirement year for the last entry
-        if isinstance(data["birth_date"], str):
-            birth_date = datetime.strptime(data["birth_date"], "%Y-%m-%d").date()
-        else:
-            birth_date = data["birth_date"]
-        retirement_age = data["retirement_age"] + first_pillar_data.get("retirement_offset_years", 0)
-        retirement_year = birth_date.year + retirement_age
-        
-        yearly_incomes = []
-        for i in range(num_income_entries):
-            cols = st.columns(3)
-            
-            default_entry = {"year_from": 2000, "year_to": 2010, "amount": 80000}
-            
-            # Set default from_year based on previous entry's to_year + 1
-            if i > 0 and "yearly_incomes" in first_pillar_data and i-1 < len(first_pillar_data["yearly_incomes"]):
-                prev_to_year = first_pillar_data["yearly_incomes"][i-1]["year_to"]
-                default_from_year = prev_to_year + 1
-            else:
-                default_from_year = 2000
-            
-            # Use existing entry if available
-            if "yearly_incomes" in first_pillar_data and i < len(first_pillar_data["yearly_incomes"]):
-                default_entry = first_pillar_data["yearly_incomes"][i]
-            else:
-                default_entry["year_from"] = default_from_year
-                
-            # For the last entry, set the year_to to retirement year
-            if i == num_income_entries - 1:
-                default_to_year = retirement_year
-            else:
-                default_to_year = default_entry["year_to"]
-                
-            with cols[0]:
-                year_from = st.number_input(
-                    t("income_year_from"),
-                    min_value=1900,
-                    max_value=2100,
-                    value=default_entry["year_from"],
-                    key=f"income_year_from_{i}"
-                )
-            
-            with cols[1]:
-                # If this is the last entry, set to_year to retirement year
-                if i == num_income_entries - 1:
-                    year_to = st.number_input(
-                        t("income_year_to"),
-                        min_value=year_from,
-                        max_value=2100,
-                        value=default_to_year,
-                        key=f"income_year_to_{i}"
-                    )
-                else:
-                    year_to = st.number_input(
-                        t("income_year_to"),
-                        min_value=year_from,
-                        max_value=2100,
-                        value=default_entry["year_to"],
-                        key=f"income_year_to_{i}"
-                    )
-            
-            with cols[2]:
-                amount = st.number_input(
-                    t("income_amount"),
-                    min_value=0,
-                    max_value=1000000,
-                    value=default_entry["amount"],
-                    key=f"income_amount_{i}"
-                )
-            
-            yearly_incomes.append({
-                "year_from": year_from,
-                "year_to": year_to,
-                "amount": amount
-            })
-        
         first_pillar_data["yearly_incomes"] = yearly_incomes
         
         # Show preview of income data
@@ -3370,12 +6822,13 @@ def first_pillar_page():
             st.subheader(t("income_range"))
             
             # Create data for visualization
+            first_year = min(entry["year_from"] for entry in yearly_incomes)
             preview_years = list(range(
-                min(entry["year_from"] for entry in yearly_incomes),
-                max(entry["year_to"] for entry in yearly_incomes) + 1
+                first_year,
+                max(first_year, max(entry["year_to"] for entry in yearly_incomes)) + 1
             ))
             
-            preview_incomes = [get_yearly_income(year, yearly_incomes, 0) for year in preview_years]
+            preview_incomes = compile_yearly_incomes(yearly_incomes, preview_years[0], preview_years[-1], 0)
             
             # Create DataFrame
             preview_df = pd.DataFrame({
@@ -3384,7 +6837,7 @@ def first_pillar_page():
             })
             
             # Display as table
-            st.dataframe(preview_df.style.format({"Income": "CHF {:,.0f}"}))
+            st.dataframe(preview_df, column_config=currency_column_config(["Income"]))
             
             # Display as line chart
             fig = px.line(
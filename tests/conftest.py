@@ -0,0 +1,23 @@
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+APP_PATH = pathlib.Path(__file__).resolve().parent.parent / "4Sorge.py"
+
+
+@pytest.fixture(scope="session")
+def sorge():
+    """The app module (its file name is not importable, so it is loaded from its path)."""
+    spec = importlib.util.spec_from_file_location("sorge", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["sorge"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def plan_settings(sorge):
+    """Settings of the default plan, starting from a statement on 2026-01-15."""
+    return dict(sorge.get_plan_settings(sorge.DEFAULT_PENSION_DATA), current_value_date="2026-01-15")
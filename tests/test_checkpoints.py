@@ -0,0 +1,54 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+
+def final_fund_values(sorge, compiled):
+    account_values = sorge.accumulate_fund(compiled["start_values"], compiled["growth"], sorge.plan_contributions(compiled))
+    return account_values.sum(axis=1)[:, -1]
+
+
+@pytest.mark.parametrize("monthly", [False, True])
+@pytest.mark.parametrize("two_accounts", [False, True])
+@pytest.mark.parametrize("has_13th_salary", [False, True])
+@pytest.mark.parametrize("statement_date", ["2026-01-15", "2027-01-15", "2027-06-15", "2027-12-15", "2031-03-15"])
+def test_reanchor_matches_fresh_compile(sorge, plan_settings, monthly, two_accounts, has_13th_salary, statement_date):
+    settings = dict(
+        plan_settings,
+        two_accounts=two_accounts,
+        has_13th_salary=has_13th_salary,
+        buy_ins=[{"year": 2027, "amount": 50000}, {"year": 2031, "amount": 20000}]
+    )
+    compiled = sorge.compile_plan(settings, monthly)
+    reanchored = sorge.reanchor_plan(
+        compiled, sorge.build_checkpoints(compiled), date.fromisoformat(statement_date), 120000, 40000
+    )
+    if reanchored is None:
+        # Statement dates off the period grid (mid-year in yearly mode) need a full compile
+        assert not monthly
+        return
+    
+    fresh = sorge.compile_plan(
+        dict(settings, current_value_date=statement_date, current_pension_value=120000, current_mandatory_value=40000),
+        monthly
+    )
+    for key, value in fresh.items():
+        if isinstance(value, np.ndarray):
+            np.testing.assert_array_equal(reanchored[key], value, err_msg=key)
+    np.testing.assert_allclose(final_fund_values(sorge, reanchored), final_fund_values(sorge, fresh))
+
+
+def test_reanchor_keeps_mid_year_buy_in(sorge, plan_settings):
+    settings = dict(plan_settings, buy_ins=[{"year": 2027, "amount": 50000}])
+    compiled = sorge.compile_plan(settings, monthly=True)
+    reanchored = sorge.reanchor_plan(compiled, sorge.build_checkpoints(compiled), date(2027, 6, 15), 120000)
+    
+    assert reanchored["buy_ins"][0] == 50000
+    assert reanchored["buy_ins"].sum() == 50000
+    assert compiled["buy_ins"].sum() == 50000
+
+
+def test_reanchor_off_grid_statement_needs_full_compile(sorge, plan_settings):
+    compiled = sorge.compile_plan(plan_settings, monthly=True)
+    assert sorge.reanchor_plan(compiled, sorge.build_checkpoints(compiled), date(2027, 6, 16), 120000) is None
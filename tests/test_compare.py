@@ -0,0 +1,7 @@
+def test_years_to_retirement_does_not_depend_on_the_frequency(sorge, plan_settings):
+    plans = [plan_settings, dict(plan_settings, retirement_age=60, has_13th_salary=True)]
+    labels = ["Option 1", "Option 2", "Option 3"]
+    _, yearly = sorge.compare_plans(plans, ["A", "B"], labels)
+    _, monthly = sorge.compare_plans(plans, ["A", "B"], labels, monthly=True)
+    assert yearly["Years to Retirement"].tolist() == [38] * 3 + [33] * 3
+    assert monthly["Years to Retirement"].tolist() == yearly["Years to Retirement"].tolist()
@@ -0,0 +1,22 @@
+import pandas as pd
+
+
+def test_member_ignores_the_user_statement_and_buy_ins(sorge, plan_settings):
+    plan_settings.update(current_pension_value=250000, current_mandatory_value=100000,
+                         buy_ins=[{"year": 2027, "amount": 20000}])
+    member = pd.Series({"birth_date": "1980-05-01", "current_salary": 90000.0})
+    settings = sorge.member_plan_settings(plan_settings, member)
+    assert settings["current_pension_value"] == 0
+    assert settings["current_mandatory_value"] == 0
+    assert settings["current_value_date"] is None
+    assert settings["buy_ins"] == []
+    assert plan_settings["current_pension_value"] == 250000
+
+
+def test_member_statement_comes_from_its_columns(sorge, plan_settings):
+    plan_settings["current_pension_value"] = 250000
+    member = pd.Series({"birth_date": "1980-05-01", "current_salary": 90000.0,
+                        "current_pension_value": 40000.0, "current_value_date": "2026-03-31"})
+    settings = sorge.member_plan_settings(plan_settings, member)
+    assert settings["current_pension_value"] == 40000
+    assert settings["current_value_date"] == "2026-03-31"
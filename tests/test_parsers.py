@@ -0,0 +1,39 @@
+import io
+
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("85'000.50", 85000.5),
+    ("85.000,50", 85000.5),
+    ("85 000,50", 85000.5),
+    ("85000,50", 85000.5),
+    ("85,000.50", 85000.5),
+    ("CHF 85'000", 85000.0),
+    ("85.000", 85000.0),
+    ("1,250,000", 1250000.0),
+    ("1.250.000,5", 1250000.5),
+    ("-1'200.25", -1200.25),
+    ("123456,75", 123456.75),
+])
+def test_parse_amounts(sorge, text, expected):
+    assert sorge.parse_amounts(pd.Series([text]))[0] == pytest.approx(expected)
+
+
+def test_parse_amounts_keeps_unparseable_values_missing(sorge):
+    assert sorge.parse_amounts(pd.Series(["n/a", ""])).isna().all()
+
+
+def test_income_history_with_decimal_commas(sorge):
+    csv = io.StringIO("Jahr;Einkommen\n2020;85000,50\n2021;85.000,50\n2021;1'000.25\n2022;90'000\n")
+    history = sorge.parse_income_history(csv)
+    assert history["Year"].tolist() == [2020, 2021, 2022]
+    assert history["Income"].tolist() == pytest.approx([85000.5, 86000.75, 90000.0])
+
+
+def test_fund_statements_with_decimal_commas(sorge):
+    csv = io.StringIO("Datum;Guthaben\n31.12.2023;123456,75\n31.12.2024;150.000,25\n31.12.2025;175'000.00\n")
+    statements = sorge.parse_fund_statements(csv)
+    assert statements["Date"].dt.year.tolist() == [2023, 2024, 2025]
+    assert statements["Value"].tolist() == pytest.approx([123456.75, 150000.25, 175000.0])
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("sex", ["male", "female"])
+def test_sampled_ages_at_death_follow_the_life_table(sorge, sex):
+    rates = sorge.get_mortality_rates()
+    survival = sorge.survival_probabilities(rates, [sex], [65], sorge.MORTALITY_MAX_AGE - 65 + 1)[0]
+    ages_at_death = sorge.sample_ages_at_death(np.random.default_rng(0), 200000, rates, sex, 65)
+    assert ages_at_death.min() >= 65 and ages_at_death.max() < sorge.MORTALITY_MAX_AGE + 1
+    # Curtate life expectancy plus half a year
+    assert ages_at_death.mean() - 65 == pytest.approx(survival[1:].sum() + 0.5, abs=0.05)
+    assert np.mean(ages_at_death >= 85) == pytest.approx(survival[20], abs=0.005)
+
+
+def test_sampled_ages_at_death_use_an_imported_table(sorge):
+    table = [{"age": age, "male": 0.5, "female": 0.5} for age in range(60, 121)]
+    rates = sorge.get_mortality_rates(table)
+    ages_at_death = sorge.sample_ages_at_death(np.random.default_rng(0), 100000, rates, "male", 65)
+    assert ages_at_death.mean() - 65 == pytest.approx(1.5, abs=0.02)